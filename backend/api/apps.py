@@ -6,4 +6,6 @@ class ApiConfig(AppConfig):
     name = 'api'
 
     def ready(self):
-        import api.signals
\ No newline at end of file
+        import api.checks
+        import api.signals
+        import api.tasks
\ No newline at end of file
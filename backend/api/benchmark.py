@@ -0,0 +1,363 @@
+"""
+Query-count and latency benchmark for the API.
+
+``seed_benchmark_data`` fills the (test) database with synthetic clients,
+expenses, receipts, messages and versions; ``run_benchmark`` requests every
+endpoint in ``ENDPOINTS`` through the DRF test client and measures queries,
+wall time and response size. Used by ``manage.py benchmark_api``.
+"""
+import os
+import random
+import re
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import (
+    BackgroundTask, CashReceipt, Client, ClientFinancialSummary, Expense, ExpenseVersion, Message,
+    PaymentVersion, Project, ProjectProgress, UploadSession, WorkItem,
+)
+from api.tasks import export_statement
+
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# Smallest body the upload type check accepts as a PNG
+BENCHMARK_UPLOAD = b'\x89PNG\r\n\x1a\n' + bytes(56)
+BENCHMARK_LEDGER = b'date,description,amount\n2024-01-01,Benchmark import,10.00\n'
+
+# (name, role, method, path, data); paths are formatted with the seeded ids.
+# ``bytes`` data is sent as a raw body and ``(filename, content)`` values as
+# multipart file fields.
+ENDPOINTS = [
+    ('auth.login', 'anonymous', 'post', '/login/', {'username': '{username}', 'password': BENCHMARK_PASSWORD}),
+    ('auth.token', 'anonymous', 'post', '/api/token/', {'username': '{username}', 'password': BENCHMARK_PASSWORD}),
+    ('auth.token.refresh', 'anonymous', 'post', '/api/token/refresh/', {'refresh': '{refresh}'}),
+    ('auth.me', 'client', 'get', '/auth/me/', None),
+    ('portfolio.work_items', 'anonymous', 'get', '/api/work-items/', None),
+
+    ('client.clients', 'client', 'get', '/api/clients/', None),
+    ('client.clients.detail', 'client', 'get', '/api/clients/{client}/', None),
+    ('client.clients.dashboard', 'client', 'get', '/api/clients/dashboard/', None),
+    ('client.dashboard', 'client', 'get', '/api/client/dashboard/', None),
+    ('client.projects', 'client', 'get', '/api/projects/', None),
+    ('client.projects.detail', 'client', 'get', '/api/projects/{project}/', None),
+    ('client.progress', 'client', 'get', '/api/progress/', None),
+    ('client.progress.detail', 'client', 'get', '/api/progress/{progress}/', None),
+    ('client.expenses', 'client', 'get', '/api/expenses/', None),
+    ('client.expenses.page', 'client', 'get', '/api/expenses/?page_size=50', None),
+    ('client.expenses.detail', 'client', 'get', '/api/expenses/{expense}/', None),
+    ('client.payments', 'client', 'get', '/api/client/payments/', None),
+    ('client.messages', 'client', 'get', '/api/messages/', None),
+    ('client.messages.detail', 'client', 'get', '/api/messages/{message}/', None),
+    ('client.messages.sync', 'client', 'get', '/api/messages/sync/?after_id=0', None),
+    ('client.messages.create', 'client', 'post', '/api/messages/', {'client': '{client}', 'content': 'benchmark'}),
+    ('client.uploads.create', 'client', 'post', '/api/uploads/',
+     {'filename': 'bill.png', 'total_size': len(BENCHMARK_UPLOAD), 'target': 'expense_bill'}),
+    ('client.uploads.detail', 'client', 'get', '/api/uploads/{upload}/', None),
+    ('client.uploads.chunk', 'client', 'put', '/api/uploads/{upload}/chunk/?offset=0', BENCHMARK_UPLOAD),
+    ('client.uploads.complete', 'client', 'post', '/api/uploads/{upload}/complete/', {'object_id': '{expense}'}),
+    ('client.files.bill', 'client', 'get', '/api/files/expenses/{expense}/', None),
+    ('client.expense_versions', 'client', 'get', '/api/client/expense-versions/', None),
+    ('client.expense_versions.detail', 'client', 'get', '/api/client/expense-versions/{expense_version}/', None),
+    ('client.expense_versions.diff', 'client', 'get', '/api/client/expense-versions/diff/?from=1&to={versions}', None),
+    ('client.payment_versions', 'client', 'get', '/api/client/payment-versions/', None),
+    ('client.payment_versions.detail', 'client', 'get', '/api/client/payment-versions/{payment_version}/', None),
+    ('client.payment_versions.diff', 'client', 'get', '/api/client/payment-versions/diff/?from=1&to={versions}', None),
+
+    ('admin.dashboard', 'admin', 'get', '/api/admin/dashboard/', None),
+    ('admin.clients', 'admin', 'get', '/api/admin/clients/', None),
+    ('admin.clients.detail', 'admin', 'get', '/api/admin/clients/{client}/', None),
+    ('admin.expenses', 'admin', 'get', '/api/admin/expenses/?client_id={client}', None),
+    ('admin.expenses.all.page', 'admin', 'get', '/api/admin/expenses/?page_size=50', None),
+    ('admin.expenses.detail', 'admin', 'get', '/api/admin/expenses/{expense}/', None),
+    ('admin.expenses.update', 'admin', 'patch', '/api/admin/expenses/{expense}/', {'description': 'benchmark'}),
+    ('admin.progress.update', 'admin', 'put', '/api/admin/progress/{progress}/', {'percentage': 50}),
+    ('admin.clients.progress', 'admin', 'patch', '/api/admin/clients/{client}/progress/', {'percentage': 60}),
+    ('admin.clients.complete', 'admin', 'post', '/api/admin/clients/{client}/complete/', None),
+    ('admin.clients.retrieve', 'admin', 'post', '/api/admin/clients/{client}/retrieve/', None),
+    ('admin.work_items', 'admin', 'get', '/api/admin/work-items/', None),
+    ('admin.work_items.detail', 'admin', 'get', '/api/admin/work-items/{work_item}/', None),
+    ('admin.payments', 'admin', 'get', '/api/admin/payments/?client_id={client}', None),
+    ('admin.payments.all.page', 'admin', 'get', '/api/admin/payments/?page_size=50', None),
+    ('admin.payments.create', 'admin', 'post', '/api/admin/cash-receipts/',
+     {'client_id': '{client}', 'date': '2024-01-01', 'amount': '10.00'}),
+    ('admin.payments.update', 'admin', 'patch', '/api/admin/payments/{receipt}/', {'amount': '12.50'}),
+    ('admin.payments.batch', 'admin', 'post', '/api/admin/payments/batch/',
+     {'update': [{'id': '{receipt}', 'amount': '15.00'}]}),
+    ('admin.payments.delete', 'admin', 'delete', '/api/admin/payments/{spare_receipt}/delete/', None),
+    ('admin.imports.expenses', 'admin', 'post', '/api/admin/imports/expenses/',
+     {'client_id': '{client}', 'file': ('ledger.csv', BENCHMARK_LEDGER)}),
+    ('admin.messages', 'admin', 'get', '/api/messages/?client_id={client}', None),
+    ('admin.expense_versions', 'admin', 'get', '/api/admin/expense-versions/?client_id={client}', None),
+    ('admin.expense_versions.detail', 'admin', 'get', '/api/admin/expense-versions/{expense_version}/', None),
+    ('admin.expense_versions.diff', 'admin', 'get',
+     '/api/admin/expense-versions/diff/?client_id={client}&from=1&to={versions}', None),
+    ('admin.expense_versions.create', 'admin', 'post', '/api/admin/expense-versions/create-version/',
+     {'client_id': '{client}'}),
+    ('admin.payment_versions', 'admin', 'get', '/api/admin/payment-versions/?client_id={client}', None),
+    ('admin.payment_versions.detail', 'admin', 'get', '/api/admin/payment-versions/{payment_version}/', None),
+    ('admin.payment_versions.diff', 'admin', 'get',
+     '/api/admin/payment-versions/diff/?client_id={client}&from=1&to={versions}', None),
+    ('admin.payment_versions.create', 'admin', 'post', '/api/admin/payment-versions/create-version/',
+     {'client_id': '{client}'}),
+    ('admin.statement.csv', 'admin', 'get', '/api/admin/statements/export/?client_id={client}', None),
+    ('admin.statement.status', 'admin', 'get', '/api/admin/statements/exports/{export_task}/', None),
+]
+
+
+def seed_benchmark_data(clients=20, expenses=50, receipts=10, messages=20, versions=3, work_items=20, seed=1):
+    """Create synthetic data in bulk and return the ids used to build endpoint paths."""
+    rng = random.Random(seed)
+    password = make_password(BENCHMARK_PASSWORD)
+    today = date.today()
+
+    User.objects.bulk_create([
+        User(username=f'bench-client-{i}', password=password) for i in range(clients)
+    ])
+    users = list(User.objects.filter(username__startswith='bench-client-').order_by('id'))
+    admin = User.objects.create(username='bench-admin', password=password, is_staff=True, is_superuser=True)
+
+    Client.objects.bulk_create([
+        Client(user=user, phone='0100000000%d' % (i % 10), budget=Decimal('100000'))
+        for i, user in enumerate(users)
+    ])
+    client_rows = list(Client.objects.filter(user__in=users).order_by('id'))
+
+    Project.objects.bulk_create([
+        Project(client=client, title=f'Project {client.id}', total_budget=Decimal('100000'))
+        for client in client_rows
+    ])
+    ProjectProgress.objects.bulk_create([
+        ProjectProgress(project=project, percentage=rng.randint(0, 100))
+        for project in Project.objects.filter(client__in=client_rows)
+    ])
+
+    statuses = [choice for choice, _ in Expense.STATUS_CHOICES]
+    Expense.objects.bulk_create([
+        Expense(
+            client=client,
+            date=today - timedelta(days=rng.randint(0, 365)),
+            description=f'Expense {n}',
+            amount=Decimal(rng.randint(100, 100000)) / 100,
+            status=rng.choice(statuses),
+        )
+        for client in client_rows for n in range(expenses)
+    ], batch_size=1000)
+    CashReceipt.objects.bulk_create([
+        CashReceipt(
+            client=client,
+            date=today - timedelta(days=rng.randint(0, 365)),
+            amount=Decimal(rng.randint(1000, 500000)) / 100,
+        )
+        for client in client_rows for _ in range(receipts)
+    ], batch_size=1000)
+    Message.objects.bulk_create([
+        Message(client=client, sender=rng.choice(['client', 'admin']), content=f'Message {n}')
+        for client in client_rows for n in range(messages)
+    ], batch_size=1000)
+    WorkItem.objects.bulk_create([
+        WorkItem(title_ar=f'عمل {n}', title_en=f'Work {n}', category=WorkItem.CATEGORY_CHOICES[n % len(WorkItem.CATEGORY_CHOICES)][0])
+        for n in range(work_items)
+    ])
+
+    # bulk_create skips the signals that maintain the summaries
+    ClientFinancialSummary.objects.rebuild()
+
+    _seed_versions(client_rows, versions, rng)
+
+    first = client_rows[0]
+    os.makedirs(settings.CHUNKED_UPLOAD_TEMP_DIR, exist_ok=True)
+    upload = UploadSession.objects.create(
+        user=first.user, target='expense_bill', filename='bill.png', total_size=len(BENCHMARK_UPLOAD)
+    )
+    open(upload.part_path, 'wb').close()
+    export_task = BackgroundTask.objects.create(
+        name=export_statement.task_name, kwargs={'client_id': first.id}, run_after=timezone.now()
+    )
+
+    return {
+        'admin_user': admin,
+        'client_user': first.user,
+        'username': first.user.username,
+        'refresh': str(RefreshToken.for_user(first.user)),
+        'client': first.id,
+        'project': Project.objects.filter(client=first).values_list('id', flat=True).first(),
+        'message': Message.objects.filter(client=first).order_by('id').values_list('id', flat=True).first(),
+        'expense': Expense.objects.filter(client=first).order_by('id').values_list('id', flat=True).first(),
+        'receipt': CashReceipt.objects.filter(client=first).order_by('id').values_list('id', flat=True).first(),
+        # Deleted by the benchmark, so never the receipt the other endpoints use
+        'spare_receipt': CashReceipt.objects.filter(client=first).order_by('id').values_list('id', flat=True).last(),
+        'progress': ProjectProgress.objects.filter(project__client=first).values_list('id', flat=True).first(),
+        'expense_version': ExpenseVersion.objects.filter(client=first).order_by('-version_number')
+        .values_list('id', flat=True).first(),
+        'payment_version': PaymentVersion.objects.filter(client=first).order_by('-version_number')
+        .values_list('id', flat=True).first(),
+        'work_item': WorkItem.objects.order_by('id').values_list('id', flat=True).first(),
+        'upload': upload.pk,
+        'export_task': export_task.pk,
+        'versions': versions,
+    }
+
+
+def _seed_versions(client_rows, versions, rng):
+    """Store ``versions`` expense/payment versions per client, changing a few items each round."""
+    now = timezone.now()
+    for client in client_rows:
+        expense_items = [
+            {'id': e.id, 'date': str(e.date), 'description': e.description, 'amount': str(e.amount), 'status': e.status}
+            for e in Expense.objects.filter(client=client)
+        ]
+        payment_items = [
+            {'id': r.id, 'date': str(r.date), 'amount': str(r.amount)}
+            for r in CashReceipt.objects.filter(client=client)
+        ]
+        for number in range(1, versions + 1):
+            for item in rng.sample(expense_items, min(3, len(expense_items))):
+                item['amount'] = str(Decimal(item['amount']) + 1)
+            if expense_items:
+                ExpenseVersion.objects.create_snapshot(
+                    client, number, [dict(item) for item in expense_items], discussion_completed_at=now
+                )
+            if payment_items:
+                PaymentVersion.objects.create_snapshot(
+                    client, number, [dict(item) for item in payment_items], discussion_completed_at=now
+                )
+        Client.objects.filter(id=client.id).update(
+            expenses_version_count=versions if expense_items else 0,
+            payments_version_count=versions if payment_items else 0,
+        )
+
+
+def _format(value, context):
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, dict):
+        return {key: _format(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_format(item, context) for item in value]
+    return value
+
+
+def _request_kwargs(payload):
+    """Test client arguments for an endpoint's data; files are rebuilt for every request."""
+    if isinstance(payload, bytes):
+        return {'data': payload, 'content_type': 'application/octet-stream'}
+    if isinstance(payload, dict) and any(isinstance(value, tuple) for value in payload.values()):
+        data = {
+            key: SimpleUploadedFile(*value) if isinstance(value, tuple) else value
+            for key, value in payload.items()
+        }
+        return {'data': data, 'format': 'multipart'}
+    return {'data': payload, 'format': 'json'}
+
+
+def _response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def run_benchmark(context, repeat=3, endpoints=None):
+    """Request each endpoint ``repeat`` times and return ``{name: measurements}``."""
+    clients = {
+        'anonymous': APIClient(),
+        'client': APIClient(),
+        'admin': APIClient(),
+    }
+    clients['client'].force_authenticate(context['client_user'])
+    clients['admin'].force_authenticate(context['admin_user'])
+
+    results = {}
+    for name, role, method, path, data in endpoints or ENDPOINTS:
+        url = _format(path, context)
+        payload = _format(data, context)
+        timings, queries, sizes, statuses = [], [], [], []
+        # Start every endpoint cold so cached responses do not hide queries
+        for cache in caches.all():
+            cache.clear()
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(clients[role], method)(url, **_request_kwargs(payload))
+                size = _response_size(response)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+            sizes.append(size)
+            statuses.append(response.status_code)
+
+        results[name] = {
+            'method': method.upper(),
+            'path': url,
+            'status': statuses[0],
+            'queries': queries[0],
+            'queries_warm': queries[-1],
+            'time_ms': round(statistics.median(timings), 2),
+            'time_ms_min': round(min(timings), 2),
+            'bytes': sizes[0],
+        }
+    return results
+
+
+def _walk_routes(patterns, prefix=''):
+    for pattern in patterns:
+        piece = str(pattern.pattern)
+        # Skip the router's API root and the ".json" format-suffix variants
+        if piece.lstrip('^') in ('', '$') or 'format>' in piece:
+            continue
+        # Resolved routes drop the leading "^" of regex patterns
+        route = prefix + piece.lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from _walk_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route
+
+
+def uncovered_routes(endpoints=None):
+    """Routes of ``api.urls`` that no benchmark endpoint reaches."""
+    from api import urls as api_urls
+
+    covered = set()
+    for _, _, _, path, _ in endpoints or ENDPOINTS:
+        try:
+            sample = re.sub(r'\{\w+\}', '1', path.split('?')[0])
+            covered.add(resolve(sample, urlconf='api.urls').route)
+        except Exception:
+            continue
+
+    return [route for route in _walk_routes(api_urls.urlpatterns) if route not in covered]
+
+
+def compare_with_baseline(results, baseline, time_tolerance=0.25, min_time_delta_ms=5.0):
+    """
+    Return a list of regressions against a previous report.
+
+    Any increase in query count is a regression; wall time counts only when
+    it grows by more than ``time_tolerance`` and ``min_time_delta_ms``.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        time_delta = current['time_ms'] - previous['time_ms']
+        if time_delta > min_time_delta_ms and current['time_ms'] > previous['time_ms'] * (1 + time_tolerance):
+            regressions.append(f"{name}: time {previous['time_ms']}ms -> {current['time_ms']}ms")
+        if current['status'] != previous['status']:
+            regressions.append(f"{name}: status {previous['status']} -> {current['status']}")
+    return regressions
@@ -0,0 +1,169 @@
+"""
+Cache building blocks used by the ``CACHES`` configuration.
+
+``TwoTierCache`` keeps a small in-process LRU (Django's LocMemCache) in
+front of a shared backend (Redis or the file cache). Reads hit the local
+tier first; writes go to both. Local copies live at most ``LOCAL_TIMEOUT``
+seconds, which bounds how stale another worker can be after a write or
+delete here.
+
+``get_or_compute`` adds stampede protection to expensive recomputes, and
+``namespace_version``/``bump_namespace`` invalidate a whole group of keys
+by changing the version embedded in them.
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from api import metrics
+
+
+_MISSING = object()
+
+# Version namespace of the cached admin dashboard payloads
+DASHBOARD_NAMESPACE = 'admin-dashboard'
+
+
+class TwoTierCache(BaseCache):
+    """
+    In-process LRU in front of a shared cache.
+
+    ``LOCATION`` names the local tier (instances with the same name share it
+    within a process). ``OPTIONS``: ``SHARED`` is a regular cache config dict,
+    ``LOCAL_MAX_ENTRIES`` and ``LOCAL_TIMEOUT`` size the local tier. Counters
+    (``incr``/``add``) are always resolved by the shared tier.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        shared = dict(options['SHARED'])
+        self.shared = import_string(shared.pop('BACKEND'))(shared.pop('LOCATION', ''), shared)
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.local = LocMemCache(f'two-tier:{location}', {
+            'TIMEOUT': self.local_timeout,
+            'OPTIONS': {'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000)},
+        })
+
+    def _local_timeout_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self.local.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(key, value, self._local_timeout_for(timeout), version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self.local.set(key, value, self._local_timeout_for(timeout), version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.decr(key, delta, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+def get_or_compute(cache, key, compute, timeout, lock_timeout=10, metric=None):
+    """
+    Return the cached value of ``key``, recomputing it with ``compute()`` at most once at a time.
+
+    Entries stay fresh for ``timeout`` seconds and are kept for as long again
+    afterwards. When an entry goes stale, the process that takes the
+    recompute lock refreshes it while the others keep serving the stale
+    value. On a cold miss the others wait up to ``lock_timeout`` seconds for
+    the result instead of all hitting the database.
+    """
+    entry = cache.get(key)
+    fresh = entry is not None and entry['fresh_until'] > time.time()
+    if metric:
+        metrics.record_cache_lookup(metric, fresh)
+    if fresh:
+        return entry['value']
+
+    lock_key = f'{key}:recompute'
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, {'value': value, 'fresh_until': time.time() + timeout}, timeout * 2)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return compute()
+
+
+def _namespace_key(namespace):
+    return f'namespace-version:{namespace}'
+
+
+def namespace_version(cache, namespace):
+    """Current version number of a group of keys (read from the shared tier)."""
+    shared = getattr(cache, 'shared', cache)
+    return shared.get_or_set(_namespace_key(namespace), 1, None)
+
+
+def bump_namespace(cache, namespace):
+    """Invalidate every key built with the previous ``namespace_version``."""
+    shared = getattr(cache, 'shared', cache)
+    key = _namespace_key(namespace)
+    shared.add(key, 1, None)
+    try:
+        shared.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); any new value differs from the old one
+        shared.set(key, int(time.time()), None)
+
+
+def invalidate_dashboard():
+    """Drop cached admin dashboards once the current transaction commits."""
+    transaction.on_commit(lambda: bump_namespace(caches['dashboard'], DASHBOARD_NAMESPACE))
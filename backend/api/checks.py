@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+
+@register(Tags.caches)
+def check_ratelimit_cache(app_configs, **kwargs):
+    """Rate limits are only global when their counters live in a shared, atomic cache."""
+    if not getattr(settings, 'RATELIMIT_ENABLE', True):
+        return []
+    alias = getattr(settings, 'RATELIMIT_USE_CACHE', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    if not issubclass(import_string(backend), LocMemCache):
+        return []
+    return [Warning(
+        f"Rate-limit cache '{alias}' is per-process, so every worker enforces its own limits.",
+        hint='Set CACHE_REDIS_URL to share the counters between workers.',
+        id='api.W001',
+    )]
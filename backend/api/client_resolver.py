@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from api import metrics
+from api.models import Client
+
+
+_NO_CLIENT = 'no-client'
+
+
+def client_cache_key(user_id):
+    """Cache key holding the client id of a user."""
+    return f"client_profile:user:{user_id}"
+
+
+def get_client_for_user(user):
+    """
+    Return the Client profile of a user, or None.
+
+    Only the user -> client id mapping is cached, for
+    ``CLIENT_PROFILE_CACHE_TIMEOUT`` seconds (0 disables it); the row itself
+    is always read fresh, so flags like ``is_active``/``is_deleted`` and the
+    related User are never stale. Admins (no profile) are answered from the
+    cache alone.
+    """
+    if not user or not user.is_authenticated:
+        return None
+
+    timeout = getattr(settings, 'CLIENT_PROFILE_CACHE_TIMEOUT', 0)
+    key = client_cache_key(user.pk)
+    queryset = Client.objects.select_related('user').filter(user=user)
+    if timeout:
+        cached = cache.get(key)
+        metrics.record_cache_lookup('client_profile', cached is not None)
+        if cached == _NO_CLIENT:
+            return None
+        if cached is not None:
+            client = queryset.filter(pk=cached).first()
+            if client is not None:
+                return client
+            # The profile was deleted or moved to another user: look it up again
+
+    client = queryset.first()
+    if timeout:
+        cache.set(key, client.pk if client is not None else _NO_CLIENT, timeout)
+    return client
+
+
+def get_request_client(request):
+    """
+    Client profile of the requesting user, resolved at most once per request.
+
+    Works with both DRF and plain Django requests; the result is memoized
+    on the underlying HttpRequest so permissions and views share it.
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    user_id = user.pk if user and user.is_authenticated else None
+
+    cached = getattr(http_request, '_resolved_client', None)
+    if cached is not None and cached[0] == user_id:
+        return cached[1]
+
+    client = get_client_for_user(user)
+    http_request._resolved_client = (user_id, client)
+    return client
+
+
+def invalidate_client_cache(user_id):
+    """Forget the cached client id of a user."""
+    cache.delete(client_cache_key(user_id))
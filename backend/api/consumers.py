@@ -0,0 +1,71 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from api.message_events import MESSAGE_READ_EVENT, conversation_group, read_state_payload
+from api.models import Client, Message
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live updates for one client conversation.
+
+    Admins may join any conversation, clients only their own. New messages
+    and read-receipt changes are pushed as ``{"event": ..., "payload": ...}``.
+    Sockets can mark the other side's messages as read with
+    ``{"action": "mark_read", "message_ids": [...]}``.
+    """
+
+    async def connect(self):
+        self.client_id = int(self.scope['url_route']['kwargs']['client_id'])
+        self.user = self.scope.get('user')
+        self.sender = await self._get_sender_role()
+        if self.sender is None:
+            await self.close(code=4403)
+            return
+
+        self.group_name = conversation_group(self.client_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('action') == 'mark_read':
+            message_ids = [
+                message_id for message_id in content.get('message_ids', [])
+                if isinstance(message_id, int)
+            ]
+            updated_ids = await self._mark_read(message_ids)
+            if updated_ids:
+                await self.channel_layer.group_send(self.group_name, {
+                    'type': 'chat.event',
+                    'event': MESSAGE_READ_EVENT,
+                    'payload': read_state_payload(updated_ids),
+                })
+
+    async def chat_event(self, event):
+        await self.send_json({'event': event['event'], 'payload': event['payload']})
+
+    @database_sync_to_async
+    def _get_sender_role(self):
+        """'admin' or 'client' if the user may join this conversation, otherwise None."""
+        user = self.user
+        if not user or not user.is_authenticated:
+            return None
+        if user.is_staff or user.is_superuser:
+            return 'admin' if Client.objects.filter(id=self.client_id).exists() else None
+        if Client.objects.filter(id=self.client_id, user=user).exists():
+            return 'client'
+        return None
+
+    @database_sync_to_async
+    def _mark_read(self, message_ids):
+        """Mark unread messages sent by the other side as read and return their ids."""
+        queryset = Message.objects.filter(
+            client_id=self.client_id, id__in=message_ids, is_read=False
+        ).exclude(sender=self.sender)
+        updated_ids = list(queryset.values_list('id', flat=True))
+        Message.objects.filter(id__in=updated_ids).update(is_read=True)
+        return updated_ids
@@ -0,0 +1,39 @@
+"""Identify uploaded files from their leading bytes rather than their names."""
+
+SIGNATURES = [
+    (b'%PDF-', 'pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+# Enough bytes to recognise every signature above
+SNIFF_BYTES = 16
+
+ALLOWED_UPLOAD_TYPES = {'jpg', 'png', 'gif', 'pdf'}
+
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+
+def sniff_file_type(head):
+    """Return 'pdf', 'png', 'jpg', 'gif' or None for the first bytes of a file."""
+    for signature, file_type in SIGNATURES:
+        if head.startswith(signature):
+            return file_type
+    return None
+
+
+def sniff_field_file(field_file):
+    """Sniff the type of a stored FileField value."""
+    field_file.open('rb')
+    try:
+        return sniff_file_type(field_file.read(SNIFF_BYTES))
+    finally:
+        field_file.close()
+
+
+def extension_type(name):
+    """Normalized type implied by a file name's extension."""
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return EXTENSION_ALIASES.get(extension, extension)
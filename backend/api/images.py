@@ -0,0 +1,164 @@
+import base64
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+
+IMAGE_FIELDS = ('image', 'before_image', 'after_image')
+
+DEFAULT_VARIANT_WIDTHS = {
+    'thumbnail': 320,
+    'medium': 768,
+    'large': 1600,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+PLACEHOLDER_WIDTH = 16
+
+# Originals carrying metadata are re-encoded in (the nearest) same format
+ORIGINAL_FORMATS = {
+    'JPEG': ('JPEG', {'quality': 90, 'optimize': True}),
+    'MPO': ('JPEG', {'quality': 90, 'optimize': True}),
+    'PNG': ('PNG', {'optimize': True}),
+    'WEBP': ('WEBP', {'quality': 90}),
+}
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment')
+
+
+def _variant_widths():
+    return getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_VARIANT_WIDTHS)
+
+
+def _encode(image, fmt):
+    """Encode an image without any metadata (EXIF is never copied)."""
+    pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _placeholder(image):
+    """Tiny blurred JPEG as a data URI, shown while the real image loads."""
+    width = PLACEHOLDER_WIDTH
+    height = max(1, round(image.height * width / image.width))
+    tiny = image.resize((width, height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'JPEG', quality=50)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+def image_without_metadata(file):
+    """
+    Re-encode an original image without EXIF/XMP (GPS position, camera, ...).
+
+    The EXIF orientation is applied first; the ICC profile and PNG
+    transparency are kept. Returns the new bytes, or None when the image
+    carries no metadata (or is in a format that is left as is).
+    """
+    file.seek(0)
+    with Image.open(file) as source:
+        pil_format, options = ORIGINAL_FORMATS.get(source.format, (None, None))
+        has_metadata = bool(source.getexif()) or any(key in source.info for key in METADATA_KEYS)
+        if pil_format is None or not has_metadata:
+            file.seek(0)
+            return None
+        options = dict(options)
+        for key in ('icc_profile', 'transparency'):
+            if source.info.get(key) is not None:
+                options[key] = source.info[key]
+        image = ImageOps.exif_transpose(source)
+
+    image.info = {}
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    file.seek(0)
+    return buffer.getvalue()
+
+
+def build_image_variants(field_file, directory):
+    """
+    Generate resized WebP/JPEG variants of an uploaded image.
+
+    The orientation stored in EXIF is applied before the metadata is dropped.
+    Variants are never upscaled. Returns the description stored in
+    ``WorkItem.image_variants`` for this field.
+    """
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as source:
+            image = ImageOps.exif_transpose(source)
+            image = image.convert('RGB')
+    finally:
+        field_file.close()
+
+    stem = os.path.splitext(os.path.basename(field_file.name))[0]
+    variants = {}
+    for name, width in sorted(_variant_widths().items(), key=lambda item: item[1]):
+        if width >= image.width:
+            resized = image
+        else:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+
+        variant = {'width': resized.width, 'height': resized.height}
+        for fmt in FORMATS:
+            path = f'{directory}/{stem}-{name}.{fmt}'
+            variant[fmt] = default_storage.save(path, ContentFile(_encode(resized, fmt)))
+        variants[name] = variant
+
+        if resized is image:
+            # Larger presets would be identical copies of the original size
+            break
+
+    return {
+        'source': field_file.name,
+        'width': image.width,
+        'height': image.height,
+        'placeholder': _placeholder(image),
+        'variants': variants,
+    }
+
+
+def delete_image_variants(info):
+    """Remove the files of one field's variants from storage."""
+    for variant in (info or {}).get('variants', {}).values():
+        for fmt in FORMATS:
+            if variant.get(fmt):
+                default_storage.delete(variant[fmt])
+
+
+def generate_work_item_variants(work_item):
+    """
+    (Re)build derivatives for every image field of a work item whose upload changed.
+
+    Fields that were cleared lose their variants. Saves ``image_variants``
+    only when something changed.
+    """
+    current = dict(work_item.image_variants or {})
+    updated = {}
+    for field in IMAGE_FIELDS:
+        field_file = getattr(work_item, field)
+        previous = current.get(field)
+        if not field_file:
+            delete_image_variants(previous)
+            continue
+        if previous and previous.get('source') == field_file.name:
+            updated[field] = previous
+            continue
+        delete_image_variants(previous)
+        updated[field] = build_image_variants(
+            field_file, f'work_items/variants/{work_item.pk}'
+        )
+
+    if updated != current:
+        work_item.image_variants = updated
+        work_item.save(update_fields=['image_variants', 'updated_at'])
+    return updated
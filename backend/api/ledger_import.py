@@ -0,0 +1,259 @@
+"""Bulk import of expenses and cash receipts from CSV or XLSX ledgers."""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from api.models import CashReceipt, Client, ClientFinancialSummary, Expense
+
+
+IMPORT_KINDS = {
+    'expenses': {
+        'model': Expense,
+        'required': ['date', 'description', 'amount'],
+        'optional': {'status': 'pending'},
+    },
+    'cash-receipts': {
+        'model': CashReceipt,
+        'required': ['date', 'amount'],
+        'optional': {},
+    },
+}
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Rows are inserted in batches of this size
+IMPORT_BATCH_SIZE = 500
+
+# Only the first errors are listed in the report; the count is always exact
+MAX_REPORTED_ERRORS = 500
+
+
+class ImportFormatError(Exception):
+    """The file as a whole cannot be read (bad format, missing columns...)."""
+
+
+def guess_format(name):
+    """'csv' or 'xlsx' from a file name, or None."""
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def _normalize_header(header):
+    return [str(column or '').strip().lower() for column in header]
+
+
+def _iter_csv(binary_file):
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield _normalize_header(header)
+        yield from reader
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+
+
+def _cell_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        # str() keeps 12.1 as '12.1' instead of a long binary expansion
+        return str(value)
+    return value
+
+
+def _iter_xlsx(binary_file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError('XLSX import requires the openpyxl package; upload a CSV file instead.')
+
+    try:
+        workbook = load_workbook(binary_file, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFormatError('The file is not a valid XLSX workbook.')
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield _normalize_header(header)
+        for row in rows:
+            yield [_cell_value(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def _data_rows(header, rows):
+    try:
+        for row_number, values in enumerate(rows, start=2):
+            if not any(str(value).strip() for value in values):
+                continue
+            yield row_number, dict(zip(header, values))
+    except UnicodeDecodeError:
+        raise ImportFormatError('CSV files must be UTF-8 encoded.')
+
+
+def read_ledger(binary_file, file_format):
+    """
+    Return ``(header, rows)`` for a ledger file.
+
+    ``rows`` lazily yields ``(row_number, {column: value})`` so large files
+    are never loaded into memory at once. Row numbers count the header as
+    row 1, like a spreadsheet.
+    """
+    if file_format == 'csv':
+        rows = _iter_csv(binary_file)
+    elif file_format == 'xlsx':
+        rows = _iter_xlsx(binary_file)
+    else:
+        raise ImportFormatError('Unsupported file format; use CSV or XLSX.')
+
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFormatError('The file is empty.')
+    except UnicodeDecodeError:
+        raise ImportFormatError('CSV files must be UTF-8 encoded.')
+    return header, _data_rows(header, rows)
+
+
+class LedgerImporter:
+    """
+    Validate ledger rows one by one and insert the valid ones with ``bulk_create``.
+
+    Every row needs a client, either from a ``client_id`` column or from the
+    ``client_id`` passed for the whole file. With ``partial=False`` any
+    invalid row cancels the whole import; ``dry_run`` only validates.
+    """
+
+    def __init__(self, kind, client_id=None, partial=False, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+        if kind not in IMPORT_KINDS:
+            raise ImportFormatError(f'Unknown import kind: {kind}')
+        self.kind = kind
+        self.config = IMPORT_KINDS[kind]
+        self.model = self.config['model']
+        self.client_id = client_id
+        self.partial = partial
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+
+        self.created = 0
+        self.valid_rows = 0
+        self.error_count = 0
+        self.errors = []
+        self._batch = []
+        self._client_ids = set()
+        self._known_clients = {}
+
+    def _client_exists(self, client_id):
+        if client_id not in self._known_clients:
+            self._known_clients[client_id] = Client.objects.filter(id=client_id).exists()
+        return self._known_clients[client_id]
+
+    def _check_columns(self, header):
+        missing = [column for column in self.config['required'] if column not in header]
+        if self.client_id is None and 'client_id' not in header:
+            missing.append('client_id')
+        if missing:
+            raise ImportFormatError(f"Missing required columns: {', '.join(missing)}")
+
+    def build_instance(self, values):
+        """Return ``(instance, None)`` for a valid row or ``(None, errors)``."""
+        errors = {}
+        cleaned = {}
+
+        raw_client = str(values.get('client_id', '') or '').strip()
+        client_id = self.client_id
+        if raw_client:
+            try:
+                client_id = int(float(raw_client))
+            except ValueError:
+                errors['client_id'] = ['Must be a valid integer.']
+        if client_id is None and 'client_id' not in errors:
+            errors['client_id'] = ['This field is required.']
+        elif 'client_id' not in errors and not self._client_exists(client_id):
+            errors['client_id'] = ['Client not found.']
+
+        fields = list(self.config['required']) + list(self.config['optional'])
+        for name in fields:
+            raw = values.get(name, '')
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if raw == '' and name in self.config['optional']:
+                raw = self.config['optional'][name]
+            try:
+                cleaned[name] = self.model._meta.get_field(name).clean(raw, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        if errors:
+            return None, errors
+        return self.model(client_id=client_id, **cleaned), None
+
+    def _flush(self):
+        if not self._batch:
+            return
+        if not self.dry_run:
+            self.model.objects.bulk_create(self._batch, batch_size=self.batch_size)
+        self.created += len(self._batch)
+        self._batch = []
+
+    def _rejected(self):
+        return bool(self.error_count) and not self.partial
+
+    def run(self, header, rows):
+        """Import ``(row_number, values)`` pairs read by ``read_ledger`` and return the report."""
+        self._check_columns(header)
+        with transaction.atomic():
+            for row_number, values in rows:
+                instance, errors = self.build_instance(values)
+                if errors:
+                    self.error_count += 1
+                    if len(self.errors) < MAX_REPORTED_ERRORS:
+                        self.errors.append({'row': row_number, 'errors': errors})
+                    continue
+
+                self.valid_rows += 1
+                # Once the import is doomed, only keep validating for the report
+                if self._rejected():
+                    continue
+                self._batch.append(instance)
+                self._client_ids.add(instance.client_id)
+                if len(self._batch) >= self.batch_size:
+                    self._flush()
+
+            if not self._rejected():
+                self._flush()
+
+            if self.dry_run or self._rejected():
+                transaction.set_rollback(True)
+            elif self._client_ids:
+                # bulk_create skips the signals that maintain the summaries
+                ClientFinancialSummary.objects.rebuild(sorted(self._client_ids))
+
+        return self.report()
+
+    def report(self):
+        imported = not self.dry_run and not self._rejected()
+        return {
+            'kind': self.kind,
+            'dry_run': self.dry_run,
+            'imported': imported,
+            'created': self.created if imported else 0,
+            'valid_rows': self.valid_rows,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def import_ledger(binary_file, file_format, kind, **options):
+    """Import a CSV/XLSX ledger file and return the per-row report."""
+    importer = LedgerImporter(kind, **options)
+    return importer.run(*read_ledger(binary_file, file_format))
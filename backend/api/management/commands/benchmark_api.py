@@ -0,0 +1,105 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from api.benchmark import compare_with_baseline, run_benchmark, seed_benchmark_data, uncovered_routes
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic data into a test database, request every API endpoint and '
+        'report query counts, wall time and response size (optionally against a baseline).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=20)
+        parser.add_argument('--expenses', type=int, default=50, help='Expenses per client.')
+        parser.add_argument('--receipts', type=int, default=10, help='Cash receipts per client.')
+        parser.add_argument('--messages', type=int, default=20, help='Messages per client.')
+        parser.add_argument('--versions', type=int, default=3, help='Expense and payment versions per client.')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per endpoint.')
+        parser.add_argument('--only', help='Only run endpoints whose name starts with this prefix.')
+        parser.add_argument(
+            '--output',
+            default='benchmark-report.json',
+            help='Where to write the JSON report.'
+        )
+        parser.add_argument('--baseline', help='Previous report to compare against.')
+        parser.add_argument(
+            '--time-tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed relative slowdown before a time regression is reported.'
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error when the comparison finds regressions.'
+        )
+
+    def handle(self, *args, **options):
+        if options['versions'] < 1 or options['clients'] < 1 or options['expenses'] < 1:
+            raise CommandError('--clients, --expenses and --versions must be at least 1.')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as handle:
+                    baseline = json.load(handle).get('endpoints', {})
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        from api.benchmark import ENDPOINTS
+        endpoints = [
+            endpoint for endpoint in ENDPOINTS
+            if not options['only'] or endpoint[0].startswith(options['only'])
+        ]
+
+        # Never touch the real database: everything runs in a test database
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            scale = {
+                key: options[key] for key in ('clients', 'expenses', 'receipts', 'messages', 'versions')
+            }
+            self.stdout.write(f'Seeding {scale} ...')
+            context = seed_benchmark_data(**scale)
+            results = run_benchmark(context, repeat=options['repeat'], endpoints=endpoints)
+            vendor = connection.vendor
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': vendor,
+            'scale': scale,
+            'repeat': options['repeat'],
+            'endpoints': results,
+            'uncovered_routes': uncovered_routes(),
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+        width = max(len(name) for name in results)
+        self.stdout.write(f"{'endpoint'.ljust(width)}  status  queries   time_ms     bytes")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name.ljust(width)}  {result['status']:>6}  {result['queries']:>7}  "
+                f"{result['time_ms']:>8}  {result['bytes']:>8}"
+            )
+        for route in report['uncovered_routes']:
+            self.stdout.write(self.style.WARNING(f'Not benchmarked: {route}'))
+        self.stdout.write(f"Report written to {os.path.abspath(options['output'])}")
+
+        if baseline is None:
+            return
+        regressions = compare_with_baseline(results, baseline, time_tolerance=options['time_tolerance'])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+        elif options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regressions against the baseline.')
@@ -0,0 +1,116 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+
+# (name, CONN_MAX_AGE, CONN_HEALTH_CHECKS); None means "as configured"
+MODES = [
+    ('reconnect', 0, False),
+    ('persistent', None, False),
+    ('persistent+health-checks', None, True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-request database connection overhead: a new connection per request '
+        'versus persistent connections (with and without health checks). Only runs SELECT 1.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode.')
+        parser.add_argument('--database', default='default', help='Database alias to measure.')
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            help='CONN_MAX_AGE used by the persistent modes (default: the configured value, or 60 if it is 0).'
+        )
+        parser.add_argument('--output', help='Also write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+        try:
+            connection = connections[options['database']]
+        except Exception as e:
+            raise CommandError(f'Unknown database: {e}')
+
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = connection.settings_dict.get('CONN_MAX_AGE') or 60
+
+        results = {}
+        for name, mode_max_age, health_checks in MODES:
+            results[name] = self._run(
+                connection,
+                options['requests'],
+                max_age if mode_max_age is None else mode_max_age,
+                health_checks,
+            )
+
+        self.stdout.write(
+            f"{connection.vendor} ({connection.settings_dict.get('HOST') or 'local'}), "
+            f"{options['requests']} requests per mode, max age {max_age}s"
+        )
+        self.stdout.write(f"{'mode':<26} {'connects':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<26} {result['connections_opened']:>8} {result['mean_ms']:>8} "
+                f"{result['p50_ms']:>8} {result['p95_ms']:>8}"
+            )
+        saved = results['reconnect']['mean_ms'] - results['persistent+health-checks']['mean_ms']
+        self.stdout.write(f'Connection setup cost per request: ~{saved:.2f} ms')
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'max_age': max_age,
+                'modes': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _run(self, connection, requests, max_age, health_checks):
+        """Replay the request_started/request_finished connection handling around one query."""
+        settings_dict = connection.settings_dict
+        original = (settings_dict.get('CONN_MAX_AGE'), settings_dict.get('CONN_HEALTH_CHECKS'))
+        settings_dict['CONN_MAX_AGE'] = max_age
+        settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+        connection.close()
+
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = original
+
+        timings.sort()
+        return {
+            'connections_opened': sum(1 for alias in opened if alias == connection.alias),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        }
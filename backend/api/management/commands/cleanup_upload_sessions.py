@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Abort chunked uploads that were abandoned and delete their temporary files.'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+        stale = UploadSession.objects.filter(status='uploading', updated_at__lt=cutoff)
+
+        count = 0
+        for session in stale.iterator():
+            session.discard_part()
+            count += 1
+        stale.update(status='aborted', updated_at=timezone.now())
+
+        self.stdout.write(self.style.SUCCESS(f'Aborted {count} abandoned uploads.'))
@@ -0,0 +1,82 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ledger_import import IMPORT_KINDS, ImportFormatError, guess_format, import_ledger
+from api.models import Client
+
+
+class Command(BaseCommand):
+    help = 'Bulk import expenses or cash receipts from a CSV/XLSX ledger file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORT_KINDS))
+        parser.add_argument('path', help='CSV or XLSX file to import.')
+        parser.add_argument(
+            '--client',
+            type=int,
+            dest='client_id',
+            help='Client id for files without a client_id column.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'xlsx'],
+            help='File format (guessed from the extension by default).'
+        )
+        parser.add_argument(
+            '--partial',
+            action='store_true',
+            help='Import the valid rows even if some rows fail.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without writing anything.'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full report as JSON.'
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or guess_format(options['path'])
+        if file_format is None:
+            raise CommandError('Cannot tell the file format; pass --format.')
+
+        client_id = options['client_id']
+        if client_id is not None and not Client.objects.filter(id=client_id).exists():
+            raise CommandError(f'Client {client_id} not found.')
+
+        try:
+            with open(options['path'], 'rb') as ledger:
+                report = import_ledger(
+                    ledger,
+                    file_format,
+                    options['kind'],
+                    client_id=client_id,
+                    partial=options['partial'],
+                    dry_run=options['dry_run'],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            for error in report['errors']:
+                details = '; '.join(
+                    f"{field}: {' '.join(messages)}" for field, messages in error['errors'].items()
+                )
+                self.stdout.write(f"Row {error['row']}: {details}")
+
+        summary = (
+            f"{report['valid_rows']} valid rows, {report['error_count']} invalid, "
+            f"{report['created']} created."
+        )
+        if report['imported'] or report['dry_run']:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            raise CommandError(f'Nothing imported: {summary}')
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import ClientFinancialSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild client financial summaries from expenses and cash receipts, or report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client',
+            type=int,
+            action='append',
+            dest='client_ids',
+            help='Only process this client id (can be repeated).'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored summaries with the source rows; do not write.'
+        )
+
+    def handle(self, *args, **options):
+        client_ids = options['client_ids']
+
+        drift = ClientFinancialSummary.objects.find_drift(client_ids)
+        for client_id, differences in sorted(drift.items()):
+            details = ', '.join(
+                f'{field}: stored={stored} actual={actual}'
+                for field, (stored, actual) in differences.items()
+            )
+            self.stdout.write(f'Client {client_id}: {details}')
+
+        if options['verify']:
+            if drift:
+                raise CommandError(f'{len(drift)} summaries have drifted.')
+            self.stdout.write(self.style.SUCCESS('All summaries match the source rows.'))
+            return
+
+        written = ClientFinancialSummary.objects.rebuild(client_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} summaries ({len(drift)} had drifted).'
+        ))
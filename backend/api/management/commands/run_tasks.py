@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.task_queue import requeue_stale_tasks, run_next_task
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (uploads post-processing, exports, ...).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the tasks that are currently due and exit.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default: 2).'
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_tasks()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale tasks.')
+
+        processed = 0
+        while True:
+            close_old_connections()
+            background_task = run_next_task()
+            if background_task is not None:
+                processed += 1
+                self.stdout.write(f'{background_task} ({background_task.attempts} attempts)')
+                continue
+
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} tasks.'))
@@ -0,0 +1,50 @@
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from api.images import IMAGE_FIELDS, image_without_metadata
+from api.models import WorkItem
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-save work item images uploaded before metadata stripping without their '
+        'EXIF/XMP data (GPS position, camera...).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the images that still carry metadata.'
+        )
+
+    def handle(self, *args, **options):
+        stripped = 0
+        for work_item in WorkItem.objects.order_by('id').iterator():
+            changed = []
+            for field in IMAGE_FIELDS:
+                field_file = getattr(work_item, field)
+                if not field_file:
+                    continue
+                try:
+                    with field_file.open('rb') as handle:
+                        data = image_without_metadata(handle)
+                except (OSError, ValueError) as e:
+                    self.stderr.write(f'Work item {work_item.pk} {field}: cannot read {field_file.name}: {e}')
+                    continue
+                if data is None:
+                    continue
+
+                self.stdout.write(f'Work item {work_item.pk} {field}: {field_file.name}')
+                if options['dry_run']:
+                    continue
+                name, storage = field_file.name, field_file.storage
+                storage.delete(name)
+                field_file.name = storage.save(name, ContentFile(data))
+                changed.append(field)
+
+            if changed:
+                work_item.save(update_fields=[*changed, 'updated_at'])
+                stripped += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'Stripped metadata from {stripped} images.'))
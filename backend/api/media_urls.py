@@ -0,0 +1,8 @@
+from django.urls import reverse
+
+
+def protected_file_url(kind, pk):
+    """Path of the authenticated download endpoint for a bill or attachment."""
+    # api.urls is included both at '' and 'api/'; reversing against the project
+    # URLconf would pick the '/api/api/...' copy
+    return reverse('download-protected-file', urlconf='api.urls', args=[kind, pk])
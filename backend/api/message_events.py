@@ -0,0 +1,65 @@
+import threading
+
+
+class MessageNotifier:
+    """
+    In-process wake-up signal for long-polling message sync requests.
+
+    Waiters block on a per-client generation counter that is bumped when a
+    message for that client is committed in this process. Messages written by
+    other worker processes are picked up by the periodic database re-check in
+    the sync view, so this only shortens latency for the common case.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generations = {}
+
+    def generation(self, client_id):
+        """Current generation for a client; pass it back to ``wait``."""
+        with self._condition:
+            return self._generations.get(client_id, 0)
+
+    def notify(self, client_id):
+        """Wake every request waiting on this client's conversation."""
+        with self._condition:
+            self._generations[client_id] = self._generations.get(client_id, 0) + 1
+            self._condition.notify_all()
+
+    def wait(self, client_id, generation, timeout):
+        """Block until the client's generation moves past ``generation`` or ``timeout`` elapses."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._generations.get(client_id, 0) != generation,
+                timeout=timeout
+            )
+
+
+message_notifier = MessageNotifier()
+
+
+def conversation_group(client_id):
+    """Channel layer group shared by the admin and client sockets of one conversation."""
+    return f'chat_client_{client_id}'
+
+
+MESSAGE_READ_EVENT = 'message.read'
+
+
+def read_state_payload(message_ids, is_read=True):
+    """Payload of ``message.read``, whether sent by a socket or by a saved message."""
+    return {'message_ids': list(message_ids), 'is_read': is_read}
+
+
+def broadcast_message_event(client_id, event_type, payload):
+    """Push a message event to every socket subscribed to the client's conversation."""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        conversation_group(client_id),
+        {'type': 'chat.event', 'event': event_type, 'payload': payload}
+    )
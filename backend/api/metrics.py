@@ -0,0 +1,190 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms live in a per-process registry guarded by a lock,
+so recording a value costs a dict update. When ``METRICS_MULTIPROC_DIR`` is
+set, each process also writes its totals to ``metrics-<pid>.json`` in that
+directory (at most every ``METRICS_FLUSH_INTERVAL`` seconds) and the
+``/metrics`` view sums every file, so the numbers cover all gunicorn
+workers. Clear the directory when the service is (re)started.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by view, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by view.'),
+    'db_queries_total': ('counter', 'Database queries executed, by view.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries, by view.'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit/miss).'),
+    'ratelimit_rejections_total': ('counter', 'Requests rejected by RateLimitMiddleware, by rule scope.'),
+    'upload_bytes_total': ('counter', 'Bytes received in upload request bodies, by view.'),
+    'version_snapshot_bytes': ('histogram', 'Serialized size of stored expense/payment versions.'),
+}
+
+HISTOGRAM_BUCKETS = {
+    'http_request_duration_seconds': DEFAULT_BUCKETS,
+    'version_snapshot_bytes': SIZE_BUCKETS,
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms for the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._last_flush = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name, value, labels=None):
+        buckets = HISTOGRAM_BUCKETS.get(name, DEFAULT_BUCKETS)
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['counts'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        """JSON-serializable copy of every value in this process."""
+        with self._lock:
+            return {
+                'counters': [[name, list(map(list, labels)), value] for (name, labels), value in self._counters.items()],
+                'histograms': [
+                    [name, list(map(list, labels)), list(h['counts']), h['sum'], h['count']]
+                    for (name, labels), h in self._histograms.items()
+                ],
+            }
+
+    def maybe_flush(self, force=False):
+        """Write this process's snapshot to the multiprocess directory when due."""
+        directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            return
+        self._last_flush = now
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temporary, path)
+
+
+registry = MetricsRegistry()
+atexit.register(lambda: registry.maybe_flush(force=True))
+
+
+def inc(name, labels=None, value=1):
+    if getattr(settings, 'METRICS_ENABLED', True):
+        registry.inc(name, labels, value)
+
+
+def observe(name, value, labels=None):
+    if getattr(settings, 'METRICS_ENABLED', True):
+        registry.observe(name, value, labels)
+
+
+def record_cache_lookup(cache_name, hit):
+    inc('cache_requests_total', {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+def _snapshots():
+    """Snapshots of every process: the live one plus the other workers' files."""
+    snapshots = [registry.snapshot()]
+    directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+    if not directory or not os.path.isdir(directory):
+        return snapshots
+
+    own_file = f'metrics-{os.getpid()}.json'
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json') or filename == own_file:
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            # A worker may be replacing its file right now
+            continue
+    return snapshots
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_metrics():
+    """Aggregate all processes and render the Prometheus text format."""
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in _snapshots():
+        for name, labels, value in snapshot.get('counters', []):
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, counts, total, count in snapshot.get('histograms', []):
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, {'counts': [0] * len(counts), 'sum': 0.0, 'count': 0})
+            merged['counts'] = [a + b for a, b in zip(merged['counts'], counts)]
+            merged['sum'] += total
+            merged['count'] += count
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if metric_type == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+
+        buckets = HISTOGRAM_BUCKETS.get(name, DEFAULT_BUCKETS)
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, histogram['counts']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", f"{bound:g}")])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {histogram["count"]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram["sum"])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
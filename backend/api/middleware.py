@@ -1,47 +1,127 @@
+import json
+import logging
+import math
+import random
+import re
 import time
-from django.core.cache import cache
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
 from django.http import JsonResponse
+from django.http.multipartparser import MultiPartParser, MultiPartParserError
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import metrics
 
 class RateLimitMiddleware(MiddlewareMixin):
-    """Custom rate limiting middleware"""
+    """
+    Sliding-window rate limiting on atomic cache counters.
+
+    Each client/route pair keeps two integer counters (current and previous
+    window) that are bumped with ``cache.incr``, so every request costs a
+    constant amount of work regardless of the limit. The previous window is
+    weighted by how much of it still overlaps the sliding window.
+
+    Limits come from ``RATELIMIT_DEFAULT``, ``RATELIMIT_USER_DEFAULT`` and the
+    per-route ``RATELIMIT_RULES`` in settings.
+    """
     
     def __init__(self, get_response):
         self.get_response = get_response
         super().__init__(get_response)
+        self.enabled = getattr(settings, 'RATELIMIT_ENABLE', True)
+        self.cache = caches[getattr(settings, 'RATELIMIT_USE_CACHE', 'default')]
+        self.default_rule = getattr(settings, 'RATELIMIT_DEFAULT', {'limit': 100, 'window': 60})
+        self.user_rule = getattr(settings, 'RATELIMIT_USER_DEFAULT', self.default_rule)
+        self.rules = getattr(settings, 'RATELIMIT_RULES', [])
     
     def process_request(self, request):
+        if not self.enabled:
+            return None
+
         # Skip rate limiting for admin users
         if hasattr(request, 'user') and request.user.is_authenticated:
             if request.user.is_staff or request.user.is_superuser:
                 return None
         
-        # Get client IP
-        ip_address = self.get_client_ip(request)
-        
-        # Rate limit: 100 requests per minute per IP
-        limit = 100
-        window = 60  # seconds
-        
-        cache_key = f"rate_limit:{ip_address}"
-        requests = cache.get(cache_key, [])
-        
-        # Remove old requests outside the window
-        current_time = time.time()
-        requests = [req_time for req_time in requests if current_time - req_time < window]
-        
-        if len(requests) >= limit:
-            return JsonResponse({
+        user_id = self.get_token_user_id(request)
+        if user_id is not None:
+            identity = f"user:{user_id}"
+        else:
+            identity = f"ip:{self.get_client_ip(request)}"
+
+        scope, limit, window = self.get_rule(request.path, authenticated=user_id is not None)
+
+        now = time.time()
+        window_start = int(now // window) * window
+        key = f"rate_limit:{scope}:{identity}"
+        current_key = f"{key}:{window_start}"
+        previous_key = f"{key}:{window_start - window}"
+
+        current = self.increment(current_key, window)
+        previous = self.cache.get(previous_key, 0)
+        overlap = (window - (now - window_start)) / window
+        estimated = previous * overlap + current
+
+        request.rate_limit = {
+            'limit': limit,
+            'remaining': max(0, limit - math.ceil(estimated)),
+            'reset': int(window_start + window - now) + 1,
+        }
+
+        if estimated > limit:
+            metrics.inc('ratelimit_rejections_total', {'scope': scope})
+            response = JsonResponse({
                 'error': 'Rate limit exceeded',
                 'message': f'Maximum {limit} requests per {window} seconds allowed'
             }, status=status.HTTP_429_TOO_MANY_REQUESTS)
-        
-        # Add current request
-        requests.append(current_time)
-        cache.set(cache_key, requests, window)
+            response['Retry-After'] = str(request.rate_limit['reset'])
+            return response
         
         return None
+
+    def process_response(self, request, response):
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit:
+            response['X-RateLimit-Limit'] = str(rate_limit['limit'])
+            response['X-RateLimit-Remaining'] = str(rate_limit['remaining'])
+            response['X-RateLimit-Reset'] = str(rate_limit['reset'])
+        return response
+
+    def increment(self, key, window):
+        """Atomically bump a window counter, creating it on first use."""
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Counter does not exist yet; keep it long enough to serve as "previous"
+            if self.cache.add(key, 1, timeout=window * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def get_rule(self, path, authenticated=False):
+        """Return (scope, limit, window) for the first matching route rule."""
+        for rule in self.rules:
+            if path.startswith(rule['path']):
+                return rule['path'], rule['limit'], rule['window']
+        rule = self.user_rule if authenticated else self.default_rule
+        return 'default', rule['limit'], rule['window']
+
+    def get_token_user_id(self, request):
+        """User id from a valid Bearer access token, so limits follow the user rather than the IP."""
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        parts = header.split()
+        if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+            return None
+        try:
+            return AccessToken(parts[1])[jwt_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
     
     def get_client_ip(self, request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -52,6 +132,182 @@ class RateLimitMiddleware(MiddlewareMixin):
         return ip
 
 
+instrumentation_logger = logging.getLogger('api.instrumentation')
+
+
+class _QueryRecorder:
+    """
+    ``execute_wrapper`` hook counting queries and SQL time.
+
+    Repeated statements are only tracked once ``detailed`` is set, so the
+    requests that are not sampled for instrumentation do not pay for it.
+    """
+
+    def __init__(self, detailed=False):
+        self.detailed = detailed
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.exact = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            if self.detailed:
+                self.statements[sql] += 1
+                self.exact[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Queries that repeated an earlier statement with identical parameters."""
+        return sum(count - 1 for count in self.exact.values() if count > 1)
+
+    def repeated_statements(self, threshold):
+        """Statements run at least ``threshold`` times (same SQL, any parameters)."""
+        return [
+            (sql, count) for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def _recording_queries(recorder):
+    """Pass every query on every database connection through ``recorder``."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Per-request SQL and timing instrumentation.
+
+    For a sampled share of requests (``REQUEST_INSTRUMENTATION_SAMPLE_RATE``)
+    every query is timed and logged as one JSON line on the
+    ``api.instrumentation`` logger. Statements repeated at least
+    ``REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD`` times are logged as a
+    likely N+1 at WARNING level. Unsampled requests pay only for one
+    ``random()`` call.
+
+    The queries are counted by the recorder ``MetricsMiddleware`` already
+    installed, if any. The totals are sent back in a ``Server-Timing``
+    header only in DEBUG or to staff users, since they reveal how a view
+    performs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_INSTRUMENTATION_ENABLED', True)
+        self.sample_rate = float(getattr(settings, 'REQUEST_INSTRUMENTATION_SAMPLE_RATE', 0.05))
+        self.n_plus_one_threshold = getattr(settings, 'REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 5)
+        self.server_timing = getattr(settings, 'REQUEST_INSTRUMENTATION_SERVER_TIMING', True)
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = getattr(request, '_query_recorder', None)
+        started = time.perf_counter()
+        if recorder is not None:
+            recorder.detailed = True
+            response = self.get_response(request)
+        else:
+            recorder = _QueryRecorder(detailed=True)
+            with _recording_queries(recorder):
+                response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        if self.server_timing and self.show_server_timing(request):
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'app;dur={(total - recorder.duration) * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        self.log(request, response, recorder, total)
+        return response
+
+    def show_server_timing(self, request):
+        if settings.DEBUG:
+            return True
+        # Set by AuthenticationMiddleware, or by DRF once it authenticated the token
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_authenticated and user.is_staff)
+
+    def log(self, request, response, recorder, total):
+        match = getattr(request, 'resolver_match', None)
+        repeated = recorder.repeated_statements(self.n_plus_one_threshold)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'db_ms': round(recorder.duration * 1000, 2),
+            'queries': recorder.count,
+            'duplicate_queries': recorder.duplicates,
+        }
+        if repeated:
+            record['n_plus_one'] = [
+                {'sql': sql[:200], 'count': count} for sql, count in repeated
+            ]
+            instrumentation_logger.warning(json.dumps(record))
+        else:
+            instrumentation_logger.info(json.dumps(record))
+
+
+class MetricsMiddleware:
+    """
+    Feed request, DB and upload statistics into ``api.metrics``.
+
+    Views are labelled by their URL name (never the raw path) to keep the
+    number of series bounded. The query recorder is left on the request for
+    ``RequestInstrumentationMiddleware`` to reuse.
+    """
+
+    upload_content_types = ('multipart/form-data', 'application/octet-stream')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        counter = request._query_recorder = _QueryRecorder()
+        started = time.perf_counter()
+        with _recording_queries(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        metrics.inc('http_requests_total', {
+            'view': view, 'method': request.method, 'status': response.status_code
+        })
+        metrics.observe('http_request_duration_seconds', duration, {'view': view})
+        if counter.count:
+            metrics.inc('db_queries_total', {'view': view}, counter.count)
+            metrics.inc('db_query_duration_seconds_total', {'view': view}, counter.duration)
+
+        content_type = request.META.get('CONTENT_TYPE', '')
+        if request.method in ('POST', 'PUT', 'PATCH') and content_type.startswith(self.upload_content_types):
+            try:
+                size = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                size = 0
+            if size:
+                metrics.inc('upload_bytes_total', {'view': view}, size)
+
+        metrics.registry.maybe_flush()
+        return response
+
+
 class SecurityHeadersMiddleware(MiddlewareMixin):
     """Add security headers to responses"""
     
@@ -81,29 +337,89 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 
 
 class InputValidationMiddleware(MiddlewareMixin):
-    """Basic input validation middleware"""
+    """
+    Basic input validation middleware.
+
+    Text-like bodies (JSON, form-urlencoded, ``text/*``) are scanned as bytes
+    with a single case-insensitive pattern. For multipart bodies only the
+    text fields are scanned: files are streamed to the upload handlers and
+    left to the file validators, so a whole upload is never buffered here.
+    Text larger than ``INPUT_VALIDATION_MAX_INSPECT_BYTES`` is rejected with
+    413, so padding cannot push content past the scanned part.
+    """
+
+    # Basic XSS patterns
+    xss_patterns = [
+        '<script', 'javascript:', 'onload=', 'onerror=',
+        'onclick=', 'onmouseover=', 'onfocus=', 'onblur=',
+        'eval(', 'expression('
+    ]
+    xss_regex = re.compile(
+        b'|'.join(re.escape(pattern.encode()) for pattern in xss_patterns),
+        re.IGNORECASE
+    )
+    inspected_content_types = (
+        'application/json',
+        'application/x-www-form-urlencoded',
+        'text/',
+    )
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.max_inspect_bytes = getattr(settings, 'INPUT_VALIDATION_MAX_INSPECT_BYTES', 1024 * 1024)
     
     def process_request(self, request):
         # Skip validation for safe methods
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return None
-        
-        # Check for potentially dangerous content
-        if hasattr(request, 'body') and request.body:
-            body_str = request.body.decode('utf-8', errors='ignore').lower()
-            
-            # Basic XSS patterns
-            xss_patterns = [
-                '<script', 'javascript:', 'onload=', 'onerror=',
-                'onclick=', 'onmouseover=', 'onfocus=', 'onblur=',
-                'eval(', 'expression('
-            ]
-            
-            for pattern in xss_patterns:
-                if pattern in body_str:
-                    return JsonResponse({
-                        'error': 'Invalid input detected',
-                        'message': 'Request contains potentially dangerous content'
-                    }, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type = request.META.get('CONTENT_TYPE', '').lower()
+        if content_type.startswith('multipart/form-data'):
+            try:
+                chunks = self._multipart_text_fields(request)
+            except MultiPartParserError:
+                return JsonResponse({'error': 'Malformed multipart body'}, status=status.HTTP_400_BAD_REQUEST)
+        elif content_type.startswith(self.inspected_content_types):
+            # Refuse oversized bodies before reading them
+            if self._content_length(request) > self.max_inspect_bytes:
+                return self._too_large_response()
+            chunks = [request.body]
+        else:
+            return None
+
+        if sum(len(chunk) for chunk in chunks) > self.max_inspect_bytes:
+            return self._too_large_response()
+
+        if any(self.xss_regex.search(chunk) for chunk in chunks):
+            return JsonResponse({
+                'error': 'Invalid input detected',
+                'message': 'Request contains potentially dangerous content'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         return None
+
+    def _content_length(self, request):
+        try:
+            return int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return 0
+
+    def _too_large_response(self):
+        return JsonResponse({
+            'error': 'Request body too large',
+            'message': f'Text content is limited to {self.max_inspect_bytes} bytes'
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def _multipart_text_fields(self, request):
+        """Encoded values of the non-file fields of a multipart body."""
+        if request.method == 'POST':
+            fields = request.POST
+        else:
+            # Django only parses POST bodies; parse PUT/PATCH the same way and
+            # leave the result on the request, where DRF picks it up
+            request._post, request._files = MultiPartParser(
+                request.META, request, request.upload_handlers, request.encoding
+            ).parse()
+            fields = request._post
+
+        return [value.encode() for _key, values in fields.lists() for value in values]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max, Q, Sum
+
+
+def build_summaries(apps, schema_editor):
+    Client = apps.get_model('api', 'Client')
+    Expense = apps.get_model('api', 'Expense')
+    CashReceipt = apps.get_model('api', 'CashReceipt')
+    ClientFinancialSummary = apps.get_model('api', 'ClientFinancialSummary')
+
+    expenses = {
+        row['client_id']: row
+        for row in Expense.objects.filter(client__isnull=False).values('client_id').annotate(
+            expenses_total=Sum('amount'),
+            expenses_paid=Sum('amount', filter=Q(status='paid')),
+            expenses_pending=Sum('amount', filter=Q(status='pending')),
+            expenses_upcoming=Sum('amount', filter=Q(status='upcoming')),
+            expenses_count=Count('id'),
+            last_expense_change_at=Max('updated_at'),
+        )
+    }
+    receipts = {
+        row['client_id']: row
+        for row in CashReceipt.objects.filter(client__isnull=False).values('client_id').annotate(
+            receipts_total=Sum('amount'),
+            receipts_count=Count('id'),
+            last_receipt_change_at=Max('updated_at'),
+        )
+    }
+
+    summaries = []
+    for client_id in Client.objects.values_list('id', flat=True):
+        values = {}
+        values.update(expenses.get(client_id, {}))
+        values.update(receipts.get(client_id, {}))
+        values.pop('client_id', None)
+        summaries.append(ClientFinancialSummary(
+            client_id=client_id,
+            **{field: value for field, value in values.items() if value is not None}
+        ))
+    ClientFinancialSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_alter_client_options_alter_expenseversion_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientFinancialSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expenses_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expenses_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expenses_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expenses_upcoming', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expenses_count', models.IntegerField(default=0)),
+                ('receipts_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('receipts_count', models.IntegerField(default=0)),
+                ('last_expense_change_at', models.DateTimeField(blank=True, help_text='When an expense of this client last changed', null=True)),
+                ('last_receipt_change_at', models.DateTimeField(blank=True, help_text='When a cash receipt of this client last changed', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.OneToOneField(help_text='Client these totals belong to', on_delete=django.db.models.deletion.CASCADE, related_name='financial_summary', to='api.client')),
+            ],
+            options={
+                'verbose_name': 'Client Financial Summary',
+                'verbose_name_plural': 'Client Financial Summaries',
+                'db_table': 'client_financial_summaries',
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_client_financial_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashreceipt',
+            index=models.Index(fields=['client', 'created_at', 'id'], name='api_cashrec_client__ede0ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cashreceipt',
+            index=models.Index(fields=['created_at', 'id'], name='api_cashrec_created_d0ba4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['client', 'date', 'id'], name='api_expense_client__271f91_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date', 'id'], name='api_expense_date_07779e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['client', 'timestamp', 'id'], name='api_message_client__005121_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_add_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['client', 'id'], name='api_message_client__d5c410_idx'),
+        ),
+    ]
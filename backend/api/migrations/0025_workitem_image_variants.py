@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_message_client_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workitem',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
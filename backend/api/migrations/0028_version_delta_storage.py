@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseversion',
+            name='delta',
+            field=models.JSONField(blank=True, help_text='Changes from the previous version: added, changed and removed items', null=True),
+        ),
+        migrations.AddField(
+            model_name='expenseversion',
+            name='is_checkpoint',
+            field=models.BooleanField(default=True, help_text='Whether the full snapshot is stored (otherwise only the delta)'),
+        ),
+        migrations.AddField(
+            model_name='paymentversion',
+            name='delta',
+            field=models.JSONField(blank=True, help_text='Changes from the previous version: added, changed and removed items', null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentversion',
+            name='is_checkpoint',
+            field=models.BooleanField(default=True, help_text='Whether the full snapshot is stored (otherwise only the delta)'),
+        ),
+        migrations.AlterField(
+            model_name='expenseversion',
+            name='expenses_data',
+            field=models.JSONField(blank=True, help_text='Serialized expense data at the time of version creation (checkpoints only)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='paymentversion',
+            name='payments_data',
+            field=models.JSONField(blank=True, help_text='Serialized payment data at the time of version creation (checkpoints only)', null=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:22
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def _apply_delta(items, delta):
+    removed = set(delta.get('removed', []))
+    changed = {item['id']: item for item in delta.get('changed', [])}
+    result = [changed.get(item['id'], item) for item in items if item['id'] not in removed]
+    result.extend(delta.get('added', []))
+    return result
+
+
+def _fill_totals(Version, payload_field):
+    items = []
+    to_update = []
+    for version in Version.objects.order_by('client_id', 'version_number').iterator():
+        if version.is_checkpoint:
+            items = getattr(version, payload_field) or []
+        else:
+            items = _apply_delta(items, version.delta or {})
+
+        total = Decimal('0')
+        for item in items:
+            try:
+                total += Decimal(str(item.get('amount', 0)))
+            except (InvalidOperation, AttributeError):
+                continue
+        version.item_count = len(items)
+        version.total_amount = total
+        to_update.append(version)
+    Version.objects.bulk_update(to_update, ['item_count', 'total_amount'], batch_size=500)
+
+
+def fill_version_totals(apps, schema_editor):
+    _fill_totals(apps.get_model('api', 'ExpenseVersion'), 'expenses_data')
+    _fill_totals(apps.get_model('api', 'PaymentVersion'), 'payments_data')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_version_delta_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseversion',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of items in this version'),
+        ),
+        migrations.AddField(
+            model_name='expenseversion',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of item amounts in this version', max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='paymentversion',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of items in this version'),
+        ),
+        migrations.AddField(
+            model_name='paymentversion',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of item amounts in this version', max_digits=14),
+        ),
+        migrations.RunPython(fill_version_totals, migrations.RunPython.noop),
+    ]
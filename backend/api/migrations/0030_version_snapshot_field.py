@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:50
+
+import api.models.version_models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_version_stored_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expenseversion',
+            name='delta',
+            field=api.models.version_models.SnapshotJSONField(blank=True, help_text='Changes from the previous version: added, changed and removed items', null=True),
+        ),
+        migrations.AlterField(
+            model_name='expenseversion',
+            name='expenses_data',
+            field=api.models.version_models.SnapshotJSONField(blank=True, help_text='Serialized expense data at the time of version creation (checkpoints only)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='paymentversion',
+            name='delta',
+            field=api.models.version_models.SnapshotJSONField(blank=True, help_text='Changes from the previous version: added, changed and removed items', null=True),
+        ),
+        migrations.AlterField(
+            model_name='paymentversion',
+            name='payments_data',
+            field=api.models.version_models.SnapshotJSONField(blank=True, help_text='Serialized payment data at the time of version creation (checkpoints only)', null=True),
+        ),
+    ]
@@ -5,4 +5,7 @@ from .progress import ProjectProgress
 from .message import Message
 from .cash_receipt import CashReceipt
 from .work_item import WorkItem
-from .version_models import ExpenseVersion, PaymentVersion
\ No newline at end of file
+from .version_models import ExpenseVersion, PaymentVersion
+from .financial_summary import ClientFinancialSummary
+from .background_task import BackgroundTask
+from .upload_session import UploadSession
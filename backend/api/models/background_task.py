@@ -0,0 +1,53 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class BackgroundTask(models.Model):
+    """A unit of deferred work executed by ``api.task_queue``."""
+
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('succeeded', _('Succeeded')),
+        ('failed', _('Failed')),
+    ]
+
+    name = models.CharField(
+        max_length=100,
+        help_text=_("Registered task name")
+    )
+
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+
+    run_after = models.DateTimeField(
+        help_text=_("Earliest time the task may run (used for retry backoff)")
+    )
+
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'background_tasks'
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['name', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
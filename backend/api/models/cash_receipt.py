@@ -20,5 +20,12 @@ class CashReceipt(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination ordered by (created_at, id), per client and system-wide
+            models.Index(fields=['client', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     def __str__(self):
         return f"Cash Receipt - {self.amount} for {self.client}"
@@ -1,4 +1,8 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
@@ -16,6 +20,35 @@ class ClientManager(models.Manager):
         """Get client by username."""
         return self.filter(user__username=username).first()
 
+    def with_expense_summary(self):
+        """
+        Annotate clients with their expense and receipt totals.
+
+        Adds ``expenses_total``, ``expenses_paid``, ``expenses_pending``,
+        ``expenses_upcoming``, ``expenses_count``, ``receipts_total`` and
+        ``receipts_count``, read through a join on the materialized
+        ``ClientFinancialSummary`` row instead of aggregating raw expenses.
+        """
+        def _amount(field):
+            return Coalesce(
+                F(f'financial_summary__{field}'),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+
+        def _count(field):
+            return Coalesce(F(f'financial_summary__{field}'), Value(0))
+
+        return self.annotate(
+            expenses_total=_amount('expenses_total'),
+            expenses_paid=_amount('expenses_paid'),
+            expenses_pending=_amount('expenses_pending'),
+            expenses_upcoming=_amount('expenses_upcoming'),
+            expenses_count=_count('expenses_count'),
+            receipts_total=_amount('receipts_total'),
+            receipts_count=_count('receipts_count'),
+        )
+
 
 class Client(models.Model):
     """Model representing a client with comprehensive validation."""
@@ -168,8 +201,15 @@ class Client(models.Model):
         if self.is_deleted:
             self.is_active = False
         
-        # Call full_clean to run validation
-        self.full_clean()
+        # Call full_clean to run validation; partial saves only check the
+        # fields being written
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.full_clean()
+        else:
+            self.clean_fields(exclude=[
+                field.name for field in self._meta.fields if field.name not in update_fields
+            ])
         
         super().save(*args, **kwargs)
 
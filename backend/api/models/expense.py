@@ -33,5 +33,12 @@ class Expense(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination ordered by (date, id), per client and system-wide
+            models.Index(fields=['client', 'date', 'id']),
+            models.Index(fields=['date', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.description} - {self.amount}"
\ No newline at end of file
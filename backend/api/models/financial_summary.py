@@ -0,0 +1,217 @@
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from api.caching import invalidate_dashboard
+from .client import Client
+
+
+EXPENSE_STATUS_FIELDS = {
+    'paid': 'expenses_paid',
+    'pending': 'expenses_pending',
+    'upcoming': 'expenses_upcoming',
+}
+
+SUMMARY_FIELDS = [
+    'expenses_total', 'expenses_paid', 'expenses_pending', 'expenses_upcoming',
+    'expenses_count', 'receipts_total', 'receipts_count',
+]
+
+
+def _to_decimal(value):
+    """Convert amounts that may still be strings/floats on unsaved instances."""
+    return Decimal(str(value or 0))
+
+
+class ClientFinancialSummaryManager(models.Manager):
+    """Manager that keeps summary rows in step with expenses and receipts."""
+
+    def compute_from_source(self, client_ids=None):
+        """Aggregate raw Expense/CashReceipt rows into summary values per client id."""
+        from .expense import Expense
+        from .cash_receipt import CashReceipt
+
+        expenses = Expense.objects.filter(client__isnull=False)
+        receipts = CashReceipt.objects.filter(client__isnull=False)
+        if client_ids is not None:
+            expenses = expenses.filter(client_id__in=client_ids)
+            receipts = receipts.filter(client_id__in=client_ids)
+
+        status_sums = {
+            field: Sum('amount', filter=Q(status=status))
+            for status, field in EXPENSE_STATUS_FIELDS.items()
+        }
+        expense_rows = expenses.values('client_id').annotate(
+            expenses_total=Sum('amount'),
+            expenses_count=Count('id'),
+            last_expense_change_at=models.Max('updated_at'),
+            **status_sums
+        )
+        receipt_rows = receipts.values('client_id').annotate(
+            receipts_total=Sum('amount'),
+            receipts_count=Count('id'),
+            last_receipt_change_at=models.Max('updated_at'),
+        )
+
+        totals = {}
+        for row in list(expense_rows) + list(receipt_rows):
+            values = totals.setdefault(row.pop('client_id'), {})
+            values.update(row)
+
+        for values in totals.values():
+            for field in SUMMARY_FIELDS:
+                if values.get(field) is None:
+                    values[field] = 0
+        return totals
+
+    def rebuild(self, client_ids=None):
+        """Recompute summary rows from scratch. Returns the number of rows written."""
+        clients = Client.objects.all()
+        if client_ids is not None:
+            clients = clients.filter(id__in=client_ids)
+        client_ids = list(clients.values_list('id', flat=True))
+        totals = self.compute_from_source(client_ids)
+        now = timezone.now()
+
+        with transaction.atomic():
+            existing = {
+                summary.client_id: summary
+                for summary in self.select_for_update().filter(client_id__in=client_ids)
+            }
+            to_create, to_update = [], []
+            for client_id in client_ids:
+                values = totals.get(client_id, {})
+                summary = existing.get(client_id) or self.model(client_id=client_id)
+                for field in SUMMARY_FIELDS:
+                    setattr(summary, field, values.get(field, 0))
+                summary.last_expense_change_at = values.get('last_expense_change_at')
+                summary.last_receipt_change_at = values.get('last_receipt_change_at')
+                summary.updated_at = now
+                (to_update if summary.pk else to_create).append(summary)
+
+            self.bulk_create(to_create, batch_size=500)
+            self.bulk_update(
+                to_update,
+                SUMMARY_FIELDS + ['last_expense_change_at', 'last_receipt_change_at', 'updated_at'],
+                batch_size=500
+            )
+        invalidate_dashboard()
+        return len(to_create) + len(to_update)
+
+    def find_drift(self, client_ids=None):
+        """Return {client_id: {field: (stored, actual)}} for rows that disagree with the source."""
+        totals = self.compute_from_source(client_ids)
+        clients = Client.objects.all()
+        if client_ids is not None:
+            clients = clients.filter(id__in=client_ids)
+        stored = {
+            row['client_id']: row
+            for row in self.filter(client__in=clients).values('client_id', *SUMMARY_FIELDS)
+        }
+
+        drift = {}
+        for client_id in clients.values_list('id', flat=True):
+            actual = totals.get(client_id, {})
+            row = stored.get(client_id)
+            differences = {}
+            for field in SUMMARY_FIELDS:
+                expected = actual.get(field, 0)
+                current = row[field] if row else None
+                if current is None or _to_decimal(current) != _to_decimal(expected):
+                    differences[field] = (current, expected)
+            if differences:
+                drift[client_id] = differences
+        return drift
+
+    def _apply(self, client_id, changes, rebuild_if_missing):
+        """Apply F() deltas to one summary row, rebuilding it if it does not exist yet."""
+        updated = self.filter(client_id=client_id).update(updated_at=timezone.now(), **changes)
+        if not updated and rebuild_if_missing:
+            self.rebuild([client_id])
+        elif updated:
+            invalidate_dashboard()
+
+    def apply_expense_change(self, client_id, amount, status, sign=1):
+        """Add (sign=1) or remove (sign=-1) one expense from a client's summary."""
+        if client_id is None:
+            # No summary row, but the admin dashboard totals include these expenses
+            invalidate_dashboard()
+            return
+        delta = _to_decimal(amount) * sign
+        changes = {
+            'expenses_total': F('expenses_total') + delta,
+            'expenses_count': F('expenses_count') + sign,
+            'last_expense_change_at': timezone.now(),
+        }
+        status_field = EXPENSE_STATUS_FIELDS.get(status)
+        if status_field:
+            changes[status_field] = F(status_field) + delta
+        self._apply(client_id, changes, rebuild_if_missing=sign > 0)
+
+    def apply_receipt_change(self, client_id, amount, sign=1):
+        """Add (sign=1) or remove (sign=-1) one cash receipt from a client's summary."""
+        if client_id is None:
+            return
+        changes = {
+            'receipts_total': F('receipts_total') + _to_decimal(amount) * sign,
+            'receipts_count': F('receipts_count') + sign,
+            'last_receipt_change_at': timezone.now(),
+        }
+        self._apply(client_id, changes, rebuild_if_missing=sign > 0)
+
+
+class ClientFinancialSummary(models.Model):
+    """Materialized expense and cash receipt totals, one row per client."""
+
+    client = models.OneToOneField(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='financial_summary',
+        help_text=_("Client these totals belong to")
+    )
+
+    expenses_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expenses_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expenses_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expenses_upcoming = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expenses_count = models.IntegerField(default=0)
+
+    receipts_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    receipts_count = models.IntegerField(default=0)
+
+    last_expense_change_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When an expense of this client last changed")
+    )
+
+    last_receipt_change_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When a cash receipt of this client last changed")
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ClientFinancialSummaryManager()
+
+    class Meta:
+        db_table = 'client_financial_summaries'
+        verbose_name = _('Client Financial Summary')
+        verbose_name_plural = _('Client Financial Summaries')
+
+    def __str__(self):
+        return f"Financial summary for client {self.client_id}"
+
+    def as_expenses_summary(self):
+        """Expenses summary in the shape used by the dashboards."""
+        return {
+            'total': float(self.expenses_total),
+            'paid': float(self.expenses_paid),
+            'pending': float(self.expenses_pending),
+            'upcoming': float(self.expenses_upcoming),
+            'count': self.expenses_count
+        }
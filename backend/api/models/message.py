@@ -16,6 +16,12 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Keyset pagination of a conversation ordered by (timestamp, id)
+            models.Index(fields=['client', 'timestamp', 'id']),
+            # Incremental sync: messages of a conversation after a known id
+            models.Index(fields=['client', 'id']),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender} to {self.client.user.username} at {self.timestamp}"
\ No newline at end of file
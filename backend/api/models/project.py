@@ -40,7 +40,11 @@ class Project(models.Model):
     # ⬇️⬇️⬇️ مهم جدًا: methods جوه الكلاس ⬇️⬇️⬇️
     @property
     def total_spent(self):
-        result = self.expenses.aggregate(total=Sum('amount'))['total']
+        # Expenses belong to the client, and their total is kept in the client's financial summary
+        summary = getattr(self.client, 'financial_summary', None)
+        if summary is not None:
+            return summary.expenses_total
+        result = self.client.expenses.aggregate(total=Sum('amount'))['total']
         return result or 0
 
     @property
@@ -0,0 +1,70 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload of a bill or message attachment."""
+
+    TARGET_CHOICES = [
+        ('expense_bill', _('Expense bill')),
+        ('message_file', _('Message file')),
+    ]
+
+    STATUS_CHOICES = [
+        ('uploading', _('Uploading')),
+        ('completed', _('Completed')),
+        ('aborted', _('Aborted')),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    detected_type = models.CharField(max_length=10, blank=True, default='')
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='uploading'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'upload_sessions'
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_size}/{self.total_size})"
+
+    @property
+    def part_path(self):
+        """Temporary file the chunks are appended to."""
+        return os.path.join(settings.CHUNKED_UPLOAD_TEMP_DIR, f'{self.id}.part')
+
+    @property
+    def is_complete(self):
+        return self.received_size == self.total_size
+
+    def discard_part(self):
+        """Remove the temporary file, if any."""
+        try:
+            os.remove(self.part_path)
+        except FileNotFoundError:
+            pass
@@ -1,6 +1,12 @@
-from django.db import models
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from api import metrics
 from .client import Client
 
 
@@ -15,6 +21,121 @@ class BaseVersionManager(models.Manager):
         """Get the latest version for a client."""
         return self.filter(client=client).order_by('-version_number').first()
 
+    def allocate_version_number(self, client):
+        """
+        Take the next version number of ``client`` and mark its discussion completed.
+
+        ``client`` must have been loaded with ``select_for_update()`` inside
+        the current transaction, so concurrent callers wait for each other
+        instead of colliding on the same number.
+        """
+        prefix = self.model.client_field_prefix
+        version_number = getattr(client, f'{prefix}_version_count') + 1
+
+        setattr(client, f'{prefix}_version_count', version_number)
+        setattr(client, f'{prefix}_discussion_completed', True)
+        setattr(client, f'{prefix}_discussion_completed_at', timezone.now())
+        client.save(update_fields=[
+            f'{prefix}_version_count',
+            f'{prefix}_discussion_completed',
+            f'{prefix}_discussion_completed_at',
+            'updated_at',
+        ])
+        return version_number
+
+    def reconstruct(self, client, version_number):
+        """
+        Rebuild the full item list of one version.
+
+        Loads the nearest checkpoint at or before ``version_number`` and
+        replays the deltas stored after it. Returns None if the version
+        does not exist.
+        """
+        checkpoint = self.filter(
+            client=client, version_number__lte=version_number, is_checkpoint=True
+        ).order_by('-version_number').first()
+        if checkpoint is None:
+            return None
+
+        items = checkpoint.get_payload()
+        if checkpoint.version_number == version_number:
+            return items
+
+        deltas = self.filter(
+            client=client,
+            version_number__gt=checkpoint.version_number,
+            version_number__lte=version_number,
+        ).order_by('version_number').only('version_number', 'is_checkpoint', 'delta')
+        last_number = checkpoint.version_number
+        for version in deltas:
+            self._check_contiguous(last_number, version)
+            items = self.model.apply_delta(items, version.delta)
+            last_number = version.version_number
+        return items if last_number == version_number else None
+
+    @staticmethod
+    def _check_contiguous(previous_number, version):
+        """A delta only applies on top of the version right before it."""
+        if not version.is_checkpoint and version.version_number != previous_number + 1:
+            raise ValidationError({'version_number': _(
+                'Version %(number)s is missing; the versions stored as changes after it cannot be rebuilt.'
+            ) % {'number': previous_number + 1}})
+
+    def materialize_successor(self, client_id, version_number):
+        """
+        Store the version after ``version_number`` as a full checkpoint.
+
+        Called before a version is edited or deleted, so the next version
+        no longer depends on it.
+        """
+        successor = self.filter(
+            client_id=client_id, version_number=version_number + 1, is_checkpoint=False
+        ).only('pk').first()
+        if successor is None:
+            return
+        items = self.reconstruct(client_id, version_number + 1)
+        self.filter(pk=successor.pk).update(
+            is_checkpoint=True, delta=None, **{self.model.payload_field: items}
+        )
+
+    def create_snapshot(self, client, version_number, items, **fields):
+        """
+        Store ``items`` as a new version.
+
+        ``version_number`` must come from ``allocate_version_number`` so the
+        sequence checks in ``clean`` can be skipped. In ``'delta'`` storage mode only the difference from the previous
+        version is stored, with a full checkpoint every
+        ``VERSION_CHECKPOINT_INTERVAL`` versions.
+        """
+        version = self.model(client=client, version_number=version_number, **fields)
+        version._version_number_allocated = True
+        interval = getattr(settings, 'VERSION_CHECKPOINT_INTERVAL', 10)
+        delta_mode = getattr(settings, 'VERSION_STORAGE_MODE', 'delta') == 'delta'
+
+        previous_items = None
+        if delta_mode and version_number > 1 and (version_number - 1) % interval:
+            previous_items = self.reconstruct(client, version_number - 1)
+
+        if previous_items is None:
+            version.is_checkpoint = True
+            version.set_payload(items)
+        else:
+            version.is_checkpoint = False
+            version.set_payload(None)
+            version.delta = self.model.compute_delta(previous_items, items)
+            version._full_items = items
+        version.save()
+
+        stored_field = self.model.payload_field if version.is_checkpoint else 'delta'
+        size = getattr(version, '_json_sizes', {}).get(stored_field)
+        if size is not None:
+            metrics.observe(
+                'version_snapshot_bytes',
+                size,
+                {'model': self.model.__name__, 'storage': 'checkpoint' if version.is_checkpoint else 'delta'}
+            )
+        return version
+
 
 class ExpenseVersionManager(BaseVersionManager):
     """Manager for ExpenseVersion model."""
@@ -26,6 +147,20 @@ class PaymentVersionManager(BaseVersionManager):
     pass
 
 
+class SnapshotJSONField(models.JSONField):
+    """JSONField that remembers the size of the JSON it serializes during validation."""
+
+    def validate(self, value, model_instance):
+        # JSONField.validate serializes the value only to check it; keep the length
+        super(models.JSONField, self).validate(value, model_instance)
+        try:
+            size = len(json.dumps(value, cls=self.encoder))
+        except TypeError:
+            raise ValidationError(self.error_messages['invalid'], code='invalid', params={'value': value})
+        if model_instance is not None:
+            model_instance.__dict__.setdefault('_json_sizes', {})[self.attname] = size
+
+
 class BaseVersionModel(models.Model):
     """Abstract base model for version tracking."""
     
@@ -54,6 +189,36 @@ class BaseVersionModel(models.Model):
         help_text=_("When this version was last updated")
     )
 
+    is_checkpoint = models.BooleanField(
+        default=True,
+        help_text=_("Whether the full snapshot is stored (otherwise only the delta)")
+    )
+
+    delta = SnapshotJSONField(
+        null=True,
+        blank=True,
+        help_text=_("Changes from the previous version: added, changed and removed items")
+    )
+
+    item_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of items in this version")
+    )
+
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of item amounts in this version")
+    )
+
+    # Name of the JSON field holding the full snapshot, set by subclasses
+    payload_field = None
+    # Fields every snapshot item must contain, set by subclasses
+    required_item_fields = ['id']
+    # Prefix of the Client counter/discussion fields, set by subclasses
+    client_field_prefix = None
+
     class Meta:
         abstract = True
         indexes = [
@@ -71,6 +236,92 @@ class BaseVersionModel(models.Model):
         """Get the model name for string representation."""
         return self.__class__.__name__.replace('Version', '')
 
+    @staticmethod
+    def compute_delta(previous_items, items):
+        """Difference between two snapshots, keyed by item id."""
+        previous_by_id = {item['id']: item for item in previous_items}
+        current_ids = set()
+        added, changed = [], []
+        for item in items:
+            current_ids.add(item['id'])
+            previous = previous_by_id.get(item['id'])
+            if previous is None:
+                added.append(item)
+            elif previous != item:
+                changed.append(item)
+        removed = [item_id for item_id in previous_by_id if item_id not in current_ids]
+        return {'added': added, 'changed': changed, 'removed': removed}
+
+    @staticmethod
+    def apply_delta(items, delta):
+        """Apply a delta produced by ``compute_delta`` to a snapshot."""
+        removed = set(delta.get('removed', []))
+        changed = {item['id']: item for item in delta.get('changed', [])}
+        result = [
+            changed.get(item['id'], item)
+            for item in items
+            if item['id'] not in removed
+        ]
+        result.extend(delta.get('added', []))
+        return result
+
+    def get_payload(self):
+        return getattr(self, self.payload_field)
+
+    def set_payload(self, items):
+        setattr(self, self.payload_field, items)
+
+    def get_items(self):
+        """Full snapshot of this version, reconstructed from deltas if needed."""
+        if self.is_checkpoint:
+            return self.get_payload()
+        if getattr(self, '_full_items', None) is None:
+            self._full_items = self.__class__.objects.reconstruct(self.client_id, self.version_number) or []
+        return self._full_items
+
+    def _validate_items(self, items, label):
+        """Validate the structure of snapshot items."""
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValidationError(_('%(label)s item at index %(index)s must be a dictionary.') % {
+                    'label': label, 'index': i
+                })
+
+            for field in self.required_item_fields:
+                if field not in item:
+                    raise ValidationError(_('%(label)s item at index %(index)s missing required field: %(field)s') % {
+                        'label': label, 'index': i, 'field': field
+                    })
+
+            # Validate amount
+            try:
+                amount = float(item['amount'])
+                if amount < 0:
+                    raise ValidationError(_('%(label)s amount at index %(index)s cannot be negative.') % {
+                        'label': label, 'index': i
+                    })
+            except (ValueError, TypeError):
+                raise ValidationError(_('%(label)s amount at index %(index)s must be a valid number.') % {
+                    'label': label, 'index': i
+                })
+
+    def _validate_snapshot(self, label):
+        """Validate either the full snapshot or the delta, depending on storage."""
+        if not self.is_checkpoint:
+            if not isinstance(self.delta, dict):
+                raise ValidationError(_('Delta versions must store a delta.'))
+            self._validate_items(self.delta.get('added', []) + self.delta.get('changed', []), label)
+            return
+
+        data = self.get_payload()
+        if not isinstance(data, list):
+            raise ValidationError(_('%(label)ss data must be a list.') % {'label': label})
+
+        if not data:
+            raise ValidationError(_('%(label)ss data cannot be empty.') % {'label': label})
+
+        self._validate_items(data, label)
+
     def clean(self):
         """Model validation."""
         super().clean()
@@ -78,6 +329,10 @@ class BaseVersionModel(models.Model):
         if self.version_number <= 0:
             raise ValidationError(_('Version number must be positive.'))
         
+        # Numbers handed out by allocate_version_number are already sequential
+        if getattr(self, '_version_number_allocated', False):
+            return
+
         # Validate that version numbers are sequential
         latest_version = self.__class__.objects.filter(client=self.client).order_by('-version_number').first()
         if latest_version and self.version_number != latest_version.version_number + 1:
@@ -86,19 +341,78 @@ class BaseVersionModel(models.Model):
             else:
                 raise ValidationError(_('Version numbers must be sequential.'))
 
+    def compute_totals(self):
+        """Fill the stored item count and total amount from the snapshot."""
+        items = self.get_items()
+        if not isinstance(items, list):
+            items = []
+
+        total = Decimal('0')
+        for item in items:
+            try:
+                total += Decimal(str(item.get('amount', 0)))
+            except (InvalidOperation, AttributeError):
+                continue
+
+        self.item_count = len(items)
+        self.total_amount = total
+
+    def _snapshot_changed(self):
+        """Whether the payload or delta differs from the stored row (always True for new rows)."""
+        if self._state.adding:
+            return True
+        stored = self.__class__.objects.filter(pk=self.pk).values(
+            self.payload_field, 'delta', 'is_checkpoint'
+        ).first()
+        return stored != {
+            self.payload_field: self.get_payload(), 'delta': self.delta, 'is_checkpoint': self.is_checkpoint
+        }
+
     def save(self, *args, **kwargs):
         """Override save to add custom logic."""
-        self.full_clean()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        snapshot_fields = {self.payload_field, 'delta', 'is_checkpoint'}
+        with transaction.atomic():
+            if (update_fields is None or snapshot_fields & set(update_fields)) and self._snapshot_changed():
+                if not self._state.adding:
+                    self._detach_from_chain()
+                    if update_fields is not None:
+                        update_fields = {*update_fields, *snapshot_fields}
+                self.compute_totals()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'item_count', 'total_amount'}
+            # The unique constraint on (client, version_number) still guards
+            # allocated numbers at the database level
+            self.full_clean(validate_unique=not getattr(self, '_version_number_allocated', False))
+            super().save(*args, **kwargs)
+
+    def _detach_from_chain(self):
+        """Before an edit: rebase the next version, and keep an edited full payload as a checkpoint."""
+        self.__class__.objects.materialize_successor(self.client_id, self.version_number)
+        self._full_items = None
+        if not self.is_checkpoint and self.get_payload() is not None:
+            self.is_checkpoint = True
+            self.delta = None
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self.__class__.objects.materialize_successor(self.client_id, self.version_number)
+            return super().delete(*args, **kwargs)
 
 
 class ExpenseVersion(BaseVersionModel):
     """Model for tracking expense versions after discussion completion."""
     
-    expenses_data = models.JSONField(
-        help_text=_("Serialized expense data at the time of version creation")
+    expenses_data = SnapshotJSONField(
+        null=True,
+        blank=True,
+        help_text=_("Serialized expense data at the time of version creation (checkpoints only)")
     )
 
+    payload_field = 'expenses_data'
+    client_field_prefix = 'expenses'
+    required_item_fields = ['id', 'date', 'description', 'amount', 'status']
+
     objects = ExpenseVersionManager()
 
     class Meta(BaseVersionModel.Meta):
@@ -109,61 +423,27 @@ class ExpenseVersion(BaseVersionModel):
     def clean(self):
         """Validate expenses data."""
         super().clean()
-        
-        if not isinstance(self.expenses_data, list):
-            raise ValidationError(_('Expenses data must be a list.'))
-        
-        if not self.expenses_data:
-            raise ValidationError(_('Expenses data cannot be empty.'))
-        
-        # Validate each expense item
-        required_fields = ['id', 'date', 'description', 'amount', 'status']
-        for i, expense in enumerate(self.expenses_data):
-            if not isinstance(expense, dict):
-                raise ValidationError(_('Expense item at index %(index)s must be a dictionary.') % {'index': i})
-            
-            for field in required_fields:
-                if field not in expense:
-                    raise ValidationError(_('Expense item at index %(index)s missing required field: %(field)s') % {
-                        'index': i, 'field': field
-                    })
-            
-            # Validate amount
-            try:
-                amount = float(expense['amount'])
-                if amount < 0:
-                    raise ValidationError(_('Expense amount at index %(index)s cannot be negative.') % {'index': i})
-            except (ValueError, TypeError):
-                raise ValidationError(_('Expense amount at index %(index)s must be a valid number.') % {'index': i})
+        self._validate_snapshot('Expense')
 
     @property
     def expenses_count(self):
         """Get the number of expenses in this version."""
-        return len(self.expenses_data) if isinstance(self.expenses_data, list) else 0
-
-    @property
-    def total_amount(self):
-        """Calculate total amount of expenses in this version."""
-        if not isinstance(self.expenses_data, list):
-            return 0
-        
-        total = 0
-        for expense in self.expenses_data:
-            try:
-                total += float(expense.get('amount', 0))
-            except (ValueError, TypeError):
-                continue
-        
-        return total
+        return self.item_count
 
 
 class PaymentVersion(BaseVersionModel):
     """Model for tracking payment versions after discussion completion."""
     
-    payments_data = models.JSONField(
-        help_text=_("Serialized payment data at the time of version creation")
+    payments_data = SnapshotJSONField(
+        null=True,
+        blank=True,
+        help_text=_("Serialized payment data at the time of version creation (checkpoints only)")
     )
 
+    payload_field = 'payments_data'
+    client_field_prefix = 'payments'
+    required_item_fields = ['id', 'date', 'amount']
+
     objects = PaymentVersionManager()
 
     class Meta(BaseVersionModel.Meta):
@@ -174,49 +454,9 @@ class PaymentVersion(BaseVersionModel):
     def clean(self):
         """Validate payments data."""
         super().clean()
-        
-        if not isinstance(self.payments_data, list):
-            raise ValidationError(_('Payments data must be a list.'))
-        
-        if not self.payments_data:
-            raise ValidationError(_('Payments data cannot be empty.'))
-        
-        # Validate each payment item
-        required_fields = ['id', 'date', 'amount']
-        for i, payment in enumerate(self.payments_data):
-            if not isinstance(payment, dict):
-                raise ValidationError(_('Payment item at index %(index)s must be a dictionary.') % {'index': i})
-            
-            for field in required_fields:
-                if field not in payment:
-                    raise ValidationError(_('Payment item at index %(index)s missing required field: %(field)s') % {
-                        'index': i, 'field': field
-                    })
-            
-            # Validate amount
-            try:
-                amount = float(payment['amount'])
-                if amount < 0:
-                    raise ValidationError(_('Payment amount at index %(index)s cannot be negative.') % {'index': i})
-            except (ValueError, TypeError):
-                raise ValidationError(_('Payment amount at index %(index)s must be a valid number.') % {'index': i})
+        self._validate_snapshot('Payment')
 
     @property
     def payments_count(self):
         """Get the number of payments in this version."""
-        return len(self.payments_data) if isinstance(self.payments_data, list) else 0
-
-    @property
-    def total_amount(self):
-        """Calculate total amount of payments in this version."""
-        if not isinstance(self.payments_data, list):
-            return 0
-        
-        total = 0
-        for payment in self.payments_data:
-            try:
-                total += float(payment.get('amount', 0))
-            except (ValueError, TypeError):
-                continue
-        
-        return total
+        return self.item_count
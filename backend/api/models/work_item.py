@@ -14,6 +14,8 @@ class WorkItem(models.Model):
     image = models.ImageField(upload_to='work_items/', null=True, blank=True)
     before_image = models.ImageField(upload_to='work_items/before/', null=True, blank=True)
     after_image = models.ImageField(upload_to='work_items/after/', null=True, blank=True)
+    # Resized WebP/JPEG derivatives per image field, see api.images
+    image_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -0,0 +1,153 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, replace_query_param
+from rest_framework.response import Response
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Keyset pagination that keeps plain lists for clients that do not ask for pages.
+
+    Requests that pass ``cursor`` or ``page_size`` get a cursor page
+    (``next``/``previous``/``results``). Requests without them keep
+    receiving the plain list the existing frontend expects, capped at
+    ``UNPAGINATED_LIST_MAX_ROWS`` rows: the first rows in ``ordering``, or
+    the last ones with ``unpaginated_tail`` (e.g. the latest messages).
+    A capped list has a ``Link`` header pointing at the rest.
+
+    Unlike DRF's ``CursorPagination``, which seeks on the first ordering
+    field and skips ties with an OFFSET, the cursor holds the values of
+    every ordering field. With ``('-date', '-id')`` the next page is
+    ``WHERE (date, id) < (d, i)``, answered by the composite index however
+    many rows share a date.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    unpaginated_tail = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.paginated = self.cursor_query_param in params or self.page_size_query_param in params
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        if self.paginated:
+            self.page_size = self.get_page_size(request)
+            position, reverse = self.decode_cursor(request)
+            if position is not None:
+                position = self._convert_position(queryset.model, position)
+        else:
+            self.page_size = getattr(settings, 'UNPAGINATED_LIST_MAX_ROWS', 1000)
+            position, reverse = None, self.unpaginated_tail
+
+        ordering = [_flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.paginated:
+            return super().get_paginated_response(data)
+        response = Response(data)
+        links = [(self.get_next_link(), 'next'), (self.get_previous_link(), 'prev')]
+        links = [f'<{url}>; rel="{rel}"' for url, rel in links if url]
+        if links:
+            response['Link'] = ', '.join(links)
+        return response
+
+    def _convert_position(self, model, position):
+        """Turn the decoded cursor values back into field values, or reject the cursor."""
+        values = []
+        for field_name, raw in zip(self.ordering, position):
+            if isinstance(raw, bool) or not isinstance(raw, (str, int)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                values.append(model._meta.get_field(field_name.lstrip('-')).to_python(raw))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _after(self, ordering, position):
+        """Rows strictly after ``position`` in ``ordering`` (a row-value comparison)."""
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): value for f, value in zip(ordering[:index], position)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, conditions)
+
+    def _position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor((self._position(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor((self._position(self.page[0]), True))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = data['p'], bool(data.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, cursor):
+        position, reverse = cursor
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class ExpenseCursorPagination(OptionalCursorPagination):
+    ordering = ('-date', '-id')
+
+
+class CashReceiptCursorPagination(OptionalCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class MessageCursorPagination(OptionalCursorPagination):
+    ordering = ('timestamp', 'id')
+    unpaginated_tail = True
@@ -1,5 +1,5 @@
 from rest_framework.permissions import BasePermission
-from api.models.client import Client
+from api.client_resolver import get_request_client
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
@@ -11,4 +11,4 @@ class IsClient(BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        return Client.objects.filter(user=user).exists()
\ No newline at end of file
+        return get_request_client(request) is not None
\ No newline at end of file
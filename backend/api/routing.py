@@ -0,0 +1,7 @@
+from django.urls import path
+
+from api.consumers import ChatConsumer
+
+websocket_urlpatterns = [
+    path('ws/messages/<int:client_id>/', ChatConsumer.as_asgi()),
+]
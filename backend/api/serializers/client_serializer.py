@@ -73,12 +73,21 @@ class ClientSerializer(serializers.ModelSerializer):
         return 0
 
     def _get_expenses_aggregate(self, obj, status_filter=None):
-        """Helper method to get expenses aggregate."""
-        queryset = obj.expenses
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        result = queryset.aggregate(total=Sum('amount'))['total']
+        """
+        Helper method to get expenses aggregate.
+
+        Reads the ``expenses_*`` annotations added by
+        ``Client.objects.with_expense_summary()`` when present and only
+        falls back to a per-object query otherwise.
+        """
+        annotation = f"expenses_{status_filter or 'total'}"
+        if hasattr(obj, annotation):
+            result = getattr(obj, annotation)
+        else:
+            queryset = obj.expenses
+            if status_filter:
+                queryset = queryset.filter(status=status_filter)
+            result = queryset.aggregate(total=Sum('amount'))['total']
         return float(result) if result is not None else 0.0
 
     def get_total(self, obj):
@@ -99,6 +108,8 @@ class ClientSerializer(serializers.ModelSerializer):
 
     def get_expenses_count(self, obj):
         """Get total number of expenses."""
+        if hasattr(obj, 'expenses_count'):
+            return obj.expenses_count
         return obj.expenses.count()
 
 
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from api.models import Expense
+from api.media_urls import protected_file_url
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
     date = serializers.DateField(format='%Y-%m-%d')
-    bill = serializers.FileField(required=False, allow_null=True)
+    # Bills are private: upload only, read back through the authenticated bill_url
+    bill = serializers.FileField(required=False, allow_null=True, write_only=True)
     bill_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -13,12 +15,12 @@ class ExpenseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'bill_url']
 
     def get_bill_url(self, obj):
+        """Authenticated download (Range/X-Accel-Redirect aware) for the bill."""
+        if not obj.bill:
+            return None
+        url = protected_file_url('expenses', obj.pk)
         request = self.context.get('request')
-        if obj.bill:
-            if request is not None:
-                return request.build_absolute_uri(obj.bill.url)
-            return obj.bill.url
-        return None
+        return request.build_absolute_uri(url) if request is not None else url
 
     def validate_bill(self, value):
         if not value:
@@ -1,24 +1,32 @@
+import os
+
 from rest_framework import serializers
 from api.models.message import Message
+from api.media_urls import protected_file_url
 
 class MessageSerializer(serializers.ModelSerializer):
-    file = serializers.FileField(required=False, allow_null=True)
+    # Attachments are private: upload only, read back through the authenticated file_url
+    file = serializers.FileField(required=False, allow_null=True, write_only=True)
     file_url = serializers.SerializerMethodField()
+    file_name = serializers.SerializerMethodField()
     content = serializers.CharField(required=False, allow_blank=True)
     # ملف مرفق اختياري
 
     class Meta:
         model = Message
-        fields = ['id', 'content', 'sender', 'client', 'file', 'file_url', 'timestamp']
-        read_only_fields = ['id', 'sender', 'timestamp', 'file_url']
+        fields = ['id', 'content', 'sender', 'client', 'file', 'file_url', 'file_name', 'timestamp']
+        read_only_fields = ['id', 'sender', 'timestamp', 'file_url', 'file_name']
 
     def get_file_url(self, obj):
+        """Authenticated download (Range/X-Accel-Redirect aware) for the attachment."""
+        if not obj.file:
+            return None
+        url = protected_file_url('messages', obj.pk)
         request = self.context.get('request')
-        if obj.file:
-            if request is not None:
-                return request.build_absolute_uri(obj.file.url)
-            return obj.file.url
-        return None
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def get_file_name(self, obj):
+        return os.path.basename(obj.file.name) if obj.file else None
         
     def validate_file(self, value):
         if not value:
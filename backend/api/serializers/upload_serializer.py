@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from api.file_types import ALLOWED_UPLOAD_TYPES, extension_type
+from api.models import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer used to start a chunked upload and report its progress."""
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'target', 'filename', 'total_size', 'received_size',
+            'detected_type', 'status', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'received_size', 'detected_type', 'status', 'created_at', 'updated_at'
+        ]
+
+    def validate_filename(self, value):
+        if extension_type(value) not in ALLOWED_UPLOAD_TYPES:
+            raise serializers.ValidationError('Unsupported file type.')
+        return value
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('File is empty.')
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            max_mb = settings.CHUNKED_UPLOAD_MAX_SIZE // (1024 * 1024)
+            raise serializers.ValidationError(f'File too large. Max {max_mb} MB.')
+        return value
@@ -1,11 +1,14 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
 
+from api.media_urls import protected_file_url
 from api.models import ExpenseVersion, PaymentVersion
 
 
 class BaseVersionSerializer(serializers.ModelSerializer):
     """Base serializer for version models with common validation."""
+
+    total_amount = serializers.FloatField(read_only=True)
     
     def validate_version_number(self, value):
         """Validate version number is positive."""
@@ -19,6 +22,12 @@ class BaseVersionSerializer(serializers.ModelSerializer):
             raise ValidationError("Discussion completion time is required.")
         return value
 
+    def to_representation(self, instance):
+        """Always expose the full snapshot, reconstructing delta versions."""
+        data = super().to_representation(instance)
+        data[instance.payload_field] = instance.get_items()
+        return data
+
 
 class ExpenseVersionSerializer(BaseVersionSerializer):
     """Serializer for ExpenseVersion model."""
@@ -27,9 +36,24 @@ class ExpenseVersionSerializer(BaseVersionSerializer):
         model = ExpenseVersion
         fields = [
             'id', 'client', 'version_number', 'discussion_completed_at', 
-            'expenses_data', 'created_at'
+            'expenses_data', 'is_checkpoint', 'item_count', 'total_amount', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'is_checkpoint', 'item_count', 'created_at']
+
+    def to_representation(self, instance):
+        """Point bills at the authenticated download, also in snapshots holding /media/ links."""
+        data = super().to_representation(instance)
+        request = self.context.get('request')
+        data['expenses_data'] = [
+            {**item, 'bill_url': self._bill_url(request, item['id'])} if item.get('bill_url') else item
+            for item in data['expenses_data']
+        ]
+        return data
+
+    @staticmethod
+    def _bill_url(request, expense_id):
+        url = protected_file_url('expenses', expense_id)
+        return request.build_absolute_uri(url) if request is not None else url
 
     def validate_expenses_data(self, value):
         """Validate expenses data is a non-empty list."""
@@ -67,9 +91,9 @@ class PaymentVersionSerializer(BaseVersionSerializer):
         model = PaymentVersion
         fields = [
             'id', 'client', 'version_number', 'discussion_completed_at', 
-            'payments_data', 'created_at'
+            'payments_data', 'is_checkpoint', 'item_count', 'total_amount', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'is_checkpoint', 'item_count', 'created_at']
 
     def validate_payments_data(self, value):
         """Validate payments data is a non-empty list."""
@@ -100,6 +124,33 @@ class PaymentVersionSerializer(BaseVersionSerializer):
         return value
 
 
+class VersionListSerializer(serializers.ModelSerializer):
+    """Lightweight version representation for list responses (no snapshot payload)."""
+
+    total_amount = serializers.FloatField(read_only=True)
+
+    class Meta:
+        fields = [
+            'id', 'client', 'version_number', 'discussion_completed_at',
+            'is_checkpoint', 'item_count', 'total_amount', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class ExpenseVersionListSerializer(VersionListSerializer):
+    """List serializer for ExpenseVersion model."""
+
+    class Meta(VersionListSerializer.Meta):
+        model = ExpenseVersion
+
+
+class PaymentVersionListSerializer(VersionListSerializer):
+    """List serializer for PaymentVersion model."""
+
+    class Meta(VersionListSerializer.Meta):
+        model = PaymentVersion
+
+
 class ExpenseVersionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating expense versions (client field writeable)."""
     
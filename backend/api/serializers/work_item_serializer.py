@@ -1,4 +1,7 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from api.images import image_without_metadata
 from api.models import WorkItem
 
 
@@ -6,6 +9,7 @@ class WorkItemSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True, required=False, allow_null=True)
     before_image = serializers.ImageField(use_url=True, required=False, allow_null=True)
     after_image = serializers.ImageField(use_url=True, required=False, allow_null=True)
+    responsive_images = serializers.SerializerMethodField()
 
     class Meta:
         model = WorkItem
@@ -17,7 +21,59 @@ class WorkItemSerializer(serializers.ModelSerializer):
             'image',
             'before_image',
             'after_image',
+            'responsive_images',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'responsive_images']
+
+    def _strip_metadata(self, upload):
+        """Store public originals without their EXIF/XMP metadata."""
+        if upload is None:
+            return upload
+        data = image_without_metadata(upload)
+        return upload if data is None else ContentFile(data, name=upload.name)
+
+    def validate_image(self, value):
+        return self._strip_metadata(value)
+
+    def validate_before_image(self, value):
+        return self._strip_metadata(value)
+
+    def validate_after_image(self, value):
+        return self._strip_metadata(value)
+
+    def _url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def get_responsive_images(self, obj):
+        """
+        srcset-ready derivatives per image field, e.g.::
+
+            {"after_image": {"width": 3000, "height": 2000, "placeholder": "data:...",
+                             "srcset": {"webp": "... 320w, ... 768w", "jpeg": "..."},
+                             "sizes": {"thumbnail": {"width": 320, "webp": "...", "jpeg": "..."}}}}
+        """
+        result = {}
+        for field, info in (obj.image_variants or {}).items():
+            sizes = {}
+            srcset = {'webp': [], 'jpeg': []}
+            for name, variant in info.get('variants', {}).items():
+                sizes[name] = {
+                    'width': variant['width'],
+                    'height': variant['height'],
+                    'webp': self._url(variant['webp']),
+                    'jpeg': self._url(variant['jpeg']),
+                }
+                for fmt in srcset:
+                    srcset[fmt].append(f"{sizes[name][fmt]} {variant['width']}w")
+            result[field] = {
+                'width': info.get('width'),
+                'height': info.get('height'),
+                'placeholder': info.get('placeholder'),
+                'srcset': {fmt: ', '.join(entries) for fmt, entries in srcset.items()},
+                'sizes': sizes,
+            }
+        return result
@@ -1,11 +1,151 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from api.caching import invalidate_dashboard
+from api.client_resolver import invalidate_client_cache
+from api.message_events import MESSAGE_READ_EVENT, broadcast_message_event, message_notifier, read_state_payload
+from api.models import ClientFinancialSummary
+
+
 @receiver(post_delete, sender='api.Client')
 def delete_user_with_client(sender, instance, **kwargs):
     """
     يمسح الـ User الخاص بالعميل لما يتم مسح الـ Client
     """
     if instance.user:
-        instance.user.delete()
\ No newline at end of file
+        instance.user.delete()
+
+
+@receiver(post_save, sender='api.Client')
+@receiver(post_delete, sender='api.Client')
+def invalidate_cached_client_profile(sender, instance, **kwargs):
+    """Drop the cached user -> client id mapping so new or removed profiles are seen at once."""
+    invalidate_client_cache(instance.user_id)
+
+
+@receiver(post_save, sender='api.Client')
+@receiver(post_delete, sender='api.Client')
+@receiver(post_save, sender='api.Project')
+@receiver(post_delete, sender='api.Project')
+@receiver(post_save, sender=User)
+def invalidate_cached_dashboard(sender, instance, **kwargs):
+    """The admin dashboard lists clients, their users and projects."""
+    invalidate_dashboard()
+
+
+@receiver(post_save, sender='api.Client')
+def create_financial_summary(sender, instance, created, **kwargs):
+    """Every client starts with an empty financial summary row."""
+    if created:
+        ClientFinancialSummary.objects.get_or_create(client=instance)
+
+
+def _remember_previous_row(instance, *fields):
+    """Keep the stored values of a row about to be updated so its old contribution can be removed."""
+    instance._financial_previous = None
+    if instance.pk:
+        instance._financial_previous = (
+            type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+        )
+
+
+@receiver(post_save, sender='api.Message')
+def notify_message_waiters(sender, instance, created, **kwargs):
+    """Wake long-polling sync requests once the new message is visible to them."""
+    if created:
+        client_id = instance.client_id
+        transaction.on_commit(lambda: message_notifier.notify(client_id))
+
+
+@receiver(pre_save, sender='api.Message')
+def remember_previous_read_state(sender, instance, update_fields=None, **kwargs):
+    instance._previous_is_read = None
+    if instance.pk and (update_fields is None or 'is_read' in update_fields):
+        instance._previous_is_read = (
+            sender.objects.filter(pk=instance.pk).values_list('is_read', flat=True).first()
+        )
+
+
+@receiver(post_save, sender='api.Message')
+def push_message_to_sockets(sender, instance, created, **kwargs):
+    """Push new messages and read-receipt changes to the conversation's WebSockets."""
+    from api.serializers.message_serializer import MessageSerializer
+
+    client_id = instance.client_id
+    if created:
+        event_type, payload = 'message.created', MessageSerializer(instance).data
+    else:
+        previous = getattr(instance, '_previous_is_read', None)
+        if previous is None or previous == instance.is_read:
+            # Content edits are not pushed; only read-state changes are
+            return
+        event_type, payload = MESSAGE_READ_EVENT, read_state_payload([instance.id], instance.is_read)
+    transaction.on_commit(lambda: broadcast_message_event(client_id, event_type, payload))
+
+
+@receiver(post_save, sender='api.WorkItem')
+@receiver(post_delete, sender='api.WorkItem')
+def invalidate_portfolio(sender, instance, **kwargs):
+    """The public gallery is cached per category; any change invalidates it."""
+    from api.views.work_item_views import invalidate_portfolio_cache
+
+    transaction.on_commit(invalidate_portfolio_cache)
+
+
+@receiver(post_delete, sender='api.WorkItem')
+def delete_work_item_variants(sender, instance, **kwargs):
+    """Generated image derivatives are owned by the work item."""
+    from api.images import delete_image_variants
+
+    for info in (instance.image_variants or {}).values():
+        delete_image_variants(info)
+
+
+@receiver(pre_save, sender='api.Expense')
+def remember_previous_expense(sender, instance, **kwargs):
+    _remember_previous_row(instance, 'client_id', 'amount', 'status')
+
+
+@receiver(post_save, sender='api.Expense')
+def update_summary_on_expense_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_financial_previous', None)
+    with transaction.atomic():
+        if previous:
+            ClientFinancialSummary.objects.apply_expense_change(
+                previous['client_id'], previous['amount'], previous['status'], sign=-1
+            )
+        ClientFinancialSummary.objects.apply_expense_change(
+            instance.client_id, instance.amount, instance.status
+        )
+
+
+@receiver(post_delete, sender='api.Expense')
+def update_summary_on_expense_delete(sender, instance, **kwargs):
+    ClientFinancialSummary.objects.apply_expense_change(
+        instance.client_id, instance.amount, instance.status, sign=-1
+    )
+
+
+@receiver(pre_save, sender='api.CashReceipt')
+def remember_previous_receipt(sender, instance, **kwargs):
+    _remember_previous_row(instance, 'client_id', 'amount')
+
+
+@receiver(post_save, sender='api.CashReceipt')
+def update_summary_on_receipt_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_financial_previous', None)
+    with transaction.atomic():
+        if previous:
+            ClientFinancialSummary.objects.apply_receipt_change(
+                previous['client_id'], previous['amount'], sign=-1
+            )
+        ClientFinancialSummary.objects.apply_receipt_change(instance.client_id, instance.amount)
+
+
+@receiver(post_delete, sender='api.CashReceipt')
+def update_summary_on_receipt_delete(sender, instance, **kwargs):
+    ClientFinancialSummary.objects.apply_receipt_change(
+        instance.client_id, instance.amount, sign=-1
+    )
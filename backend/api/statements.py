@@ -0,0 +1,184 @@
+"""
+Client statements: expenses, cash receipts, balances and version history.
+
+Rows are produced lazily with ``.iterator()`` so exports of every client
+use the same memory as a single one. CSV is streamed straight to the
+response; XLSX (openpyxl) and PDF (reportlab) are rendered to a file by the
+``statements.export`` background task.
+"""
+import csv
+import importlib.util
+import os
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+
+from api.models import CashReceipt, Client, Expense, ExpenseVersion, PaymentVersion
+
+
+STATEMENT_COLUMNS = ['client_id', 'client', 'record', 'reference', 'date', 'description', 'status', 'amount']
+
+# Rows fetched from the database per round trip
+ITERATOR_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': None,
+    'xlsx': 'openpyxl',
+    'pdf': 'reportlab',
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+
+def export_format_available(file_format):
+    """Whether the optional package needed for a format is installed."""
+    if file_format not in EXPORT_FORMATS:
+        return False
+    package = EXPORT_FORMATS[file_format]
+    return package is None or importlib.util.find_spec(package) is not None
+
+
+def _dated(queryset, date_from, date_to, field='date'):
+    if date_from:
+        queryset = queryset.filter(**{f'{field}__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{field}__lte': date_to})
+    return queryset
+
+
+def iter_statement_rows(client_id=None, date_from=None, date_to=None):
+    """Yield statement rows (lists matching ``STATEMENT_COLUMNS``), client by client."""
+    clients = Client.objects.select_related('user').order_by('id')
+    if client_id is not None:
+        clients = clients.filter(id=client_id)
+
+    for client in clients.iterator(chunk_size=200):
+        name = client.full_name
+        expenses_total = Decimal('0')
+        receipts_total = Decimal('0')
+
+        expenses = _dated(Expense.objects.filter(client_id=client.id), date_from, date_to)
+        for expense_id, date, description, expense_status, amount in expenses.order_by('date', 'id').values_list(
+            'id', 'date', 'description', 'status', 'amount'
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            expenses_total += amount
+            yield [client.id, name, 'expense', expense_id, date, description, expense_status, amount]
+
+        receipts = _dated(CashReceipt.objects.filter(client_id=client.id), date_from, date_to)
+        for receipt_id, date, amount in receipts.order_by('date', 'id').values_list(
+            'id', 'date', 'amount'
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            receipts_total += amount
+            yield [client.id, name, 'cash_receipt', receipt_id, date, '', '', amount]
+
+        yield [client.id, name, 'total_expenses', '', '', '', '', expenses_total]
+        yield [client.id, name, 'total_receipts', '', '', '', '', receipts_total]
+        yield [client.id, name, 'balance', '', '', '', '', receipts_total - expenses_total]
+
+        for record, model in (('expense_version', ExpenseVersion), ('payment_version', PaymentVersion)):
+            versions = _dated(
+                model.objects.filter(client_id=client.id), date_from, date_to,
+                field='discussion_completed_at__date'
+            )
+            for number, completed_at, item_count, total_amount in versions.order_by('version_number').values_list(
+                'version_number', 'discussion_completed_at', 'item_count', 'total_amount'
+            ).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+                yield [
+                    client.id, name, record, number, completed_at.date(),
+                    f'{item_count} items', '', total_amount
+                ]
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def stream_statement_csv(rows):
+    """Yield CSV text for the header and each row, one line at a time."""
+    writer = csv.writer(_Echo())
+    # BOM so spreadsheet apps detect UTF-8 (Arabic client names)
+    yield '\ufeff' + writer.writerow(STATEMENT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _write_xlsx(rows, path):
+    from openpyxl import Workbook
+
+    # write_only workbooks stream rows to disk instead of keeping them in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Statement')
+    sheet.append(STATEMENT_COLUMNS)
+    for row in rows:
+        sheet.append([float(value) if isinstance(value, Decimal) else value for value in row])
+    workbook.save(path)
+
+
+def _write_pdf(rows, path):
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    width, height = landscape(A4)
+    column_x = [30, 80, 210, 310, 370, 440, 680, 750]
+    line_height = 14
+
+    pdf = canvas.Canvas(path, pagesize=(width, height))
+
+    def start_page():
+        pdf.setFont('Helvetica-Bold', 9)
+        for x, title in zip(column_x, STATEMENT_COLUMNS):
+            pdf.drawString(x, height - 40, title)
+        pdf.setFont('Helvetica', 8)
+        return height - 40 - line_height
+
+    y = start_page()
+    for row in rows:
+        if y < 40:
+            pdf.showPage()
+            y = start_page()
+        for x, value in zip(column_x, row):
+            pdf.drawString(x, y, str(value)[:40])
+        y -= line_height
+    pdf.save()
+
+
+WRITERS = {
+    'xlsx': _write_xlsx,
+    'pdf': _write_pdf,
+}
+
+
+def statement_export_dir():
+    return getattr(settings, 'STATEMENT_EXPORT_DIR', os.path.join(settings.BASE_DIR, 'exports'))
+
+
+def render_statement_file(file_format, client_id=None, date_from=None, date_to=None):
+    """Render a statement to a file in ``STATEMENT_EXPORT_DIR`` and return its name."""
+    directory = statement_export_dir()
+    os.makedirs(directory, exist_ok=True)
+    filename = f'statement-{uuid.uuid4().hex}.{file_format}'
+    path = os.path.join(directory, filename)
+    try:
+        WRITERS[file_format](iter_statement_rows(client_id, date_from, date_to), path)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return filename
+
+
+def statement_file_path(filename):
+    """Absolute path of a rendered statement, refusing names outside the export directory."""
+    directory = os.path.realpath(statement_export_dir())
+    path = os.path.realpath(os.path.join(directory, os.path.basename(filename)))
+    if os.path.dirname(path) != directory:
+        return None
+    return path
@@ -0,0 +1,179 @@
+"""
+Lightweight background task queue.
+
+Tasks are plain functions registered with ``@task`` and queued as
+``BackgroundTask`` rows, so their status can always be inspected. How queued
+tasks are executed depends on ``TASK_QUEUE_MODE``:
+
+* ``'worker'`` – left in the database for ``manage.py run_tasks``;
+* ``'thread'`` – run after commit on an in-process thread pool (no worker needed);
+* ``'sync'``   – run inline after commit (tests and debugging).
+
+Failed tasks are retried with exponential backoff until ``max_attempts``.
+In ``'worker'`` mode ``run_tasks`` picks retries up when they are due; in
+``'thread'`` mode the process that ran the task re-submits the retry to its
+pool after the delay. Retries still pending when that process exits (and
+every task queued in ``'worker'`` mode) need ``manage.py run_tasks``.
+"""
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from api.models import BackgroundTask
+
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_executor = None
+
+
+def task(name=None, max_attempts=3):
+    """Register a function as a background task and give it a ``delay()`` method."""
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = func
+        func.task_name = task_name
+        func.delay = lambda *args, **kwargs: enqueue(
+            task_name, args=args, kwargs=kwargs, max_attempts=max_attempts
+        )
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def _mode():
+    return getattr(settings, 'TASK_QUEUE_MODE', 'thread')
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'TASK_QUEUE_THREADS', 2),
+            thread_name_prefix='task-queue'
+        )
+    return _executor
+
+
+def _run_in_thread(task_id):
+    try:
+        run_task_by_id(task_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=3):
+    """Queue a registered task and return its ``BackgroundTask`` row."""
+    if name not in _registry:
+        raise KeyError(f'Unknown task: {name}')
+
+    background_task = BackgroundTask.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        max_attempts=max_attempts,
+        run_after=timezone.now(),
+    )
+
+    mode = _mode()
+    if mode == 'sync':
+        transaction.on_commit(lambda: run_task_by_id(background_task.pk))
+    elif mode == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, background_task.pk))
+    return background_task
+
+
+def _claim(queryset):
+    """Atomically move one due pending task to 'running' and return it, or None."""
+    with transaction.atomic():
+        background_task = queryset.select_for_update(skip_locked=True).first()
+        if background_task is None:
+            return None
+        background_task.status = 'running'
+        background_task.attempts += 1
+        background_task.started_at = timezone.now()
+        background_task.save(update_fields=['status', 'attempts', 'started_at', 'updated_at'])
+        return background_task
+
+
+def _due_tasks():
+    return BackgroundTask.objects.filter(status='pending', run_after__lte=timezone.now())
+
+
+def run_task_by_id(task_id):
+    """Run one specific task if it is still due."""
+    background_task = _claim(_due_tasks().filter(pk=task_id))
+    if background_task is not None:
+        _execute(background_task)
+    return background_task
+
+
+def run_next_task():
+    """Claim and run the oldest due task. Returns it, or None when the queue is empty."""
+    background_task = _claim(_due_tasks().order_by('run_after', 'id'))
+    if background_task is not None:
+        _execute(background_task)
+    return background_task
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'TASK_QUEUE_RETRY_BASE_SECONDS', 10)
+    return timedelta(seconds=base * (2 ** (attempts - 1)))
+
+
+def _execute(background_task):
+    try:
+        func = get_task(background_task.name)
+        result = func(*background_task.args, **background_task.kwargs)
+    except Exception:
+        background_task.last_error = traceback.format_exc()
+        if background_task.attempts >= background_task.max_attempts:
+            background_task.status = 'failed'
+            background_task.finished_at = timezone.now()
+            logger.error('Task %s failed permanently', background_task)
+        else:
+            background_task.status = 'pending'
+            background_task.run_after = timezone.now() + _retry_delay(background_task.attempts)
+            logger.warning('Task %s failed, retrying at %s', background_task, background_task.run_after)
+    else:
+        background_task.status = 'succeeded'
+        background_task.result = result
+        background_task.last_error = ''
+        background_task.finished_at = timezone.now()
+
+    background_task.save(update_fields=[
+        'status', 'result', 'last_error', 'run_after', 'finished_at', 'updated_at'
+    ])
+    if background_task.status == 'pending':
+        _schedule_retry(background_task)
+
+
+def _schedule_retry(background_task):
+    """In thread mode nothing polls the queue, so hand the retry back to the pool once it is due."""
+    if _mode() != 'thread':
+        return
+    delay = max(0.0, (background_task.run_after - timezone.now()).total_seconds())
+    task_id = background_task.pk
+    timer = threading.Timer(delay, lambda: _get_executor().submit(_run_in_thread, task_id))
+    # Do not keep the process alive for a pending retry; run_tasks can pick it up
+    timer.daemon = True
+    timer.start()
+
+
+def requeue_stale_tasks():
+    """Return tasks stuck in 'running' (e.g. after a worker crash) to the queue."""
+    timeout = getattr(settings, 'TASK_QUEUE_STALE_SECONDS', 15 * 60)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return BackgroundTask.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='pending', run_after=timezone.now(), updated_at=timezone.now()
+    )
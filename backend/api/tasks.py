@@ -0,0 +1,56 @@
+import logging
+
+from api.file_types import ALLOWED_UPLOAD_TYPES, extension_type, sniff_field_file
+from api.images import generate_work_item_variants
+from api.models import Expense, Message, WorkItem
+from api.statements import render_statement_file
+from api.task_queue import task
+
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FIELDS = {
+    'expense': (Expense, 'bill'),
+    'message': (Message, 'file'),
+}
+
+
+@task(name='work_items.generate_variants')
+def process_work_item_images(work_item_id):
+    """Build responsive derivatives for a work item's uploads."""
+    work_item = WorkItem.objects.filter(pk=work_item_id).first()
+    if work_item is None:
+        return None
+    variants = generate_work_item_variants(work_item)
+    return {field: len(info.get('variants', {})) for field, info in variants.items()}
+
+
+@task(name='uploads.verify')
+def verify_upload(kind, object_id):
+    """
+    Check that a stored bill/attachment really is the type its name claims.
+
+    Files whose leading bytes do not match an allowed type (or their
+    extension) are removed and the attachment cleared.
+    """
+    model, field = UPLOAD_FIELDS[kind]
+    instance = model.objects.filter(pk=object_id).first()
+    if instance is None or not getattr(instance, field):
+        return None
+
+    field_file = getattr(instance, field)
+    detected = sniff_field_file(field_file)
+    if detected in ALLOWED_UPLOAD_TYPES and detected == extension_type(field_file.name):
+        return {'type': detected}
+
+    logger.warning('Removing %s %s upload %s: detected type %s', kind, object_id, field_file.name, detected)
+    field_file.delete(save=False)
+    model.objects.filter(pk=object_id).update(**{field: None})
+    return {'type': detected, 'removed': True}
+
+
+@task(name='statements.export', max_attempts=1)
+def export_statement(file_format, client_id=None, date_from=None, date_to=None):
+    """Render an XLSX/PDF statement into STATEMENT_EXPORT_DIR."""
+    filename = render_statement_file(file_format, client_id, date_from, date_to)
+    return {'filename': filename, 'format': file_format}
@@ -1,3 +1,97 @@
-from django.test import TestCase
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from api.models import CashReceipt, Client, Expense, ExpenseVersion, PaymentVersion
+
+
+CREATE_VERSION_URLS = {
+    ExpenseVersion: '/api/admin/expense-versions/create-version/',
+    PaymentVersion: '/api/admin/payment-versions/create-version/',
+}
+
+
+class VersionCreationTests(TransactionTestCase):
+    """Versions created through the create-version endpoints get unique, gapless numbers."""
+
+    threads = 2
+    versions_per_thread = 5
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('version-admin', 'admin@example.com', 'pw')
+        user = User.objects.create_user('version-client', password='pw')
+        self.client_profile = Client.objects.create(user=user, budget=1000)
+        # Versions cannot be empty
+        Expense.objects.create(client=self.client_profile, description='Paint', amount=10, date='2024-01-01')
+        CashReceipt.objects.create(client=self.client_profile, date='2024-01-01', amount=50)
+
+    def _post_versions(self, url, count, statuses, barrier=None):
+        api = APIClient()
+        api.force_authenticate(self.admin)
+        try:
+            if barrier is not None:
+                barrier.wait()
+            for _ in range(count):
+                response = api.post(url, {'client_id': self.client_profile.pk}, format='json')
+                statuses.append(response.status_code)
+        finally:
+            if barrier is not None:
+                # Worker threads hold their own connection
+                connection.close()
+
+    def _assert_gapless(self, version_model, total):
+        numbers = sorted(
+            version_model.objects.filter(client=self.client_profile).values_list('version_number', flat=True)
+        )
+        self.assertEqual(numbers, list(range(1, total + 1)))
+        self.client_profile.refresh_from_db()
+        prefix = version_model.client_field_prefix
+        self.assertEqual(getattr(self.client_profile, f'{prefix}_version_count'), total)
+
+    def test_create_version_locks_the_client_row(self):
+        for version_model, url in CREATE_VERSION_URLS.items():
+            with self.subTest(url=url):
+                with mock.patch.object(
+                    QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update
+                ) as select_for_update:
+                    api = APIClient()
+                    api.force_authenticate(self.admin)
+                    response = api.post(url, {'client_id': self.client_profile.pk}, format='json')
+                self.assertEqual(response.status_code, 201)
+                self.assertTrue(any(call.args[0].model is Client for call in select_for_update.call_args_list))
+
+    def test_sequential_requests_get_gapless_numbers(self):
+        for version_model, url in CREATE_VERSION_URLS.items():
+            with self.subTest(url=url):
+                statuses = []
+                self._post_versions(url, 3, statuses)
+                self.assertEqual(statuses, [201] * 3)
+                self._assert_gapless(version_model, 3)
+
+    @unittest.skipUnless(
+        connection.features.has_select_for_update,
+        'Needs a database with SELECT ... FOR UPDATE (PostgreSQL, as configured by the DB_* settings); '
+        'SQLite fails concurrent writers with "database is locked"'
+    )
+    def test_concurrent_requests_get_unique_gapless_numbers(self):
+        url = CREATE_VERSION_URLS[ExpenseVersion]
+        barrier = threading.Barrier(self.threads)
+        statuses = []
+        workers = [
+            threading.Thread(target=self._post_versions, args=(url, self.versions_per_thread, statuses, barrier))
+            for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        total = self.threads * self.versions_per_thread
+        self.assertEqual(statuses, [201] * total)
+        self._assert_gapless(ExpenseVersion, total)
@@ -9,6 +9,10 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from api.views.auth_view import CustomAuthToken
+from api.views.upload_views import UploadSessionViewSet
+from api.views.media_views import download_protected_file
+from api.views.import_views import import_ledger_file
+from api.views.statement_views import export_client_statement, statement_export_status
 
 router = DefaultRouter()
 router.register(r'clients', ClientViewSet, basename='client')
@@ -16,6 +20,7 @@ router.register(r'projects', ProjectViewSet, basename='project')
 router.register(r'expenses', ExpenseViewSet, basename='expense')
 router.register(r'progress', ProjectProgressViewSet, basename='progress')
 router.register(r'messages', MessageViewSet, basename='message')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 router.register('admin/clients', AdminClientViewSet, basename='admin-clients')
 router.register('admin/expenses', AdminExpenseViewSet, basename='admin-expenses')
 router.register('admin/progress', AdminProgressViewSet, basename='admin-progress')
@@ -37,10 +42,15 @@ urlpatterns = [
     path('api/client/dashboard/', ClientDashboardView.as_view()),
     path('api/admin/cash-receipts/', cash_receipt_views.create_cash_receipt, name='create-cash-receipt'),
     path('api/admin/payments/', cash_receipt_views.get_admin_client_payments, name='get-admin-client-payments'),
+    path('api/admin/payments/batch/', cash_receipt_views.batch_cash_receipts, name='batch-cash-receipts'),
     path('api/admin/payments/<int:pk>/', cash_receipt_views.update_cash_receipt, name='update-cash-receipt'),
     path('api/admin/payments/<int:pk>/delete/', cash_receipt_views.delete_cash_receipt, name='delete-cash-receipt'),
+    path('api/admin/imports/<str:kind>/', import_ledger_file, name='import-ledger-file'),
+    path('api/admin/statements/export/', export_client_statement, name='export-client-statement'),
+    path('api/admin/statements/exports/<int:task_id>/', statement_export_status, name='statement-export-status'),
     path('api/client/payments/', cash_receipt_views.get_client_cash_receipts, name='get-client-payments'),
     path('api/work-items/', get_work_items, name='get-work-items'),
+    path('api/files/<str:kind>/<int:pk>/', download_protected_file, name='download-protected-file'),
     path('auth/me/', MeView.as_view()),
     path('login/', CustomAuthToken.as_view(), name='custom-login'),
 ]
\ No newline at end of file
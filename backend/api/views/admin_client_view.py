@@ -11,7 +11,9 @@ from api.models import project
 
 
 class AdminClientViewSet(viewsets.ModelViewSet):
-    queryset = Client.objects.all()
+    # Expense totals, user and project/progress come back with each row so
+    # listing clients costs a constant number of queries
+    queryset = Client.objects.with_expense_summary().select_related('user', 'project__progress')
     permission_classes = [IsAdmin]
 
     def get_serializer_class(self):
@@ -5,6 +5,8 @@ from api.permissions import IsAdmin
 
 from api.models import Expense
 from api.serializers import ExpenseSerializer
+from api.pagination import ExpenseCursorPagination
+from api.tasks import verify_upload
 
 
 class AdminExpenseViewSet(viewsets.ModelViewSet):
@@ -12,6 +14,7 @@ class AdminExpenseViewSet(viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAdmin]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = ExpenseCursorPagination
 
     http_method_names = ['post', 'get', 'delete', 'patch', 'put']
 
@@ -19,4 +22,14 @@ class AdminExpenseViewSet(viewsets.ModelViewSet):
         client_id = self.request.query_params.get('client_id')
         if client_id:
             return Expense.objects.filter(client_id=client_id).order_by('-date')
-        return Expense.objects.all().order_by('-date')
\ No newline at end of file
+        return Expense.objects.all().order_by('-date')
+
+    def perform_create(self, serializer):
+        expense = serializer.save()
+        if expense.bill:
+            verify_upload.delay('expense', expense.pk)
+
+    def perform_update(self, serializer):
+        expense = serializer.save()
+        if 'bill' in self.request.FILES:
+            verify_upload.delay('expense', expense.pk)
\ No newline at end of file
@@ -2,9 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.contrib.auth.models import User
-from accounts.models import UserProfile
-from api.models import Client
+from api.client_resolver import get_client_for_user, get_request_client
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 
@@ -19,13 +17,9 @@ class MeView(APIView):
             client_id = None
         else:
             # client فقط لو مش admin
-            try:
-                client = Client.objects.get(user=user)
-                role = 'client'
-                client_id = client.id
-            except Client.DoesNotExist:
-                role = 'client'  # لو مش مرتبط بـ Client، ممكن نغيرها لاحقًا
-                client_id = None
+            client = get_request_client(request)
+            role = 'client'  # لو مش مرتبط بـ Client، ممكن نغيرها لاحقًا
+            client_id = client.id if client else None
 
         data = {
             'id': user.id,
@@ -62,12 +56,11 @@ class CustomAuthToken(APIView):
                 })
 
             # لو Client، يتحقق من وجود client ونشاطه
-            try:
-                client = Client.objects.get(user=user)
-                if client.is_deleted or not client.is_active:
-                    return Response({'detail': 'This client account is inactive or deleted.'}, status=status.HTTP_403_FORBIDDEN)
-            except Client.DoesNotExist:
+            client = get_client_for_user(user)
+            if client is None:
                 return Response({'detail': 'This account is not a client.'}, status=status.HTTP_403_FORBIDDEN)
+            if client.is_deleted or not client.is_active:
+                return Response({'detail': 'This client account is inactive or deleted.'}, status=status.HTTP_403_FORBIDDEN)
 
             # إنشاء JWT tokens
             refresh = RefreshToken.for_user(user)
@@ -2,9 +2,37 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from ..models.cash_receipt import CashReceipt
 from ..models.client import Client
+from ..models.financial_summary import ClientFinancialSummary
+from ..permissions import IsAdmin
+from ..pagination import CashReceiptCursorPagination
+from ..client_resolver import get_request_client
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+
+def _serialize_receipt(receipt):
+    """Serialize a cash receipt without touching the related client row."""
+    return {
+        'id': receipt.id,
+        'client_id': receipt.client_id,
+        'date': receipt.date,
+        'amount': receipt.amount,
+        'created_at': receipt.created_at
+    }
+
+
+def _receipts_response(request, cash_receipts):
+    """Return receipts as a cursor page when requested, otherwise as a (capped) plain list."""
+    paginator = CashReceiptCursorPagination()
+    try:
+        page = paginator.paginate_queryset(cash_receipts, request)
+    except NotFound as e:
+        return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
+    return paginator.get_paginated_response([_serialize_receipt(receipt) for receipt in page])
 
 
 @api_view(['POST'])
@@ -85,17 +113,7 @@ def get_admin_client_payments(request):
             # Get all cash receipts from all clients
             cash_receipts = CashReceipt.objects.all().order_by('-created_at')
         
-        receipts_data = []
-        for receipt in cash_receipts:
-            receipts_data.append({
-                'id': receipt.id,
-                'client_id': receipt.client.id,
-                'date': receipt.date,
-                'amount': receipt.amount,
-                'created_at': receipt.created_at
-            })
-        
-        return Response(receipts_data, status=status.HTTP_200_OK)
+        return _receipts_response(request, cash_receipts)
     except Exception as e:
         return Response(
             {'error': 'Internal server error: ' + str(e)},
@@ -111,37 +129,17 @@ def get_client_cash_receipts(request):
     """
     try:
         # Get client from authenticated user
-        user = request.user
-        
-        # Try to get client through the proper relationship
-        try:
-            client = Client.objects.get(user=user)
-        except Client.DoesNotExist:
+        client = get_request_client(request)
+        if client is None:
             return Response(
                 {'error': 'Client not found for this user'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        except AttributeError:
-            return Response(
-                {'error': 'User is not associated with a client'},
-                status=status.HTTP_403_FORBIDDEN
-            )
         
         # Get cash receipts for the client
         cash_receipts = CashReceipt.objects.filter(client=client).order_by('-created_at')
         
-        # Format the response
-        receipts_data = []
-        for receipt in cash_receipts:
-            receipts_data.append({
-                'id': receipt.id,
-                'client_id': receipt.client.id,
-                'date': receipt.date,
-                'amount': receipt.amount,
-                'created_at': receipt.created_at
-            })
-        
-        return Response(receipts_data, status=status.HTTP_200_OK)
+        return _receipts_response(request, cash_receipts)
         
     except Exception as e:
         return Response(
@@ -235,3 +233,161 @@ def delete_cash_receipt(request, pk):
             {'error': 'Internal server error: ' + str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+# Upper bound on create + update + delete items in one batch request
+MAX_BATCH_ITEMS = 500
+
+
+def _clean_receipt_fields(item, required):
+    """Validate date/amount of one batch item. Returns ``(values, errors)``."""
+    values, errors = {}, {}
+    for name in ('date', 'amount'):
+        raw = item.get(name)
+        if raw in (None, ''):
+            if required:
+                errors[name] = ['This field is required.']
+            continue
+        try:
+            values[name] = CashReceipt._meta.get_field(name).clean(raw, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    return values, errors
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def batch_cash_receipts(request):
+    """
+    Create, update and delete many cash receipts in one atomic request.
+
+    Body: ``{"create": [{client_id, date, amount}], "update": [{id, date?, amount?}],
+    "delete": [id, ...]}``. Every item is validated first; if any item is
+    invalid nothing is applied and the per-item errors are returned.
+    """
+    try:
+        create_items = request.data.get('create') or []
+        update_items = request.data.get('update') or []
+        delete_items = request.data.get('delete') or []
+        if not all(isinstance(items, list) for items in (create_items, update_items, delete_items)):
+            return Response(
+                {'error': 'create, update and delete must be lists'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(create_items) + len(update_items) + len(delete_items) > MAX_BATCH_ITEMS:
+            return Response(
+                {'error': f'A batch may contain at most {MAX_BATCH_ITEMS} items'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            # One query for every client referenced by new receipts
+            client_ids = {
+                _parse_id(item.get('client_id')) for item in create_items if isinstance(item, dict)
+            }
+            known_clients = set(
+                Client.objects.filter(id__in=client_ids - {None}).values_list('id', flat=True)
+            )
+
+            # One query (locked) for every receipt being updated or deleted
+            receipt_ids = {_parse_id(item.get('id')) for item in update_items if isinstance(item, dict)}
+            receipt_ids |= {_parse_id(item) for item in delete_items}
+            receipts = CashReceipt.objects.select_for_update().in_bulk(receipt_ids - {None})
+
+            results = {'create': [], 'update': [], 'delete': []}
+            has_errors = False
+            to_create, to_update, to_delete = [], [], []
+            seen_ids = set()
+
+            for index, item in enumerate(create_items):
+                if not isinstance(item, dict):
+                    errors = {'non_field_errors': ['Expected an object.']}
+                else:
+                    values, errors = _clean_receipt_fields(item, required=True)
+                    client_id = _parse_id(item.get('client_id'))
+                    if client_id is None:
+                        errors['client_id'] = ['A valid client_id is required.']
+                    elif client_id not in known_clients:
+                        errors['client_id'] = ['Client not found.']
+                if errors:
+                    has_errors = True
+                    results['create'].append({'index': index, 'status': 'error', 'errors': errors})
+                else:
+                    to_create.append(CashReceipt(client_id=client_id, **values))
+                    results['create'].append({'index': index, 'status': 'created'})
+
+            now = timezone.now()
+            for index, item in enumerate(update_items):
+                receipt_id = _parse_id(item.get('id')) if isinstance(item, dict) else None
+                receipt = receipts.get(receipt_id)
+                if receipt is None:
+                    errors = {'id': ['Cash receipt not found.']}
+                elif receipt_id in seen_ids:
+                    errors = {'id': ['Cash receipt appears more than once in this batch.']}
+                else:
+                    values, errors = _clean_receipt_fields(item, required=False)
+                if errors:
+                    has_errors = True
+                    results['update'].append({'index': index, 'id': receipt_id, 'status': 'error', 'errors': errors})
+                    continue
+                seen_ids.add(receipt_id)
+                for name, value in values.items():
+                    setattr(receipt, name, value)
+                receipt.updated_at = now
+                to_update.append(receipt)
+                results['update'].append({'index': index, 'id': receipt_id, 'status': 'updated'})
+
+            for index, item in enumerate(delete_items):
+                receipt_id = _parse_id(item)
+                receipt = receipts.get(receipt_id)
+                if receipt is None:
+                    errors = {'id': ['Cash receipt not found.']}
+                elif receipt_id in seen_ids:
+                    errors = {'id': ['Cash receipt appears more than once in this batch.']}
+                else:
+                    errors = None
+                if errors:
+                    has_errors = True
+                    results['delete'].append({'index': index, 'id': receipt_id, 'status': 'error', 'errors': errors})
+                    continue
+                seen_ids.add(receipt_id)
+                to_delete.append(receipt)
+                results['delete'].append({'index': index, 'id': receipt_id, 'status': 'deleted'})
+
+            if has_errors:
+                # Nothing is applied unless every item is valid
+                for group in results.values():
+                    for result in group:
+                        if result['status'] != 'error':
+                            result['status'] = 'skipped'
+                return Response(results, status=status.HTTP_400_BAD_REQUEST)
+
+            created = CashReceipt.objects.bulk_create(to_create)
+            CashReceipt.objects.bulk_update(to_update, ['date', 'amount', 'updated_at'])
+            CashReceipt.objects.filter(id__in=[receipt.id for receipt in to_delete]).delete()
+
+            # bulk_create/bulk_update skip the signals that maintain the summaries
+            # (queryset deletes still send post_delete for each row)
+            affected_clients = {receipt.client_id for receipt in created + to_update}
+            affected_clients.discard(None)
+            if affected_clients:
+                ClientFinancialSummary.objects.rebuild(sorted(affected_clients))
+
+        for result, receipt in zip(results['create'], created):
+            result['receipt'] = _serialize_receipt(receipt)
+        for result, receipt in zip(results['update'], to_update):
+            result['receipt'] = _serialize_receipt(receipt)
+        return Response(results, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error: ' + str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
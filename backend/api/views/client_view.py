@@ -17,7 +17,9 @@ class ClientViewSet(viewsets.ModelViewSet):
     permission_classes = [IsClient]
 
     def get_queryset(self):
-        return Client.objects.filter(user=self.request.user)
+        return Client.objects.with_expense_summary().select_related(
+            'user', 'project__progress'
+        ).filter(user=self.request.user)
 
     @action(detail=False, methods=['get'], url_path='dashboard')
     def dashboard(self, request):
@@ -1,46 +1,70 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Prefetch
-from django.core.exceptions import ObjectDoesNotExist
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q, Sum
 
-from api.models import Client, Project, Expense
+from api.caching import DASHBOARD_NAMESPACE, get_or_compute, namespace_version
+from api.models import Client, ClientFinancialSummary, Expense
 from api.permissions import IsAdmin
+from api.client_resolver import get_request_client
+from api.media_urls import protected_file_url
 
 
 class BaseDashboardView(APIView):
     """Base class for dashboard views with common functionality."""
     
     def _get_client_expenses_summary(self, client):
-        """Get expenses summary for a client."""
-        expenses = Expense.objects.filter(client=client)
+        """Get expenses summary for a client from its materialized financial summary."""
+        summary = getattr(client, 'financial_summary', None)
+        if summary is not None:
+            return summary.as_expenses_summary()
+        
+        # Fallback for clients whose summary row has not been built yet
+        summary = Expense.objects.filter(client=client).aggregate(
+            total=Sum('amount'),
+            paid=Sum('amount', filter=Q(status='paid')),
+            pending=Sum('amount', filter=Q(status='pending')),
+            upcoming=Sum('amount', filter=Q(status='upcoming')),
+            count=Count('id'),
+        )
         return {
-            'total': float(expenses.aggregate(total=Sum('amount'))['total'] or 0),
-            'paid': float(expenses.filter(status='paid').aggregate(total=Sum('amount'))['total'] or 0),
-            'pending': float(expenses.filter(status='pending').aggregate(total=Sum('amount'))['total'] or 0),
-            'upcoming': float(expenses.filter(status='upcoming').aggregate(total=Sum('amount'))['total'] or 0),
-            'count': expenses.count()
+            'total': float(summary['total'] or 0),
+            'paid': float(summary['paid'] or 0),
+            'pending': float(summary['pending'] or 0),
+            'upcoming': float(summary['upcoming'] or 0),
+            'count': summary['count']
+        }
+
+    def _get_annotated_expenses_summary(self, client):
+        """Read the expenses summary from a client annotated by ``with_expense_summary``."""
+        return {
+            'total': float(client.expenses_total),
+            'paid': float(client.expenses_paid),
+            'pending': float(client.expenses_pending),
+            'upcoming': float(client.expenses_upcoming),
+            'count': client.expenses_count
         }
     
     def _format_date(self, date):
         """Format date to string or return None."""
         return date.strftime('%Y-%m-%d') if date else None
     
-    def _build_project_data(self, project, include_expenses=False):
+    def _build_project_data(self, project, client, expenses_summary=None):
         """Build project data dictionary."""
         project_data = {
             'id': project.id,
             'title': project.title,
-            'client_id': project.client.id,
-            'client_name': project.client.user.username,
+            'client_id': client.id,
+            'client_name': client.user.username,
             'total_budget': float(project.total_budget),
             'status': project.status,
             'start_date': self._format_date(project.start_date),
             'expected_end_date': self._format_date(project.expected_end_date),
         }
         
-        if include_expenses:
-            expenses_summary = self._get_client_expenses_summary(project.client)
+        if expenses_summary is not None:
             project_data.update({
                 'total_expenses': expenses_summary['total'],
                 'expenses_count': expenses_summary['count']
@@ -54,73 +78,80 @@ class AdminDashboardView(BaseDashboardView):
     permission_classes = [IsAdmin]
 
     def get(self, request):
-        """Get admin dashboard statistics."""
+        """Get admin dashboard statistics (cached until clients, projects or totals change)."""
         try:
-            # Get overall statistics
-            total_expenses = Expense.objects.aggregate(total=Sum("amount"))["total"] or 0
-            
-            # Get projects with optimized queries
-            projects = Project.objects.select_related('client').prefetch_related(
-                Prefetch('client__expenses', queryset=Expense.objects.all())
-            ).all()
-            
-            projects_data = []
-            for project in projects:
-                project_data = self._build_project_data(project, include_expenses=True)
-                projects_data.append(project_data)
-            
-            # Get clients with their projects
-            clients = Client.objects.select_related('user').prefetch_related(
-                Prefetch('project_set', queryset=Project.objects.select_related('client'))
-            ).all()
-            
-            clients_data = []
-            for client in clients:
-                client_projects = client.project_set.all()
-                client_projects_data = []
-                
-                for project in client_projects:
-                    expenses_summary = self._get_client_expenses_summary(client)
-                    project_data = {
-                        'id': project.id,
-                        'title': project.title,
-                        'total_budget': float(project.total_budget),
-                        'total_expenses': expenses_summary['total'],
-                        'status': project.status,
-                        'start_date': self._format_date(project.start_date),
-                        'expected_end_date': self._format_date(project.expected_end_date),
-                    }
-                    client_projects_data.append(project_data)
-                
-                clients_data.append({
-                    'id': client.id,
-                    'username': client.user.username,
-                    'email': client.user.email,
-                    'phone': client.phone,
-                    'address': client.address,
-                    'status': client.status,
-                    'projects': client_projects_data,
-                    'expenses_discussion_completed': client.expenses_discussion_completed,
-                    'payments_discussion_completed': client.payments_discussion_completed,
-                    'expenses_version_count': client.expenses_version_count,
-                    'payments_version_count': client.payments_version_count,
-                })
-
-            return Response({
-                'clients_count': Client.objects.count(),
-                'projects_count': Project.objects.count(),
-                'expenses_count': Expense.objects.count(),
-                'total_expenses': float(total_expenses),
-                'projects': projects_data,
-                'clients': clients_data
-            })
-            
+            cache = caches['dashboard']
+            key = f'admin:v{namespace_version(cache, DASHBOARD_NAMESPACE)}'
+            return Response(get_or_compute(
+                cache, key, self._build_dashboard, settings.DASHBOARD_CACHE_TIMEOUT, metric='dashboard'
+            ))
         except Exception as e:
             return Response(
                 {'error': 'Failed to load admin dashboard data.'},
                 status=500
             )
 
+    def _build_dashboard(self):
+        """Statistics for every client, computed from the database."""
+        # Overall totals come from the per-client summary rows, plus the
+        # expenses not assigned to any client (which have no summary row)
+        overall = ClientFinancialSummary.objects.aggregate(
+            total=Sum('expenses_total'),
+            count=Sum('expenses_count')
+        )
+        unassigned = Expense.objects.filter(client__isnull=True).aggregate(
+            total=Sum('amount'),
+            count=Count('id')
+        )
+        
+        # One query: clients joined to their user, project and financial summary
+        clients = Client.objects.with_expense_summary().select_related('user', 'project')
+        
+        projects_data = []
+        clients_data = []
+        for client in clients:
+            expenses_summary = self._get_annotated_expenses_summary(client)
+            project = getattr(client, 'project', None)
+            
+            client_projects_data = []
+            if project:
+                projects_data.append(
+                    self._build_project_data(project, client, expenses_summary)
+                )
+                client_projects_data.append({
+                    'id': project.id,
+                    'title': project.title,
+                    'total_budget': float(project.total_budget),
+                    'total_expenses': expenses_summary['total'],
+                    'status': project.status,
+                    'start_date': self._format_date(project.start_date),
+                    'expected_end_date': self._format_date(project.expected_end_date),
+                })
+            
+            clients_data.append({
+                'id': client.id,
+                'username': client.user.username,
+                'email': client.user.email,
+                'phone': client.phone,
+                'address': client.address,
+                'status': client.status,
+                'projects': client_projects_data,
+                'expenses_summary': expenses_summary,
+                'expenses_discussion_completed': client.expenses_discussion_completed,
+                'payments_discussion_completed': client.payments_discussion_completed,
+                'expenses_version_count': client.expenses_version_count,
+                'payments_version_count': client.payments_version_count,
+            })
+
+        return {
+            'clients_count': len(clients_data),
+            'projects_count': len(projects_data),
+            'expenses_count': (overall['count'] or 0) + unassigned['count'],
+            'total_expenses': float((overall['total'] or 0) + (unassigned['total'] or 0)),
+            'projects': projects_data,
+            'clients': clients_data
+        }
+
 
 class ClientDashboardView(BaseDashboardView):
     """Client dashboard view with personalized data."""
@@ -129,12 +160,9 @@ class ClientDashboardView(BaseDashboardView):
     def get(self, request):
         """Get client dashboard data."""
         try:
-            user = request.user
-            
             # Get the client associated with this user
-            try:
-                client = Client.objects.select_related('user').get(user=user)
-            except ObjectDoesNotExist:
+            client = get_request_client(request)
+            if client is None:
                 return Response(
                     {'error': 'Client not found'}, 
                     status=404
@@ -147,7 +175,7 @@ class ClientDashboardView(BaseDashboardView):
             # Build expenses data
             expenses_data = []
             for expense in expenses:
-                bill_url = request.build_absolute_uri(expense.bill.url) if expense.bill else None
+                bill_url = request.build_absolute_uri(protected_file_url('expenses', expense.id)) if expense.bill else None
                 expenses_data.append({
                     "id": expense.id,
                     "description": expense.description,
@@ -4,12 +4,15 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from api.models import Expense, Client
 from api.serializers.expense_serializer import ExpenseSerializer
-from api.permissions import IsClient
+from api.pagination import ExpenseCursorPagination
+from api.client_resolver import get_request_client
+from api.tasks import verify_upload
 
 class ExpenseViewSet(viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = ExpenseCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -22,13 +25,22 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             return Expense.objects.all().order_by('-date')
         
         # If client, only see their own expenses
-        try:
-            client = Client.objects.get(user=user)
-            return Expense.objects.filter(client=client).order_by('-date')
-        except Client.DoesNotExist:
+        client = get_request_client(self.request)
+        if client is None:
             return Expense.objects.none()
+        return Expense.objects.filter(client=client).order_by('-date')
 
     def perform_create(self, serializer):
+        self._save_for_client(serializer)
+        if serializer.instance.bill:
+            verify_upload.delay('expense', serializer.instance.pk)
+
+    def perform_update(self, serializer):
+        expense = serializer.save()
+        if 'bill' in self.request.FILES:
+            verify_upload.delay('expense', expense.pk)
+
+    def _save_for_client(self, serializer):
         user = self.request.user
         
         # If admin, need to specify client
@@ -46,9 +58,8 @@ class ExpenseViewSet(viewsets.ModelViewSet):
                 raise serializers.ValidationError("Invalid client_id")
         else:
             # If client, use their own client
-            try:
-                client = Client.objects.get(user=user)
-                serializer.save(client=client)
-            except Client.DoesNotExist:
+            client = get_request_client(self.request)
+            if client is None:
                 from rest_framework import serializers
-                raise serializers.ValidationError("Client not found")
\ No newline at end of file
+                raise serializers.ValidationError("Client not found")
+            serializer.save(client=client)
\ No newline at end of file
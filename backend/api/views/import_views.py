@@ -0,0 +1,67 @@
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.ledger_import import IMPORT_KINDS, ImportFormatError, guess_format, import_ledger
+from api.models import Client
+from api.permissions import IsAdmin
+
+
+def _flag(request, name):
+    return str(request.data.get(name, '')).lower() in ('1', 'true', 'yes')
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+@parser_classes([MultiPartParser, FormParser])
+def import_ledger_file(request, kind):
+    """
+    Bulk import expenses or cash receipts from an uploaded CSV/XLSX file.
+
+    Form fields: ``file``, optional ``client_id`` (for files without a
+    client_id column), ``partial`` (import the valid rows even if some
+    rows fail) and ``dry_run`` (validate only).
+    """
+    if kind not in IMPORT_KINDS:
+        return Response({'error': 'Unknown import type'}, status=status.HTTP_404_NOT_FOUND)
+
+    uploaded = request.FILES.get('file')
+    if uploaded is None:
+        return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('format') or guess_format(uploaded.name)
+    if file_format is None:
+        return Response(
+            {'error': 'Unsupported file format; use CSV or XLSX.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    client_id = request.data.get('client_id')
+    if client_id:
+        try:
+            client_id = int(client_id)
+        except (ValueError, TypeError):
+            return Response({'error': 'client_id must be a valid integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Client.objects.filter(id=client_id).exists():
+            return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+    else:
+        client_id = None
+
+    try:
+        report = import_ledger(
+            uploaded.file,
+            file_format,
+            kind,
+            client_id=client_id,
+            partial=_flag(request, 'partial'),
+            dry_run=_flag(request, 'dry_run'),
+        )
+    except ImportFormatError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if report['imported'] or report['dry_run']:
+        response_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response(report, status=response_status)
@@ -0,0 +1,145 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api.client_resolver import get_request_client
+from api.models import Expense, Message
+
+
+STREAM_BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+PROTECTED_FILES = {
+    'expenses': (Expense, 'bill'),
+    'messages': (Message, 'file'),
+}
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single 'bytes=' range, None if absent, or 'invalid'."""
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Multiple or malformed ranges: serve the whole file
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'invalid'
+    return start, end
+
+
+def _stream_file(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = handle.read(min(STREAM_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def _accelerated_response(field_file, path):
+    """Hand the transfer to the front server when MEDIA_ACCEL_MODE is configured."""
+    mode = getattr(settings, 'MEDIA_ACCEL_MODE', '')
+    if mode == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + field_file.name
+        return response
+    if mode == 'sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_protected_file(request, kind, pk):
+    """
+    Download an expense bill or message attachment.
+
+    Clients may only download files of their own expenses/messages. The
+    bytes are sent by nginx (X-Accel-Redirect) or Apache/lighttpd
+    (X-Sendfile) when configured; otherwise they are streamed here with
+    support for Range and conditional requests.
+    """
+    if kind not in PROTECTED_FILES:
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+    model, field = PROTECTED_FILES[kind]
+    queryset = model.objects.all()
+    user = request.user
+    if not (user.is_staff or user.is_superuser):
+        client = get_request_client(request)
+        if client is None:
+            return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+        queryset = queryset.filter(client=client)
+
+    instance = queryset.filter(pk=pk).first()
+    field_file = getattr(instance, field, None) if instance else None
+    if not field_file:
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    path = field_file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    if response is None:
+        response = _accelerated_response(field_file, path)
+
+    if response is None:
+        size = stat.st_size
+        byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+        # Only honour Range when If-Range (if sent) still matches this version
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range != etag:
+            byte_range = None
+
+        if byte_range == 'invalid':
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        response = StreamingHttpResponse(
+            _stream_file(path, start, length),
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        response['Content-Length'] = str(length)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    filename = os.path.basename(field_file.name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
@@ -1,23 +1,32 @@
-from rest_framework import viewsets, serializers
+import time
+
+from django.conf import settings
+from rest_framework import viewsets, serializers, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from api.models import Message, Client
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from api.serializers.message_serializer import MessageSerializer
+from api.pagination import MessageCursorPagination
+from api.message_events import message_notifier
+from api.client_resolver import get_request_client
+from api.tasks import verify_upload
 
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = MessageCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         # لو المستخدم عميل فرجّع رسائله
         if not user.is_superuser and not user.is_staff:
-            try:
-                client = Client.objects.get(user=user)
-                return Message.objects.filter(client=client).order_by('timestamp')
-            except Client.DoesNotExist:
+            client = get_request_client(self.request)
+            if client is None:
                 return Message.objects.none()
+            return Message.objects.filter(client=client).order_by('timestamp')
         # ادمن: ممكن يحدد العميل عبر query param
         client = self.request.query_params.get('client_id')
         if client:
@@ -29,11 +38,10 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         # حدّد العميل والـ sender
         if not user.is_superuser and not user.is_staff:
-            try:
-                client = Client.objects.get(user=user)
-                sender = 'client'
-            except Client.DoesNotExist:
+            client = get_request_client(self.request)
+            if client is None:
                 raise serializers.ValidationError({"client": "Client not found."})
+            sender = 'client'
         else:
             # admin: يدعم client or client_id
             client = self.request.data.get('client') or self.request.data.get('client_id')
@@ -46,4 +54,64 @@ class MessageViewSet(viewsets.ModelViewSet):
             sender = 'admin'
 
         # نمرر serializer.save مع الملفات: DRF يتعامل مع request.FILES تلقائياً لأن serializer استقبل data
-        serializer.save(sender=sender, client=client)
\ No newline at end of file
+        message = serializer.save(sender=sender, client=client)
+        if message.file:
+            verify_upload.delay('message', message.pk)
+
+    @action(detail=False, methods=['get'], url_path='sync')
+    def sync(self, request):
+        """
+        Return only messages newer than ``after_id``.
+
+        With ``wait=<seconds>`` the request is held until a new message for
+        the conversation arrives or the (capped) timeout expires.
+        """
+        try:
+            after_id = int(request.query_params.get('after_id', 0))
+            wait = float(request.query_params.get('wait', 0))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'after_id and wait must be numbers.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        wait = max(0, min(wait, settings.MESSAGE_SYNC_MAX_WAIT))
+
+        queryset = self.get_queryset().filter(id__gt=after_id).order_by('id')
+        batch_size = settings.MESSAGE_SYNC_BATCH_SIZE
+
+        messages = list(queryset[:batch_size])
+        if not messages and wait:
+            client_id = self._sync_client_id()
+            deadline = time.monotonic() + wait
+            while client_id is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                generation = message_notifier.generation(client_id)
+                # Re-check the database periodically so messages written by
+                # other worker processes are noticed too
+                message_notifier.wait(
+                    client_id, generation,
+                    min(remaining, settings.MESSAGE_SYNC_POLL_INTERVAL)
+                )
+                messages = list(queryset[:batch_size])
+                if messages:
+                    break
+
+        serializer = self.get_serializer(messages, many=True)
+        return Response({
+            'messages': serializer.data,
+            'last_id': messages[-1].id if messages else after_id,
+            'has_more': len(messages) == batch_size,
+        })
+
+    def _sync_client_id(self):
+        """Client whose conversation a sync request is waiting on."""
+        user = self.request.user
+        if not user.is_superuser and not user.is_staff:
+            client = get_request_client(self.request)
+            return client.id if client else None
+        try:
+            return int(self.request.query_params.get('client_id'))
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,22 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from api.metrics import render_metrics
+
+
+def _scrape_allowed(request):
+    """Only scrapers presenting ``METRICS_AUTH_TOKEN``; without a token the endpoint is closed."""
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and header.startswith('Bearer ') and hmac.compare_digest(header[len('Bearer '):], token)
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    if not _scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,15 +1,15 @@
 from rest_framework import viewsets
-from api.models import ProjectProgress, Client
+from api.models import ProjectProgress
 from api.serializers import ProjectProgressSerializer
 from api.permissions import IsClient
+from api.client_resolver import get_request_client
 
 class ProjectProgressViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectProgressSerializer
     permission_classes = [IsClient]
 
     def get_queryset(self):
-        try:
-            client = Client.objects.get(user=self.request.user)
-            return ProjectProgress.objects.filter(project__client=client)
-        except Client.DoesNotExist:
-            return ProjectProgress.objects.none()
\ No newline at end of file
+        client = get_request_client(self.request)
+        if client is None:
+            return ProjectProgress.objects.none()
+        return ProjectProgress.objects.filter(project__client=client)
\ No newline at end of file
@@ -2,16 +2,14 @@ from rest_framework import viewsets
 from api.models import Project
 from api.serializers import ProjectSerializer
 from api.permissions import IsClient
-from api.models.client import Client
+from api.client_resolver import get_request_client
 
 class ProjectViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     permission_classes = [IsClient]
 
     def get_queryset(self):
-        user = self.request.user
-        try:
-            client = Client.objects.get(user=user)
-            return Project.objects.filter(client=client)
-        except Client.DoesNotExist:
-            return Project.objects.none()
\ No newline at end of file
+        client = get_request_client(self.request)
+        if client is None:
+            return Project.objects.none()
+        return Project.objects.filter(client=client)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import os
+from datetime import date
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.models import BackgroundTask, Client
+from api.permissions import IsAdmin
+from api.statements import (
+    CONTENT_TYPES, EXPORT_FORMATS, export_format_available, iter_statement_rows,
+    statement_file_path, stream_statement_csv,
+)
+from api.tasks import export_statement
+
+
+def _statement_filename(client_id, file_format):
+    scope = f'client-{client_id}' if client_id else 'all-clients'
+    return f'statement-{scope}-{date.today().isoformat()}.{file_format}'
+
+
+def _parse_filters(request):
+    """Return ``(client_id, date_from, date_to)`` or raise ValueError with a message."""
+    client_id = request.query_params.get('client_id')
+    if client_id:
+        try:
+            client_id = int(client_id)
+        except (ValueError, TypeError):
+            raise ValueError('client_id must be a valid integer')
+    else:
+        client_id = None
+
+    dates = []
+    for name in ('date_from', 'date_to'):
+        value = request.query_params.get(name)
+        if value and parse_date(value) is None:
+            raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+        dates.append(value or None)
+    return (client_id, *dates)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_client_statement(request):
+    """
+    Export the statement of one client (``client_id``) or of all clients.
+
+    ``export_format=csv`` (default) streams the file directly; ``xlsx`` and
+    ``pdf`` are rendered by a background task whose status is returned.
+    Optional ``date_from``/``date_to`` limit the rows included.
+    """
+    # 'format' is reserved by DRF for content negotiation
+    file_format = request.query_params.get('export_format', 'csv').lower()
+    if file_format not in EXPORT_FORMATS:
+        return Response({'error': 'Unsupported export format'}, status=status.HTTP_400_BAD_REQUEST)
+    if not export_format_available(file_format):
+        return Response(
+            {'error': f'{file_format.upper()} export is not available on this server'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        client_id, date_from, date_to = _parse_filters(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if client_id is not None and not Client.objects.filter(id=client_id).exists():
+        return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if file_format == 'csv':
+        response = StreamingHttpResponse(
+            stream_statement_csv(iter_statement_rows(client_id, date_from, date_to)),
+            content_type=f"{CONTENT_TYPES['csv']}; charset=utf-8"
+        )
+        response['Content-Disposition'] = f'attachment; filename="{_statement_filename(client_id, "csv")}"'
+        return response
+
+    background_task = export_statement.delay(file_format, client_id=client_id, date_from=date_from, date_to=date_to)
+    return Response(
+        {'task_id': background_task.pk, 'status': background_task.status},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def statement_export_status(request, task_id):
+    """Status of a background statement export; ``?download=1`` returns the file once ready."""
+    background_task = BackgroundTask.objects.filter(pk=task_id, name=export_statement.task_name).first()
+    if background_task is None:
+        return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    data = {'task_id': background_task.pk, 'status': background_task.status}
+    if background_task.status == 'failed':
+        data['error'] = 'The export could not be generated.'
+
+    if background_task.status != 'succeeded' or not request.query_params.get('download'):
+        return Response(data)
+
+    result = background_task.result or {}
+    path = statement_file_path(result.get('filename', ''))
+    if path is None or not os.path.exists(path):
+        return Response({'error': 'Export file no longer exists'}, status=status.HTTP_410_GONE)
+
+    file_format = result.get('format')
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=_statement_filename(background_task.kwargs.get('client_id'), file_format),
+        content_type=CONTENT_TYPES.get(file_format, 'application/octet-stream')
+    )
@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import BaseParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api.client_resolver import get_request_client
+from api.file_types import SNIFF_BYTES, extension_type, sniff_file_type
+from api.models import Client, Expense, Message, UploadSession
+from api.serializers.message_serializer import MessageSerializer
+from api.serializers.expense_serializer import ExpenseSerializer
+from api.serializers.upload_serializer import UploadSessionSerializer
+
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RawChunkParser(BaseParser):
+    """Accept raw chunk bodies; the view streams them itself."""
+    media_type = 'application/octet-stream'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return {}
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads for expense bills and message attachments.
+
+    1. ``POST uploads/`` with ``filename``, ``total_size`` and ``target``.
+    2. ``PUT uploads/<id>/chunk/?offset=<n>`` with the raw bytes of each chunk.
+       After a dropped connection, ``GET uploads/<id>/`` returns
+       ``received_size`` to resume from.
+    3. ``POST uploads/<id>/complete/`` attaches the file to an expense
+       (``object_id``) or message (``object_id``, or a new message).
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        os.makedirs(settings.CHUNKED_UPLOAD_TEMP_DIR, exist_ok=True)
+        session = serializer.save(user=self.request.user)
+        open(session.part_path, 'wb').close()
+
+    def perform_destroy(self, instance):
+        instance.discard_part()
+        instance.status = 'aborted'
+        instance.save(update_fields=['status', 'updated_at'])
+
+    @action(detail=True, methods=['put'], url_path='chunk', parser_classes=[RawChunkParser])
+    def upload_chunk(self, request, pk=None):
+        """
+        Append one chunk.
+
+        The body is first streamed to a temporary file without holding any
+        lock; the session row is only locked to check the offset, copy the
+        staged bytes into place and advance ``received_size``.
+        """
+        session = self.get_object()
+        if session.status != 'uploading':
+            return Response({'error': f'Upload is {session.status}.'}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            offset = int(request.query_params.get('offset', session.received_size))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid offset.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if offset != session.received_size:
+            # The client is out of sync (e.g. a retried chunk); tell it where to resume
+            return self._unexpected_offset(session)
+        if length <= 0 or length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+            return Response({'error': 'Invalid chunk size.'}, status=status.HTTP_400_BAD_REQUEST)
+        if offset + length > session.total_size:
+            return Response({'error': 'Chunk exceeds the declared file size.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with tempfile.TemporaryFile(dir=settings.CHUNKED_UPLOAD_TEMP_DIR) as staged:
+            stream = request.stream
+            written = 0
+            while written < length:
+                block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                if offset == 0 and written == 0:
+                    error = self._check_file_type(session, block)
+                    if error:
+                        return error
+                staged.write(block)
+                written += len(block)
+
+            if written != length:
+                return Response(
+                    {'error': 'Incomplete chunk.', 'received_size': session.received_size},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            with transaction.atomic():
+                locked = self.get_queryset().select_for_update().get(pk=session.pk)
+                if locked.status != 'uploading':
+                    return Response({'error': f'Upload is {locked.status}.'}, status=status.HTTP_409_CONFLICT)
+                if offset != locked.received_size:
+                    # Another request appended this range while the body was in flight
+                    return self._unexpected_offset(locked)
+
+                staged.seek(0)
+                with open(locked.part_path, 'r+b') as part:
+                    part.seek(offset)
+                    shutil.copyfileobj(staged, part, STREAM_BLOCK_SIZE)
+                    part.truncate(offset + written)
+
+                if offset == 0:
+                    locked.detected_type = session.detected_type
+                locked.received_size = offset + written
+                locked.save(update_fields=['received_size', 'detected_type', 'updated_at'])
+
+        return Response(self.get_serializer(locked).data)
+
+    def _unexpected_offset(self, session):
+        return Response(
+            {'error': 'Unexpected offset.', 'received_size': session.received_size},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    def _check_file_type(self, session, head):
+        """Validate the real file type from the magic bytes of the first chunk."""
+        detected = sniff_file_type(head[:SNIFF_BYTES])
+        if detected is None or detected != extension_type(session.filename):
+            session.status = 'aborted'
+            session.save(update_fields=['status', 'updated_at'])
+            session.discard_part()
+            return Response({'error': 'Unsupported file type.'}, status=status.HTTP_400_BAD_REQUEST)
+        session.detected_type = detected
+        return None
+
+    @action(detail=True, methods=['post'], url_path='complete')
+    def complete(self, request, pk=None):
+        """Attach the assembled file to its expense or message."""
+        session = self.get_object()
+        if session.status != 'uploading' or not session.is_complete:
+            return Response(
+                {'error': 'Upload is not complete.', 'received_size': session.received_size},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if session.target == 'expense_bill':
+            target = self._get_expense(request)
+            field, serializer_class = 'bill', ExpenseSerializer
+        else:
+            target = self._get_or_create_message(request)
+            field, serializer_class = 'file', MessageSerializer
+        if isinstance(target, Response):
+            return target
+
+        with open(session.part_path, 'rb') as part:
+            getattr(target, field).save(session.filename, File(part), save=True)
+
+        session.discard_part()
+        session.status = 'completed'
+        session.save(update_fields=['status', 'updated_at'])
+
+        serializer = serializer_class(target, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def _owned(self, queryset):
+        """Admins may attach to any row; clients only to their own."""
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return queryset
+        client = get_request_client(self.request)
+        return queryset.filter(client=client) if client else queryset.none()
+
+    def _get_expense(self, request):
+        expense = self._owned(Expense.objects.all()).filter(pk=request.data.get('object_id')).first()
+        if expense is None:
+            return Response({'error': 'Expense not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return expense
+
+    def _get_or_create_message(self, request):
+        object_id = request.data.get('object_id')
+        if object_id:
+            message = self._owned(Message.objects.all()).filter(pk=object_id).first()
+            if message is None:
+                return Response({'error': 'Message not found.'}, status=status.HTTP_404_NOT_FOUND)
+            return message
+
+        user = request.user
+        if user.is_staff or user.is_superuser:
+            client_id = request.data.get('client') or request.data.get('client_id')
+            client = self._owned_client(client_id)
+            sender = 'admin'
+        else:
+            client = get_request_client(request)
+            sender = 'client'
+        if client is None:
+            return Response({'error': 'Client not found.'}, status=status.HTTP_404_NOT_FOUND)
+        # Saved together with the file so the message is only created (and pushed) once
+        return Message(client=client, sender=sender, content=request.data.get('content', ''))
+
+    def _owned_client(self, client_id):
+        try:
+            return Client.objects.get(id=client_id)
+        except (Client.DoesNotExist, ValueError, TypeError):
+            return None
@@ -3,15 +3,86 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django.db import transaction
-from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 from api.models import Client, ExpenseVersion, PaymentVersion, Expense, CashReceipt
-from api.serializers.version_serializer import ExpenseVersionSerializer, PaymentVersionSerializer
+from api.serializers.version_serializer import (
+    ExpenseVersionSerializer, PaymentVersionSerializer,
+    ExpenseVersionListSerializer, PaymentVersionListSerializer,
+)
+from api.client_resolver import get_request_client
+from api.media_urls import protected_file_url
 
 
-class BaseVersionViewSet(viewsets.ModelViewSet):
-    """Base class for version viewsets with common functionality."""
+class VersionListMixin:
+    """
+    Serve list responses without loading the snapshot JSON columns.
+
+    Lists return each version's stored ``item_count``/``total_amount``;
+    the items themselves are only returned by detail retrieval.
+    """
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = queryset.defer(self.version_model.payload_field, 'delta')
+        return queryset
+
+
+class VersionDiffMixin:
+    """Adds a ``diff`` action comparing two version numbers of one client."""
+
+    def _get_diff_client(self, request):
+        """Client whose versions are compared: the requesting user's own profile."""
+        return get_request_client(request)
+
+    @action(detail=False, methods=['get'])
+    def diff(self, request):
+        """Return added/changed/removed items between versions ``from`` and ``to``."""
+        try:
+            client = self._get_diff_client(request)
+            if client is None:
+                return Response({'error': 'Client profile not found'}, status=status.HTTP_404_NOT_FOUND)
+
+            try:
+                from_number = int(request.query_params.get('from'))
+                to_number = int(request.query_params.get('to'))
+            except (ValueError, TypeError):
+                return Response(
+                    {'error': 'from and to must be valid version numbers.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            manager = self.version_model.objects
+            from_items = manager.reconstruct(client, from_number)
+            to_items = manager.reconstruct(client, to_number)
+            if from_items is None or to_items is None:
+                return Response({'error': 'Version not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({
+                'client_id': client.id,
+                'from': from_number,
+                'to': to_number,
+                **self.version_model.compute_delta(from_items, to_items)
+            })
+
+        except ValidationError as e:
+            return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BaseVersionViewSet(VersionListMixin, VersionDiffMixin, viewsets.ModelViewSet):
+    """
+    Base class for version viewsets with common functionality.
+
+    Versions are a history: they can be created and read but not edited
+    or deleted, since later versions are stored as changes on top of them.
+    """
+    http_method_names = ['get', 'post', 'head', 'options']
     
     def get_queryset(self):
         """Filter queryset by client_id if provided."""
@@ -37,12 +108,16 @@ class BaseVersionViewSet(viewsets.ModelViewSet):
         
         return client_id
     
-    def _get_client(self, client_id):
-        """Retrieve client instance or raise ValidationError."""
+    def _get_client(self, client_id, lock=False):
+        """Retrieve client instance (row-locked if ``lock``) or raise ValidationError."""
+        queryset = Client.objects.select_for_update() if lock else Client.objects
         try:
-            return Client.objects.get(id=client_id)
+            return queryset.get(id=client_id)
         except Client.DoesNotExist:
             raise ValidationError({'client': 'Client not found.'})
+
+    def _get_diff_client(self, request):
+        return self._get_client(self._validate_client_id(request))
     
     def _serialize_expense_data(self, expense):
         """Serialize expense data to JSON-serializable format."""
@@ -52,7 +127,7 @@ class BaseVersionViewSet(viewsets.ModelViewSet):
             'description': expense.description,
             'amount': str(expense.amount),
             'status': expense.status,
-            'bill_url': expense.bill.url if expense.bill else None,
+            'bill_url': protected_file_url('expenses', expense.id) if expense.bill else None,
             'created_at': expense.created_at.isoformat() if expense.created_at else None,
             'updated_at': expense.updated_at.isoformat() if expense.updated_at else None,
         }
@@ -71,6 +146,7 @@ class BaseVersionViewSet(viewsets.ModelViewSet):
 class ExpenseVersionViewSet(BaseVersionViewSet):
     """ViewSet for managing expense versions."""
     serializer_class = ExpenseVersionSerializer
+    list_serializer_class = ExpenseVersionListSerializer
     permission_classes = [IsAdminUser]
     version_model = ExpenseVersion
 
@@ -80,7 +156,9 @@ class ExpenseVersionViewSet(BaseVersionViewSet):
         """Create a new expense version for the specified client."""
         try:
             client_id = self._validate_client_id(request)
-            client = self._get_client(client_id)
+            # Lock the client row so concurrent requests get consecutive numbers
+            client = self._get_client(client_id, lock=True)
+            new_version_number = ExpenseVersion.objects.allocate_version_number(client)
             
             # Get current expenses data with related objects
             current_expenses = Expense.objects.filter(client=client).select_related('client')
@@ -88,29 +166,22 @@ class ExpenseVersionViewSet(BaseVersionViewSet):
             # Convert expenses to JSON-serializable format
             expenses_data = [self._serialize_expense_data(expense) for expense in current_expenses]
             
-            # Calculate new version number
-            new_version_number = client.expenses_version_count + 1
-            
             # Create new version
-            version = ExpenseVersion.objects.create(
-                client=client,
-                version_number=new_version_number,
-                discussion_completed_at=timezone.now(),
-                expenses_data=expenses_data
+            version = ExpenseVersion.objects.create_snapshot(
+                client,
+                new_version_number,
+                expenses_data,
+                discussion_completed_at=client.expenses_discussion_completed_at
             )
             
-            # Update client discussion status atomically
-            client.expenses_version_count = new_version_number
-            client.expenses_discussion_completed = True
-            client.expenses_discussion_completed_at = timezone.now()
-            client.save()
-            
             serializer = self.get_serializer(version)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except ValidationError as e:
+            transaction.set_rollback(True)
             return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            transaction.set_rollback(True)
             return Response(
                 {'error': 'An unexpected error occurred while creating the expense version.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -120,6 +191,7 @@ class ExpenseVersionViewSet(BaseVersionViewSet):
 class PaymentVersionViewSet(BaseVersionViewSet):
     """ViewSet for managing payment versions."""
     serializer_class = PaymentVersionSerializer
+    list_serializer_class = PaymentVersionListSerializer
     permission_classes = [IsAdminUser]
     version_model = PaymentVersion
 
@@ -129,7 +201,9 @@ class PaymentVersionViewSet(BaseVersionViewSet):
         """Create a new payment version for the specified client."""
         try:
             client_id = self._validate_client_id(request)
-            client = self._get_client(client_id)
+            # Lock the client row so concurrent requests get consecutive numbers
+            client = self._get_client(client_id, lock=True)
+            new_version_number = PaymentVersion.objects.allocate_version_number(client)
             
             # Get current payments data with related objects
             current_payments = CashReceipt.objects.filter(client=client).select_related('client')
@@ -137,56 +211,49 @@ class PaymentVersionViewSet(BaseVersionViewSet):
             # Convert payments to JSON-serializable format
             payments_data = [self._serialize_payment_data(payment) for payment in current_payments]
             
-            # Calculate new version number
-            new_version_number = client.payments_version_count + 1
-            
             # Create new version
-            version = PaymentVersion.objects.create(
-                client=client,
-                version_number=new_version_number,
-                discussion_completed_at=timezone.now(),
-                payments_data=payments_data
+            version = PaymentVersion.objects.create_snapshot(
+                client,
+                new_version_number,
+                payments_data,
+                discussion_completed_at=client.payments_discussion_completed_at
             )
             
-            # Update client discussion status atomically
-            client.payments_version_count = new_version_number
-            client.payments_discussion_completed = True
-            client.payments_discussion_completed_at = timezone.now()
-            client.save()
-            
             serializer = self.get_serializer(version)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except ValidationError as e:
+            transaction.set_rollback(True)
             return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            transaction.set_rollback(True)
             return Response(
                 {'error': 'An unexpected error occurred while creating the payment version.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class BaseClientVersionViewSet(viewsets.ReadOnlyModelViewSet):
+class BaseClientVersionViewSet(VersionListMixin, VersionDiffMixin, viewsets.ReadOnlyModelViewSet):
     """Base class for client-accessible version viewsets."""
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Only return versions for the authenticated client."""
-        user = self.request.user
-        try:
-            client = Client.objects.get(user=user)
-            return self.version_model.objects.filter(client=client)
-        except Client.DoesNotExist:
+        client = get_request_client(self.request)
+        if client is None:
             return self.version_model.objects.none()
+        return self.version_model.objects.filter(client=client)
 
 
 class ClientExpenseVersionViewSet(BaseClientVersionViewSet):
     """Client-accessible expense versions (read-only)."""
     serializer_class = ExpenseVersionSerializer
+    list_serializer_class = ExpenseVersionListSerializer
     version_model = ExpenseVersion
 
 
 class ClientPaymentVersionViewSet(BaseClientVersionViewSet):
     """Client-accessible payment versions (read-only)."""
     serializer_class = PaymentVersionSerializer
+    list_serializer_class = PaymentVersionListSerializer
     version_model = PaymentVersion
@@ -1,10 +1,20 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from api.caching import get_or_compute
 from api.models import WorkItem
 from api.serializers.work_item_serializer import WorkItemSerializer
+from api.tasks import process_work_item_images
 
 
 class WorkItemViewSet(viewsets.ModelViewSet):
@@ -24,37 +34,87 @@ class WorkItemViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         # Set the main image to be the after image if provided
-        after_image = self.request.FILES.get('after_image')
+        after_image = serializer.validated_data.get('after_image')
         if after_image:
-            serializer.save(image=after_image)
+            work_item = serializer.save(image=after_image)
         else:
             # If no after image, save without main image (it's optional now)
-            serializer.save()
+            work_item = serializer.save()
+        process_work_item_images.delay(work_item.pk)
 
     def perform_update(self, serializer):
         # Set the main image to be the after image if provided
-        after_image = self.request.FILES.get('after_image')
+        after_image = serializer.validated_data.get('after_image')
         if after_image:
-            serializer.save(image=after_image)
+            work_item = serializer.save(image=after_image)
         else:
             # If no after image, save without updating main image
-            serializer.save()
+            work_item = serializer.save()
+        process_work_item_images.delay(work_item.pk)
+
+
+def _portfolio_cache_key(category):
+    return f"portfolio:work_items:{category}"
+
+
+def invalidate_portfolio_cache():
+    """Drop every cached gallery response (called when a WorkItem changes)."""
+    categories = ['all'] + [choice for choice, _label in WorkItem.CATEGORY_CHOICES]
+    caches['portfolio'].delete_many([_portfolio_cache_key(category) for category in categories])
+
+
+def _build_portfolio_entry(category):
+    """Render the gallery for a category once, with its validators."""
+    queryset = WorkItem.objects.all()
+    if category != 'all':
+        queryset = queryset.filter(category=category)
+
+    items = list(queryset)
+    content = JSONRenderer().render(WorkItemSerializer(items, many=True).data)
+    last_modified = max((item.updated_at for item in items), default=None)
+    return {
+        'content': content,
+        'etag': '"%s"' % hashlib.md5(content).hexdigest(),
+        'last_modified': last_modified.timestamp() if last_modified else None,
+    }
 
 
 @api_view(['GET'])
 def get_work_items(request):
     """
-    Get all work items for public display
+    Get all work items for public display.
+
+    The rendered payload is cached per category until a WorkItem changes,
+    and conditional requests (If-None-Match / If-Modified-Since) get a 304.
     """
     try:
         category = request.query_params.get('category', 'all')
-        queryset = WorkItem.objects.all()
-        
-        if category != 'all':
-            queryset = queryset.filter(category=category)
+        valid_categories = {'all'} | {choice for choice, _label in WorkItem.CATEGORY_CHOICES}
         
-        serializer = WorkItemSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if category in valid_categories:
+            entry = get_or_compute(
+                caches['portfolio'],
+                _portfolio_cache_key(category),
+                lambda: _build_portfolio_entry(category),
+                settings.PORTFOLIO_CACHE_TIMEOUT,
+                metric='portfolio'
+            )
+        else:
+            # Unknown categories are not cached; they simply return an empty list
+            entry = _build_portfolio_entry(category)
+
+        last_modified = int(entry['last_modified']) if entry['last_modified'] is not None else None
+        response = get_conditional_response(
+            request, etag=entry['etag'], last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(entry['content'], content_type='application/json')
+
+        response['ETag'] = entry['etag']
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = settings.PORTFOLIO_CACHE_CONTROL
+        return response
     except Exception as e:
         return Response(
             {'error': 'Internal server error: ' + str(e)},
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
     'corsheaders',
     # Third-party
     'rest_framework',
+    'channels',
     # Local apps
     'api',
     
@@ -52,6 +54,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.RequestInstrumentationMiddleware',
     'api.middleware.SecurityHeadersMiddleware',
     'api.middleware.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -83,6 +87,25 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'elbatal_backend.wsgi.application'
+ASGI_APPLICATION = 'elbatal_backend.asgi.application'
+
+# Channel layer for WebSocket chat push. The in-memory layer only reaches
+# sockets served by the same process; set CHANNEL_REDIS_URL when running
+# several ASGI workers (requires channels_redis).
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
 
 
 # Database
@@ -99,10 +122,25 @@ DATABASES = {
         'PORT': os.environ.get('DB_PORT', '5432'),
         'OPTIONS': {
             'sslmode': os.environ.get('DB_SSLMODE', 'prefer'),
-        }
+        },
+        # Keep connections open between requests (0 = reconnect on every request)
+        # and check them before reuse so a dropped connection is replaced
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
     }
 }
 
+# Connection pooling: '' (persistent connections per worker, above) or
+# 'pgbouncer', the supported way to pool across workers and servers: run
+# PgBouncer in transaction mode and point DB_HOST/DB_PORT at it. Server-side
+# cursors cannot be used through it, so they are disabled. (Django's own
+# psycopg pool needs Django 5.1+; this project is on 4.2.)
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', '')
+if DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DB_POOL_MODE:
+    raise ImproperlyConfigured(f"Unknown DB_POOL_MODE: {DB_POOL_MODE!r} (use '' or 'pgbouncer')")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -164,6 +202,10 @@ REST_FRAMEWORK = {
     )
 }
 
+# Expense, cash receipt and message lists requested without cursor/page_size
+# return at most this many rows (with a Link header to the rest)
+UNPAGINATED_LIST_MAX_ROWS = 1000
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -176,9 +218,155 @@ SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower()
 CSRF_COOKIE_SECURE = os.environ.get('CSRF_COOKIE_SECURE', 'False').lower() == 'true'
 X_FRAME_OPTIONS = 'DENY'
 
+# Caches. The shared tier is Redis when CACHE_REDIS_URL is set (requires
+# redis-py), otherwise a file cache under CACHE_FILE_DIR shared by the workers
+# of one host. 'default', 'dashboard' and 'portfolio' keep a small in-process
+# LRU in front of it (local copies live CACHE_LOCAL_TIMEOUT seconds at most).
+# Rate-limit counters need atomic increments, which only Redis provides here:
+# without it 'ratelimit' stays per-process (limits apply per worker, and
+# `manage.py check` warns) and sessions are stored in the database only.
+# Bump CACHE_KEY_VERSION to orphan every cached entry after changing what is stored.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', '')
+CACHE_FILE_DIR = os.environ.get('CACHE_FILE_DIR', os.path.join(BASE_DIR, 'cache'))
+CACHE_KEY_VERSION = int(os.environ.get('CACHE_KEY_VERSION', '1'))
+CACHE_LOCAL_TIMEOUT = 5
+
+
+def _shared_cache(name):
+    if CACHE_REDIS_URL:
+        config = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_REDIS_URL}
+    else:
+        config = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_FILE_DIR, name),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    return {**config, 'KEY_PREFIX': f'elbatal:{name}', 'VERSION': CACHE_KEY_VERSION}
+
+
+def _two_tier_cache(name, local_entries):
+    return {
+        'BACKEND': 'api.caching.TwoTierCache',
+        'LOCATION': name,
+        'OPTIONS': {
+            'SHARED': _shared_cache(name),
+            'LOCAL_MAX_ENTRIES': local_entries,
+            'LOCAL_TIMEOUT': CACHE_LOCAL_TIMEOUT,
+        },
+    }
+
+
+CACHES = {
+    'default': _two_tier_cache('default', 1000),
+    'dashboard': _two_tier_cache('dashboard', 50),
+    'portfolio': _two_tier_cache('portfolio', 50),
+}
+if CACHE_REDIS_URL:
+    CACHES['ratelimit'] = _shared_cache('ratelimit')
+    CACHES['sessions'] = _shared_cache('sessions')
+    # Sessions (Django admin) are read from Redis and written through to the database
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sessions'
+else:
+    CACHES['ratelimit'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ratelimit'}
+
+# Admin dashboard payloads are cached until the data behind them changes;
+# this is the upper bound on their age
+DASHBOARD_CACHE_TIMEOUT = 60
+
 # Rate limiting settings
 RATELIMIT_ENABLE = True
-RATELIMIT_USE_CACHE = 'default'
+RATELIMIT_USE_CACHE = 'ratelimit'
+# Anonymous clients are limited per IP, authenticated clients per user
+RATELIMIT_DEFAULT = {'limit': 100, 'window': 60}
+RATELIMIT_USER_DEFAULT = {'limit': 300, 'window': 60}
+# Route-specific limits (path prefix, first match wins)
+RATELIMIT_RULES = [
+    {'path': '/login/', 'limit': 10, 'window': 60},
+    {'path': '/api/token/', 'limit': 10, 'window': 60},
+    {'path': '/api/auth/login/', 'limit': 10, 'window': 60},
+]
+
+# Client profile lookups are cached across requests for this many seconds (0 disables)
+CLIENT_PROFILE_CACHE_TIMEOUT = int(os.environ.get('CLIENT_PROFILE_CACHE_TIMEOUT', '30'))
+
+# Public portfolio (work items) response caching
+PORTFOLIO_CACHE_TIMEOUT = 60 * 60  # invalidated on every WorkItem change
+PORTFOLIO_CACHE_CONTROL = os.environ.get(
+    'PORTFOLIO_CACHE_CONTROL',
+    'public, max-age=60, s-maxage=300, stale-while-revalidate=600'
+)
+
+# Background tasks: 'worker' (manage.py run_tasks), 'thread' (in-process pool) or 'sync'.
+# In 'thread' mode retries are re-submitted by the same process; run
+# `manage.py run_tasks --once` after a restart to drain any left pending.
+TASK_QUEUE_MODE = os.environ.get('TASK_QUEUE_MODE', 'thread')
+TASK_QUEUE_THREADS = 2
+TASK_QUEUE_RETRY_BASE_SECONDS = 10
+
+# Resumable chunked uploads of bills and message attachments
+CHUNKED_UPLOAD_TEMP_DIR = os.environ.get(
+    'CHUNKED_UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'upload_tmp')
+)
+CHUNKED_UPLOAD_MAX_SIZE = 10 * 1024 * 1024  # same limit as direct uploads
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 2 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Protected media downloads: '' (stream from Django), 'nginx' (X-Accel-Redirect)
+# or 'sendfile' (X-Sendfile). With nginx, MEDIA_ACCEL_REDIRECT_PREFIX must map
+# to an `internal` location aliased to MEDIA_ROOT.
+MEDIA_ACCEL_MODE = os.environ.get('MEDIA_ACCEL_MODE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Rendered XLSX/PDF statements (kept outside MEDIA_ROOT; served to admins only)
+STATEMENT_EXPORT_DIR = os.environ.get(
+    'STATEMENT_EXPORT_DIR', os.path.join(BASE_DIR, 'exports')
+)
+
+# Expense/payment versions: 'delta' stores only the changes from the previous
+# version with a full checkpoint every VERSION_CHECKPOINT_INTERVAL versions;
+# 'full' stores every version as a complete snapshot.
+VERSION_STORAGE_MODE = os.environ.get('VERSION_STORAGE_MODE', 'delta')
+VERSION_CHECKPOINT_INTERVAL = 10
+
+# Per-request SQL/timing instrumentation of a sampled share of requests (one
+# log line per request on the api.instrumentation logger, plus a Server-Timing
+# header in DEBUG or for staff users)
+REQUEST_INSTRUMENTATION_ENABLED = os.environ.get('REQUEST_INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('REQUEST_INSTRUMENTATION_SAMPLE_RATE', '0.05'))
+REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+REQUEST_INSTRUMENTATION_SERVER_TIMING = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Prometheus metrics served at /metrics. With several gunicorn workers set
+# METRICS_MULTIPROC_DIR so every worker's totals are merged (clear it on start).
+# Scrapers must send METRICS_AUTH_TOKEN as a Bearer token; while it is empty
+# the endpoint answers 403 to everyone (client IPs are not trusted because
+# requests arrive through the local reverse proxy).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+
+# Input validation: text/JSON bodies (and the text fields of multipart bodies)
+# larger than this are rejected with 413 instead of being partly scanned
+INPUT_VALIDATION_MAX_INSPECT_BYTES = 1024 * 1024
 
 # JWT Security enhancements
 SIMPLE_JWT = {
@@ -196,4 +384,9 @@ SIMPLE_JWT = {
 }
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Incremental message sync (long-poll) settings
+MESSAGE_SYNC_MAX_WAIT = int(os.environ.get('MESSAGE_SYNC_MAX_WAIT', '25'))  # seconds
+MESSAGE_SYNC_POLL_INTERVAL = float(os.environ.get('MESSAGE_SYNC_POLL_INTERVAL', '2'))  # seconds
+MESSAGE_SYNC_BATCH_SIZE = 200
@@ -0,0 +1,39 @@
+"""
+Settings for ``manage.py benchmark_api``.
+
+Uses a throwaway SQLite database by default; set BENCHMARK_DATABASE=postgres
+to benchmark against the PostgreSQL server configured by the DB_* variables
+(a separate test database is created and dropped there).
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+
+
+if os.environ.get('BENCHMARK_DATABASE', 'sqlite') != 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'benchmark.sqlite3'),
+        }
+    }
+
+# The DRF test client sends requests to "testserver"
+ALLOWED_HOSTS = [*ALLOWED_HOSTS, 'testserver']
+
+# Measure the views, not the throttling or background work
+RATELIMIT_ENABLE = False
+TASK_QUEUE_MODE = 'worker'
+
+# Seeded users share one password; a fast hasher keeps logins from dominating timings
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Every endpoint starts with cleared caches; keep that away from the shared tier
+CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+    for alias in CACHES
+}
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'benchmark_media')
+STATEMENT_EXPORT_DIR = os.path.join(BASE_DIR, 'benchmark_exports')
+CHUNKED_UPLOAD_TEMP_DIR = os.path.join(BASE_DIR, 'benchmark_uploads')
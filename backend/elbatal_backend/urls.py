@@ -22,10 +22,12 @@ from rest_framework_simplejwt.views import (
 )
 from django.conf import settings
 from django.conf.urls.static import static
+from api.views.metrics_views import metrics_view
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('api.urls')),
     path('api/', include('api.urls')),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -4,6 +4,7 @@ import { Input } from './ui/input';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from './ui/select';
 import { TableCell, TableRow } from './ui/table';
 import { Check, X, Edit, Trash2, FileText } from 'lucide-react';
+import { ProtectedFileLink } from './ProtectedFileLink';
 
 interface EditableExpenseRowProps {
   expense: any;
@@ -115,15 +116,13 @@ export function EditableExpenseRow({ expense, onUpdate, onDelete, formatCurrency
       <TableCell>
         <div className="flex gap-1">
           {expense.bill_url ? (
-            <a
+            <ProtectedFileLink
               href={expense.bill_url}
-              target="_blank"
-              rel="noopener noreferrer"
               className="text-blue-500 hover:text-blue-700 flex items-center gap-1"
             >
               <FileText className="h-4 w-4" />
               {t('عرض', 'View')}
-            </a>
+            </ProtectedFileLink>
           ) : (
             <span className="text-gray-400">-</span>
           )}
@@ -0,0 +1,79 @@
+import { useEffect, useState } from 'react';
+import type { MouseEvent, ReactNode } from 'react';
+import api from '../lib/api';
+
+// Bills and attachments are served by an authenticated endpoint, so a plain
+// link or <img> would be sent without the JWT: fetch them as blobs instead.
+async function fetchFileUrl(url: string): Promise<string> {
+  const response = await api.get<Blob>(url, { responseType: 'blob' });
+  return URL.createObjectURL(response.data);
+}
+
+export async function openProtectedFile(url: string) {
+  // Open the tab synchronously so popup blockers tie it to the click
+  const tab = window.open('', '_blank');
+  try {
+    const objectUrl = await fetchFileUrl(url);
+    if (tab) {
+      tab.location.href = objectUrl;
+    } else {
+      window.location.href = objectUrl;
+    }
+    window.setTimeout(() => URL.revokeObjectURL(objectUrl), 60000);
+  } catch (error) {
+    tab?.close();
+    console.error('Error opening file:', error);
+  }
+}
+
+interface ProtectedFileLinkProps {
+  href: string;
+  className?: string;
+  children: ReactNode;
+}
+
+export function ProtectedFileLink({ href, className, children }: ProtectedFileLinkProps) {
+  const handleClick = (event: MouseEvent<HTMLAnchorElement>) => {
+    event.preventDefault();
+    openProtectedFile(href);
+  };
+
+  return (
+    <a href={href} onClick={handleClick} className={className}>
+      {children}
+    </a>
+  );
+}
+
+interface ProtectedImageProps {
+  src: string;
+  alt: string;
+  className?: string;
+  onClick?: () => void;
+}
+
+export function ProtectedImage({ src, alt, className, onClick }: ProtectedImageProps) {
+  const [objectUrl, setObjectUrl] = useState<string | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    let created: string | null = null;
+    fetchFileUrl(src)
+      .then((url) => {
+        created = url;
+        if (cancelled) {
+          URL.revokeObjectURL(url);
+        } else {
+          setObjectUrl(url);
+        }
+      })
+      .catch((error) => console.error('Error loading image:', error));
+    return () => {
+      cancelled = true;
+      if (created) URL.revokeObjectURL(created);
+    };
+  }, [src]);
+
+  if (!objectUrl) return null;
+  return <img src={objectUrl} alt={alt} className={className} onClick={onClick} />;
+}
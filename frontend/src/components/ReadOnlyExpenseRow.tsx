@@ -1,5 +1,6 @@
 import { TableCell, TableRow } from './ui/table';
 import { FileText } from 'lucide-react';
+import { ProtectedFileLink } from './ProtectedFileLink';
 
 interface ReadOnlyExpenseRowProps {
   expense: any;
@@ -27,15 +28,13 @@ export function ReadOnlyExpenseRow({ expense, formatCurrency, t }: ReadOnlyExpen
       <TableCell>
         <div className="flex gap-1">
           {expense.bill_url ? (
-            <a
+            <ProtectedFileLink
               href={expense.bill_url}
-              target="_blank"
-              rel="noopener noreferrer"
               className="text-blue-500 hover:text-blue-700 flex items-center gap-1"
             >
               <FileText className="h-4 w-4" />
               {t('عرض', 'View')}
-            </a>
+            </ProtectedFileLink>
           ) : (
             <span className="text-gray-400">-</span>
           )}
@@ -158,7 +158,7 @@ export function useClientPayments(clientId: number) {
 }
 
 /**
- * Custom hook for expense versions
+ * Custom hook for expense versions (totals only; see useVersionItems)
  */
 export function useExpenseVersions(clientId: number) {
   return useApi(
@@ -168,7 +168,7 @@ export function useExpenseVersions(clientId: number) {
 }
 
 /**
- * Custom hook for payment versions
+ * Custom hook for payment versions (totals only; see useVersionItems)
  */
 export function usePaymentVersions(clientId: number) {
   return useApi(
@@ -177,6 +177,28 @@ export function usePaymentVersions(clientId: number) {
   );
 }
 
+/**
+ * Custom hook loading the items of expense/payment versions on demand.
+ * Version lists only carry the stored totals; the items come from the
+ * version detail endpoint and are kept once loaded (versions never change).
+ */
+export function useVersionItems(scope: 'admin' | 'client') {
+  const [versionItems, setVersionItems] = useState<{ [key: string]: any[] }>({});
+
+  const loadVersionItems = useCallback(async (kind: 'expenses' | 'payments', version: { id: number }) => {
+    const key = `${kind}_${version.id}`;
+    if (versionItems[key]) return versionItems[key];
+
+    const path = kind === 'expenses' ? 'expense-versions' : 'payment-versions';
+    const response = await api.get(`${scope}/${path}/${version.id}/`);
+    const items = response.data[`${kind}_data`] || [];
+    setVersionItems(prev => ({ ...prev, [key]: items }));
+    return items;
+  }, [scope, versionItems]);
+
+  return { versionItems, loadVersionItems };
+}
+
 /**
  * Custom hook for client dashboard data
  */
@@ -29,7 +29,9 @@ import {
 import { useState, useEffect } from 'react';
 import { Textarea } from '../components/ui/textarea';
 import api from '../lib/api';
+import { useVersionItems } from '../hooks/useApi';
 import { secureStorage } from '../lib/secureStorage';
+import { ProtectedFileLink, ProtectedImage, openProtectedFile } from '../components/ProtectedFileLink';
 
 export function ClientDashboard() {
   const { t, language, setLanguage, theme, setTheme } = useApp();
@@ -136,6 +138,7 @@ export function ClientDashboard() {
   const [expensesDiscussionCompletedAt, setExpensesDiscussionCompletedAt] = useState<string | null>(null);
   const [paymentsDiscussionCompletedAt, setPaymentsDiscussionCompletedAt] = useState<string | null>(null);
   const [collapsedVersions, setCollapsedVersions] = useState<{[key: string]: boolean}>({});
+  const { versionItems, loadVersionItems } = useVersionItems('client');
 
   const fetchData = async () => {
     try {
@@ -263,10 +266,7 @@ export function ClientDashboard() {
 
   // Calculate total payments from all payment versions
   const totalPaymentVersions = paymentVersions.reduce((sum: any, version: any) => {
-    const versionTotal = version.payments_data?.reduce((versionSum: number, pay: any) => {
-      return versionSum + (parseFloat(String(pay.amount)) || 0);
-    }, 0) || 0;
-    return sum + versionTotal;
+    return sum + (parseFloat(String(version.total_amount)) || 0);
   }, 0);
 
   // Total paid includes all payments from all tables
@@ -284,10 +284,7 @@ export function ClientDashboard() {
 
   // Calculate total expenses from all expense versions
   const totalExpenseVersions = expenseVersions.reduce((sum: any, version: any) => {
-    const versionTotal = version.expenses_data?.reduce((versionSum: number, exp: any) => {
-      return versionSum + (parseFloat(String(exp.amount)) || 0);
-    }, 0) || 0;
-    return sum + versionTotal;
+    return sum + (parseFloat(String(version.total_amount)) || 0);
   }, 0);
 
   // Total cost includes all expenses from all tables
@@ -331,7 +328,14 @@ export function ClientDashboard() {
     return `${day}/${month}/${year}`;
   };
 
-  const handleToggleVersion = (versionKey: string) => {
+  const handleToggleVersion = (type: 'expenses' | 'payments', version: any) => {
+    const versionKey = `${type}_${version.id}`;
+    // Version lists only carry totals; load the items when a version is opened
+    if (collapsedVersions[versionKey] !== false) {
+      loadVersionItems(type, version).catch(() => {
+        // Error handling is done by the API service
+      });
+    }
     setCollapsedVersions(prev => ({
       ...prev,
       [versionKey]: !prev[versionKey]
@@ -542,7 +546,7 @@ export function ClientDashboard() {
                       <div className="flex justify-between items-center mb-3">
                         <h5 
                           className="text-md font-medium text-gray-700 dark:text-gray-300 cursor-pointer hover:text-gray-600"
-                          onClick={() => handleToggleVersion(versionKey)}
+                          onClick={() => handleToggleVersion('expenses', version)}
                         >
                           {t('المصروفات', 'Expenses')} {version.version_number}
                           <span className="text-sm text-green-600 ml-2">
@@ -557,7 +561,7 @@ export function ClientDashboard() {
                             <Button
                               variant="outline"
                               size="sm"
-                              onClick={() => handleToggleVersion(versionKey)}
+                              onClick={() => handleToggleVersion('expenses', version)}
                               className="text-gray-600 border-gray-600"
                             >
                               {isVersionCollapsed ? t('توسيع', 'Expand') : t('طي', 'Collapse')}
@@ -578,7 +582,7 @@ export function ClientDashboard() {
                               </TableRow>
                             </TableHeader>
                             <TableBody>
-                              {version.expenses_data.map((expense: any) => (
+                              {(versionItems[versionKey] || []).map((expense: any) => (
                                 <TableRow key={expense.id}>
                                   <TableCell>{formatDate(expense.date)}</TableCell>
                                   <TableCell>{expense.description}</TableCell>
@@ -596,15 +600,13 @@ export function ClientDashboard() {
                                   </TableCell>
                                   <TableCell>
                                     {expense.bill_url ? (
-                                      <a
+                                      <ProtectedFileLink
                                         href={expense.bill_url}
-                                        target="_blank"
-                                        rel="noopener noreferrer"
                                         className="text-blue-500 hover:text-blue-700 flex items-center gap-1"
                                       >
                                         <FileText className="h-4 w-4" />
                                         {t('عرض', 'View')}
-                                      </a>
+                                      </ProtectedFileLink>
                                     ) : (
                                       <span className="text-gray-400">-</span>
                                     )}
@@ -618,7 +620,7 @@ export function ClientDashboard() {
                                   {t('إجمالي المصروفات', 'Expenses Total')} {version.version_number}
                                 </TableCell>
                                 <TableCell className="font-semibold text-lg text-gray-600">
-                                  {formatCurrency(version.expenses_data.reduce((sum: number, exp: any) => sum + (parseFloat(String(exp.amount)) || 0), 0))}
+                                  {formatCurrency(parseFloat(String(version.total_amount)) || 0)}
                                 </TableCell>
                                 <TableCell colSpan={2}></TableCell>
                               </TableRow>
@@ -676,15 +678,13 @@ export function ClientDashboard() {
                         </TableCell>
                         <TableCell>
                           {expense.bill_url ? (
-                            <a
+                            <ProtectedFileLink
                               href={expense.bill_url}
-                              target="_blank"
-                              rel="noopener noreferrer"
                               className="text-blue-500 hover:text-blue-700 flex items-center gap-1"
                             >
                               <FileText className="h-4 w-4" />
                               {t('عرض', 'View')}
-                            </a>
+                            </ProtectedFileLink>
                           ) : (
                             <span className="text-gray-400">-</span>
                           )}
@@ -733,7 +733,7 @@ export function ClientDashboard() {
                       <div className="flex justify-between items-center mb-3">
                         <h5 
                           className="text-md font-medium text-gray-700 dark:text-gray-300 cursor-pointer hover:text-gray-600"
-                          onClick={() => handleToggleVersion(versionKey)}
+                          onClick={() => handleToggleVersion('payments', version)}
                         >
                           {t('المدفوعات', 'Payments')} {version.version_number}
                           <span className="text-sm text-green-600 ml-2">
@@ -748,7 +748,7 @@ export function ClientDashboard() {
                             <Button
                               variant="outline"
                               size="sm"
-                              onClick={() => handleToggleVersion(versionKey)}
+                              onClick={() => handleToggleVersion('payments', version)}
                               className="text-gray-600 border-gray-600"
                             >
                               {isVersionCollapsed ? t('توسيع', 'Expand') : t('طي', 'Collapse')}
@@ -767,7 +767,7 @@ export function ClientDashboard() {
                               </TableRow>
                             </TableHeader>
                             <TableBody>
-                              {version.payments_data.map((payment: any) => (
+                              {(versionItems[versionKey] || []).map((payment: any) => (
                                 <TableRow key={payment.id}>
                                   <TableCell>{formatDate(payment.date)}</TableCell>
                                   <TableCell className="font-semibold text-green-600">
@@ -783,7 +783,7 @@ export function ClientDashboard() {
                                   {t('إجمالي المدفوعات', 'Payments Total')} {version.version_number}
                                 </TableCell>
                                 <TableCell className="font-semibold text-lg text-green-600">
-                                  {formatCurrency(version.payments_data.reduce((sum: number, pay: any) => sum + (parseFloat(String(pay.amount)) || 0), 0))}
+                                  {formatCurrency(parseFloat(String(version.total_amount)) || 0)}
                                 </TableCell>
                                 <TableCell></TableCell>
                               </TableRow>
@@ -885,31 +885,27 @@ export function ClientDashboard() {
                       <p className="text-sm break-words">{msg.content}</p>
                       {msg.file_url && (
                         <div className="mt-2">
-                          {msg.file_url.match(new RegExp('\\.(jpg|jpeg|png|gif)$', 'i')) ? (
-                            <img
+                          {msg.file_name?.match(new RegExp('\\.(jpg|jpeg|png|gif)$', 'i')) ? (
+                            <ProtectedImage
                               src={msg.file_url}
                               alt="Attachment"
                               className="max-w-full h-auto rounded-lg cursor-pointer"
-                              onClick={() => window.open(msg.file_url, '_blank')}
+                              onClick={() => openProtectedFile(msg.file_url)}
                             />
-                          ) : msg.file_url.match(new RegExp('\\.pdf$', 'i')) ? (
-                            <a
+                          ) : msg.file_name?.match(new RegExp('\\.pdf$', 'i')) ? (
+                            <ProtectedFileLink
                               href={msg.file_url}
-                              target="_blank"
-                              rel="noopener noreferrer"
                               className="flex items-center gap-2 text-blue-600 hover:text-blue-800 underline"
                             >
                               📄 {t('عرض PDF', 'View PDF')}
-                            </a>
+                            </ProtectedFileLink>
                           ) : (
-                            <a
+                            <ProtectedFileLink
                               href={msg.file_url}
-                              target="_blank"
-                              rel="noopener noreferrer"
                               className="flex items-center gap-2 text-blue-600 hover:text-blue-800 underline"
                             >
                               📎 {t('عرض الملف', 'View File')}
-                            </a>
+                            </ProtectedFileLink>
                           )}
                         </div>
                       )}
@@ -3,6 +3,7 @@ import { Input } from '../../../components/ui/input';
 import { FileText } from 'lucide-react';
 import type { Client, Translate } from '../types';
 import type { Dispatch, RefObject, SetStateAction } from 'react';
+import { ProtectedFileLink } from '../../../components/ProtectedFileLink';
 
 type ChatModalProps = {
   modalChat: Client | null;
@@ -53,14 +54,12 @@ export function ChatModal({
             >
               <p>{m.content}</p>
               {m.file_url && (
-                <a
+                <ProtectedFileLink
                   href={m.file_url}
-                  target="_blank"
-                  rel="noopener noreferrer"
                   className="block mt-1 text-blue-500 underline"
                 >
                   📎 View File
-                </a>
+                </ProtectedFileLink>
               )}
               <small className="text-xs text-gray-500">{new Date(m.timestamp).toLocaleString()}</small>
             </div>
@@ -21,6 +21,7 @@ import { ReadOnlyExpenseRow } from '../../../components/ReadOnlyExpenseRow';
 import { ReadOnlyPaymentRow } from '../../../components/ReadOnlyPaymentRow';
 import type { Translate, Expense } from '../types';
 import api from '../../../lib/api';
+import { useVersionItems } from '../../../hooks/useApi';
 import {
   showExpenseSuccessAlert,
   showExpenseErrorAlert,
@@ -60,6 +61,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
   const [expensesVersionCount, setExpensesVersionCount] = useState(0);
   const [paymentsVersionCount, setPaymentsVersionCount] = useState(0);
   const [collapsedVersions, setCollapsedVersions] = useState<{[key: string]: boolean}>({});
+  const { versionItems, loadVersionItems } = useVersionItems('admin');
 
   useEffect(() => {
     if (isOpen && client) {
@@ -394,21 +396,35 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
     setPaymentsCollapsed(!paymentsCollapsed);
   };
 
-  const handleToggleVersion = (versionKey: string) => {
+  const handleToggleVersion = (type: 'expenses' | 'payments', version: any) => {
+    const versionKey = `${type}_${version.id}`;
+    // Version lists only carry totals; load the items when a version is opened
+    if (collapsedVersions[versionKey] !== false) {
+      loadVersionItems(type, version).catch(() => {
+        // Error handling is done by the API service
+      });
+    }
     setCollapsedVersions(prev => ({
       ...prev,
       [versionKey]: !prev[versionKey]
     }));
   };
 
-  const handlePrintVersion = (type: 'expenses' | 'payments', version: any) => {
+  const handlePrintVersion = async (type: 'expenses' | 'payments', version: any) => {
+    // Store the specific version data for printing
+    let items: any[];
+    try {
+      items = await loadVersionItems(type, version);
+    } catch (error) {
+      // Error handling is done by the API service
+      return;
+    }
     setPrintType(type);
     setPrintOriginal(true);
-    // Store the specific version data for printing
     if (type === 'expenses') {
-      setOriginalExpenses(version.expenses_data);
+      setOriginalExpenses(items);
     } else {
-      setOriginalPayments(version.payments_data);
+      setOriginalPayments(items);
     }
     setShowPrintPreview(true);
   };
@@ -459,7 +475,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                       <div className="flex justify-between items-center mb-3">
                         <h5 
                           className="text-md font-medium text-gray-700 dark:text-gray-300 cursor-pointer hover:text-gray-600"
-                          onClick={() => handleToggleVersion(versionKey)}
+                          onClick={() => handleToggleVersion('expenses', version)}
                         >
                           {t('المصروفات', 'Expenses')} {version.version_number}
                           {isVersionCollapsed && (
@@ -485,7 +501,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                             <Button
                               variant="outline"
                               size="sm"
-                              onClick={() => handleToggleVersion(versionKey)}
+                              onClick={() => handleToggleVersion('expenses', version)}
                               className="text-gray-600 border-gray-600"
                             >
                               {isVersionCollapsed ? t('توسيع', 'Expand') : t('طي', 'Collapse')}
@@ -507,7 +523,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                               </TableRow>
                             </TableHeader>
                             <TableBody>
-                              {version.expenses_data.map((expense: any) => (
+                              {(versionItems[versionKey] || []).map((expense: any) => (
                                 <ReadOnlyExpenseRow
                                   key={expense.id}
                                   expense={expense}
@@ -522,7 +538,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                                   {t('إجمالي المصروفات', 'Expenses Total')} {version.version_number}
                                 </TableCell>
                                 <TableCell className="font-semibold text-lg text-gray-600">
-                                  {formatCurrency(version.expenses_data.reduce((sum: number, exp: any) => sum + (parseFloat(String(exp.amount)) || 0), 0))}
+                                  {formatCurrency(parseFloat(String(version.total_amount)) || 0)}
                                 </TableCell>
                                 <TableCell colSpan={3}></TableCell>
                               </TableRow>
@@ -629,7 +645,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                       <div className="flex justify-between items-center mb-3">
                         <h5 
                           className="text-md font-medium text-gray-700 dark:text-gray-300 cursor-pointer hover:text-gray-600"
-                          onClick={() => handleToggleVersion(versionKey)}
+                          onClick={() => handleToggleVersion('payments', version)}
                         >
                           {t('المدفوعات', 'Payments')} {version.version_number}
                           {isVersionCollapsed && (
@@ -655,7 +671,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                             <Button
                               variant="outline"
                               size="sm"
-                              onClick={() => handleToggleVersion(versionKey)}
+                              onClick={() => handleToggleVersion('payments', version)}
                               className="text-gray-600 border-gray-600"
                             >
                               {isVersionCollapsed ? t('توسيع', 'Expand') : t('طي', 'Collapse')}
@@ -675,7 +691,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                               </TableRow>
                             </TableHeader>
                             <TableBody>
-                              {version.payments_data.map((payment: any) => (
+                              {(versionItems[versionKey] || []).map((payment: any) => (
                                 <ReadOnlyPaymentRow
                                   key={payment.id}
                                   payment={payment}
@@ -690,7 +706,7 @@ export function ViewExpensesModal({ isOpen, onClose, client, t }: ViewExpensesMo
                                   {t('إجمالي المدفوعات', 'Payments Total')} {version.version_number}
                                 </TableCell>
                                 <TableCell className="font-semibold text-lg text-gray-600">
-                                  {formatCurrency(version.payments_data.reduce((sum: number, pay: any) => sum + (parseFloat(String(pay.amount)) || 0), 0))}
+                                  {formatCurrency(parseFloat(String(version.total_amount)) || 0)}
                                 </TableCell>
                                 <TableCell colSpan={2}></TableCell>
                               </TableRow>
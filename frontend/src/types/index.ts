@@ -99,13 +99,14 @@ export type ExpenseVersion = {
   client: number;
   version_number: number;
   discussion_completed_at: string;
-  expenses_data: Expense[];
+  is_checkpoint: boolean;
+  item_count: number;
+  total_amount: number;
   created_at: string;
-  updated_at: string;
-  
-  // Computed properties
-  expenses_count?: number;
-  total_amount?: number;
+
+  // Only returned by the version detail endpoint
+  updated_at?: string;
+  expenses_data?: Expense[];
 };
 
 export type PaymentVersion = {
@@ -113,13 +114,14 @@ export type PaymentVersion = {
   client: number;
   version_number: number;
   discussion_completed_at: string;
-  payments_data: Payment[];
+  is_checkpoint: boolean;
+  item_count: number;
+  total_amount: number;
   created_at: string;
-  updated_at: string;
-  
-  // Computed properties
-  payments_count?: number;
-  total_amount?: number;
+
+  // Only returned by the version detail endpoint
+  updated_at?: string;
+  payments_data?: Payment[];
 };
 
 // Project types